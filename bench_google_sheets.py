@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк GSpreadClient на локальной имитации Google Sheets (без сети и credentials)
+"""
+
+import argparse
+import asyncio
+import time
+
+from tests.fakes import FakeSheetsBackend
+from services.gspread_client import AsyncGSpreadClient, GSpreadClient
+from services.rate_limiter import TokenBucket
+
+
+async def timed(label: str, backend: FakeSheetsBackend, coro):
+    requests_before = backend.request_count
+    started = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<40} {elapsed * 1000:9.1f} мс  запросов: {backend.request_count - requests_before}")
+    return result
+
+
+async def run(args: argparse.Namespace) -> None:
+    backend = FakeSheetsBackend(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    backend.generate_participants("svod", args.rows, extra_columns=args.extra_columns)
+    backend.generate_interviewer_tabs("opyt", args.tabs)
+
+    # Квота в бенчмарке по умолчанию не ограничивает, чтобы мерить сам клиент
+    limiter = TokenBucket(capacity=args.quota, rate=args.quota / 60.0, max_wait=60)
+    sync_client = GSpreadClient(session=backend.session(), limiter=limiter)
+    client = AsyncGSpreadClient(client=sync_client, max_workers=args.concurrency)
+
+    print(f"🔍 Таблицы: {args.tabs} листов собеседующих, {args.rows} участников, "
+          f"задержка {args.latency * 1000:.0f} мс, 429: {args.error_rate:.0%}")
+
+    try:
+        titles = await timed("list_worksheet_titles (холодный)", backend, client.list_worksheet_titles("opyt"))
+        await timed("list_worksheet_titles (кэш)", backend, client.list_worksheet_titles("opyt"))
+        await timed("read_tabs_batch по всем листам", backend, client.read_tabs_batch("opyt", titles))
+        await timed(
+            "read_interviewers_from_sheet по листам", backend,
+            asyncio.gather(*(client.read_interviewers_from_sheet("opyt", t) for t in titles)),
+        )
+        await timed("read_tab участников (все колонки)", backend, client.read_tab("svod", "участники"))
+        rows = await timed("read_participant_rows (3 колонки)", backend, client.read_participant_rows("svod"))
+        await timed(
+            f"{args.concurrency} параллельных импортов", backend,
+            asyncio.gather(*(client.read_participant_rows("svod") for _ in range(args.concurrency))),
+        )
+        print(f"✅ Прочитано участников: {len(rows)}")
+        print(f"📊 Запросы по типам: {backend.requests_by_kind}")
+        print(f"📊 Ответов 429: {backend.throttled_count}")
+        print(f"📊 Лимитер: {client.rate_limit_stats()}")
+    finally:
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tabs", type=int, default=60)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--extra-columns", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка ответа, сек")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--quota", type=float, default=100000, help="запросов в минуту")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from database.repository import Repository
+
+
+class DbScopeMiddleware(BaseMiddleware):
+    """Не больше одного соединения с базой на апдейт.
+
+    Соединение (или сессия SQLAlchemy) берётся при первом запросе
+    обработчика и возвращается в пул, когда апдейт обработан. UpdateScope
+    кладётся в data обработчика под ключом "db". Подключается как outer
+    middleware на dp.update.
+    """
+
+    def __init__(self, repository: Repository, slow_hold: Optional[float] = None) -> None:
+        self.repository = repository
+        self.slow_hold = slow_hold if slow_hold is not None else float(os.getenv("DB_SLOW_HOLD_SECONDS", "2"))
+        self.updates = 0
+        self.acquired = 0
+        self.total_hold = 0.0
+        self.max_hold = 0.0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        self.updates += 1
+        scope = self.repository.scope()
+        try:
+            async with scope:
+                data["db"] = scope
+                return await handler(event, data)
+        finally:
+            if scope.hold_time is not None:
+                self._record(event, scope.hold_time)
+
+    def _record(self, event: TelegramObject, hold_time: float) -> None:
+        self.acquired += 1
+        self.total_hold += hold_time
+        self.max_hold = max(self.max_hold, hold_time)
+        if hold_time >= self.slow_hold:
+            print(f"⚠️ Апдейт {getattr(event, 'update_id', '?')} держал соединение с базой {hold_time:.2f} с")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "updates": self.updates,
+            "acquired": self.acquired,
+            "avg_hold_ms": round(self.total_hold / self.acquired * 1000, 1) if self.acquired else 0.0,
+            "max_hold_ms": round(self.max_hold * 1000, 1),
+        }
@@ -1,5 +1,7 @@
 import os
 import secrets
+from typing import Optional
+
 from aiogram import F, Router
 from aiogram.filters import Command, CommandObject
 from aiogram.types import (
@@ -9,7 +11,10 @@ from aiogram.types import (
     Message,
 )
 
-from services.gspread_client import GSpreadClient
+from database.models import SheetKind
+from database.repository import Repository, create_repository
+from services.gspread_client import AsyncGSpreadClient, describe_sheets_error
+from services.participant_stream import bulk_upsert_participants
 from state.inmemory import AppState
 
 
@@ -24,8 +29,41 @@ def is_admin(user_id: int) -> bool:
     return user_id in ids
 
 
-def setup_admin_router(state: AppState, gs: GSpreadClient, get_bot_username):
+def setup_admin_router(
+    state: AppState,
+    gs: AsyncGSpreadClient,
+    get_bot_username,
+    repository: Optional[Repository] = None,
+):
     router = Router()
+    repository = repository or create_repository()
+
+    async def import_participants(faculty: str, sheet_id: str) -> str:
+        """Читает участников из svod и записывает их в participants, если факультет есть в базе"""
+        try:
+            rows = await gs.read_participant_rows(sheet_id, worksheet_title="участники")
+        except Exception as e:
+            return f"Ошибка чтения: {describe_sheets_error(e)}"
+        state.participants[faculty] = [row._asdict() for row in rows]
+
+        faculty_row = next((f for f in await repository.list_faculties() if f.slug == faculty), None)
+        if not faculty_row:
+            return f"Импортировано участников: {len(rows)} (факультета нет в базе, данные только в памяти)"
+        svod_sheet = await repository.get_sheet(faculty_row.id, SheetKind.SVOD)
+        try:
+            async with repository.connection() as conn:
+                result = await bulk_upsert_participants(
+                    conn,
+                    rows,
+                    faculty_row.id,
+                    svod_sheet.id if svod_sheet else None,
+                )
+        except Exception as e:
+            return f"Ошибка записи в базу: {e}"
+        return (
+            f"Импортировано участников: {result.total}\n"
+            f"Добавлено: {result.inserted}, обновлено: {result.changed}"
+        )
 
     def admin_menu_kb() -> InlineKeyboardMarkup:
         buttons = [
@@ -117,9 +155,9 @@ def setup_admin_router(state: AppState, gs: GSpreadClient, get_bot_username):
             await message.answer("Сначала задайте таблицы через /set_sheets")
             return
         try:
-            tabs = gs.list_worksheet_titles(sheet_id)
+            tabs = await gs.list_worksheet_titles(sheet_id)
         except Exception as e:
-            await message.answer(f"Ошибка чтения: {e}")
+            await message.answer(f"Ошибка чтения: {describe_sheets_error(e)}")
             return
         if not tabs:
             await message.answer("Листов не найдено")
@@ -167,13 +205,7 @@ def setup_admin_router(state: AppState, gs: GSpreadClient, get_bot_username):
         if not sheet_id:
             await message.answer("Сначала задайте таблицы через /set_sheets")
             return
-        try:
-            rows = gs.read_participants(sheet_id, worksheet_title="участники")
-        except Exception as e:
-            await message.answer(f"Ошибка чтения: {e}")
-            return
-        state.participants[faculty] = rows
-        await message.answer(f"Импортировано участников: {len(rows)}")
+        await message.answer(await import_participants(faculty, sheet_id))
 
     # Wizard text inputs
     @router.message()
@@ -210,9 +242,9 @@ def setup_admin_router(state: AppState, gs: GSpreadClient, get_bot_username):
                 await message.answer("Сначала задайте таблицы через /admin → Задать таблицы")
                 return
             try:
-                tabs = gs.list_worksheet_titles(sheet_id)
+                tabs = await gs.list_worksheet_titles(sheet_id)
             except Exception as e:
-                await message.answer(f"Ошибка чтения: {e}")
+                await message.answer(f"Ошибка чтения: {describe_sheets_error(e)}")
                 return
             if not tabs:
                 await message.answer("Листов не найдено")
@@ -232,14 +264,9 @@ def setup_admin_router(state: AppState, gs: GSpreadClient, get_bot_username):
             if not sheet_id:
                 await message.answer("Сначала задайте таблицы через /admin → Задать таблицы")
                 return
-            try:
-                rows = gs.read_participants(sheet_id, worksheet_title="участники")
-            except Exception as e:
-                await message.answer(f"Ошибка чтения: {e}")
-                return
-            state.participants[faculty] = rows
+            text = await import_participants(faculty, sheet_id)
             state.pending.pop(message.from_user.id, None)
-            await message.answer(f"Импортировано участников: {len(rows)}", reply_markup=admin_menu_kb())
+            await message.answer(text, reply_markup=admin_menu_kb())
             return
 
     return router
@@ -4,14 +4,14 @@ from aiogram import Router, F
 from aiogram.filters import Command, CommandObject
 from aiogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery
 
-from database.dao import FacultyAdminDAO
-from database.engine import sessionmaker
+from database.repository import Repository, create_repository
 from services.auth import AuthService
 from services.redis_client import CacheKeys, RedisClient
 
 
-def setup_common_router(redis_client: RedisClient) -> Router:
+def setup_common_router(redis_client: RedisClient, repository: Optional[Repository] = None) -> Router:
     router = Router()
+    repository = repository or create_repository()
 
     def get_main_menu_kb(user_id: int) -> InlineKeyboardMarkup:
         """Создает главное меню в зависимости от роли пользователя"""
@@ -27,10 +27,8 @@ def setup_common_router(redis_client: RedisClient) -> Router:
         # Проверяем, является ли пользователь админом факультета
         async def check_faculty_admin():
             try:
-                async with sessionmaker() as session:
-                    admin_dao = FacultyAdminDAO(session)
-                    admin = await admin_dao.get_by_telegram_id(user_id)
-                    return admin is not None
+                admin = await repository.get_admin(user_id)
+                return admin is not None
             except:
                 return False
         
@@ -90,13 +88,10 @@ def setup_common_router(redis_client: RedisClient) -> Router:
     @router.callback_query(F.data == "faculty_admin_menu")
     async def handle_faculty_admin_menu(callback: CallbackQuery) -> None:
         # Проверяем, является ли пользователь админом факультета
-        async with sessionmaker() as session:
-            admin_dao = FacultyAdminDAO(session)
-            admin = await admin_dao.get_by_telegram_id(callback.from_user.id)
-            
-            if not admin and not AuthService.is_superadmin(callback.from_user.id):
-                await callback.answer("❌ У вас нет прав админа факультета", show_alert=True)
-                return
+        admin = await repository.get_admin(callback.from_user.id)
+        if not admin and not AuthService.is_superadmin(callback.from_user.id):
+            await callback.answer("❌ У вас нет прав админа факультета", show_alert=True)
+            return
         
         await callback.message.edit_text(
             "Панель администратора факультета:\n\n"
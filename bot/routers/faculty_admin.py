@@ -1,3 +1,6 @@
+import time
+from typing import Optional
+
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import (
@@ -7,16 +10,40 @@ from aiogram.types import (
     Message,
 )
 
-from database.dao import FacultyDAO, FacultyAdminDAO, FacultySheetDAO, InterviewerDAO
-from database.engine import sessionmaker
-from database.models import SheetKind, Interviewer
+from database.models import SheetKind
+from database.repository import Repository, UpdateScope, create_repository
 from services.auth import AuthService
-from services.gspread_client import GSpreadClient
+from services.availability import build_availability, load_availability
+from services.faculty_directory import FacultyDirectory
+from services.gspread_client import AsyncGSpreadClient, SheetsWriteBuffer, Staleness, describe_sheets_error
+from services.participant_stream import (
+    STREAM_IMPORT_MIN_ROWS,
+    iter_participant_pages,
+    stream_import_participants,
+    sync_participants,
+)
+from services.participant_sync import ParticipantSyncResult
 from services.redis_client import CacheKeys, RedisClient
+from services.registration_export import export_registration_status
+from services.sheet_prefetch import SheetPrefetchWorker
+from services.sheet_rows import PARTICIPANTS_TAB
 
 
-def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClient, bot) -> Router:
+def setup_faculty_admin_router(
+    redis_client: RedisClient,
+    gs_client: AsyncGSpreadClient,
+    bot,
+    sheet_cache: Optional[SheetPrefetchWorker] = None,
+    sheet_writer: Optional[SheetsWriteBuffer] = None,
+    repository: Optional[Repository] = None,
+    faculty_directory: Optional[FacultyDirectory] = None,
+) -> Router:
     router = Router()
+    repository = repository or create_repository()
+    faculty_directory = faculty_directory or FacultyDirectory(repository.list_faculties)
+    # Без фонового воркера копии таблиц заполняются по первому обращению
+    sheet_cache = sheet_cache or SheetPrefetchWorker(gs_client, redis_client)
+    sheet_writer = sheet_writer or SheetsWriteBuffer(gs_client)
 
     def faculty_admin_menu_kb() -> InlineKeyboardMarkup:
         buttons = [
@@ -30,13 +57,10 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
     @router.callback_query(F.data == "faculty_admin_menu")
     async def show_faculty_admin_menu(callback: CallbackQuery) -> None:
         # Проверяем, является ли пользователь админом факультета
-        async with sessionmaker() as session:
-            admin_dao = FacultyAdminDAO(session)
-            admin = await admin_dao.get_by_telegram_id(callback.from_user.id)
-            
-            if not admin and not AuthService.is_superadmin(callback.from_user.id):
-                await callback.answer("Недоступно")
-                return
+        admin = await repository.get_admin(callback.from_user.id)
+        if not admin and not AuthService.is_superadmin(callback.from_user.id):
+            await callback.answer("Недоступно")
+            return
         
         await callback.message.edit_text(
             "Панель администратора факультета:\n\n"
@@ -51,13 +75,10 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
     @router.callback_query(F.data == "faculty|add_interviewers")
     async def cb_add_interviewers(callback: CallbackQuery) -> None:
         # Проверяем права доступа
-        async with sessionmaker() as session:
-            admin_dao = FacultyAdminDAO(session)
-            admin = await admin_dao.get_by_telegram_id(callback.from_user.id)
-            
-            if not admin and not AuthService.is_superadmin(callback.from_user.id):
-                await callback.answer("Недоступно", show_alert=True)
-                return
+        admin = await repository.get_admin(callback.from_user.id)
+        if not admin and not AuthService.is_superadmin(callback.from_user.id):
+            await callback.answer("Недоступно", show_alert=True)
+            return
 
         # Если пользователь - админ факультета, показываем только его факультет
         if admin:
@@ -65,10 +86,8 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
             await parse_interviewers_for_faculty(callback, faculty_id)
         else:
             # Если суперадмин, показываем выбор факультета
-            async with sessionmaker() as session:
-                faculty_dao = FacultyDAO(session)
-                faculties = await faculty_dao.get_all()
-            
+            faculties = await faculty_directory.all()
+
             buttons = []
             for faculty in faculties:
                 buttons.append([
@@ -94,15 +113,23 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
         faculty_id = int(callback.data.split("|")[1])
         await parse_interviewers_for_faculty(callback, faculty_id)
 
-    async def parse_interviewers_for_faculty(callback: CallbackQuery, faculty_id: int) -> None:
-        """Парсит собеседующих для факультета из Google Sheets"""
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            sheet_dao = FacultySheetDAO(session)
-            interviewer_dao = InterviewerDAO(session)
-            
-            faculty = await faculty_dao.get_by_id(faculty_id)
-            sheets = await sheet_dao.get_by_faculty(faculty_id)
+    @router.callback_query(F.data.startswith("reparse_faculty|"))
+    async def cb_reparse_faculty(callback: CallbackQuery) -> None:
+        faculty_id = int(callback.data.split("|")[1])
+        admin = await repository.get_admin(callback.from_user.id)
+        allowed = AuthService.is_superadmin(callback.from_user.id) or (admin and admin.faculty_id == faculty_id)
+        if not allowed:
+            await callback.answer("Недоступно", show_alert=True)
+            return
+        await parse_interviewers_for_faculty(callback, faculty_id, force=True)
+
+    async def parse_interviewers_for_faculty(callback: CallbackQuery, faculty_id: int, force: bool = False) -> None:
+        """Парсит собеседующих для факультета из копии Google Sheets (force - перечитать таблицы)"""
+        faculty = await faculty_directory.get(faculty_id)
+        sheets = await repository.get_sheets(faculty_id)
+        # Уже добавленные собеседующие - одним запросом, а не по запросу на лист
+        existing_tabs = await repository.get_interviewer_tab_names(faculty_id)
+        await UpdateScope.release_current(repository)
         
         # Находим таблицы для собеседующих
         ne_opyt_sheet = next((s for s in sheets if s.kind == SheetKind.NE_OPYT), None)
@@ -121,31 +148,32 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
         
         # Парсим собеседующих из таблиц
         all_interviewers = []
+        fetched_at = time.time()
         
         for sheet, sheet_kind in [(ne_opyt_sheet, SheetKind.NE_OPYT), (opyt_sheet, SheetKind.OPYT)]:
             if not sheet:
                 continue
                 
             try:
-                # Получаем листы из таблицы
-                worksheet_titles = gs_client.list_worksheet_titles(sheet.spreadsheet_id)
+                # Получаем листы из фоновой копии таблицы
+                tabs = await sheet_cache.get_tabs(sheet.spreadsheet_id, force=force)
+                fetched_at = min(fetched_at, tabs.fetched_at)
                 
-                for tab_name in worksheet_titles:
-                    # Проверяем, не существует ли уже такой собеседующий
-                    existing = await interviewer_dao.get_by_faculty_and_tab_name(faculty_id, tab_name)
-                    if existing:
+                for tab_name in tabs.titles:
+                    if tab_name in existing_tabs:
                         continue
-                    
+
                     all_interviewers.append({
-                        "tab_name": tab_name,
-                        "sheet_kind": sheet_kind,
+                        "faculty_id": faculty_id,
                         "faculty_sheet_id": sheet.id,
-                        "faculty_id": faculty_id
+                        "tab_name": tab_name,
+                        "experience_kind": sheet_kind,
+                        "invite_token": redis_client.new_invite_token(),
                     })
                     
             except Exception as e:
                 await callback.message.edit_text(
-                    f"❌ Ошибка чтения таблицы {sheet_kind.value}: {e}",
+                    f"❌ Ошибка чтения таблицы {sheet_kind.value}: {describe_sheets_error(e)}",
                     reply_markup=InlineKeyboardMarkup(inline_keyboard=[
                         [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
                     ])
@@ -153,54 +181,284 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
                 await callback.answer()
                 return
         
+        freshness_text = f"Данные таблиц на {time.strftime('%H:%M', time.localtime(fetched_at))}"
+        reparse_button = [InlineKeyboardButton(
+            text="🔄 Перечитать таблицы", callback_data=f"reparse_faculty|{faculty_id}"
+        )]
+
         if not all_interviewers:
             await callback.message.edit_text(
-                f"✅ Все собеседующие для факультета '{faculty.title}' уже добавлены в базу данных.",
+                f"✅ Все собеседующие для факультета '{faculty.title}' уже добавлены в базу данных.\n\n"
+                f"{freshness_text}",
                 reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                    reparse_button,
                     [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
                 ])
             )
             await callback.answer()
             return
         
-        # Сохраняем собеседующих в базу данных
-        saved_count = 0
-        for interviewer_data in all_interviewers:
-            try:
-                # Генерируем токен приглашения
-                token = await redis_client.generate_invite_token(
-                    interviewer_data["faculty_id"], 
-                    interviewer_data["faculty_id"]
-                )
-                
-                # Создаем собеседующего в базе
-                async with sessionmaker() as session:
-                    interviewer_dao = InterviewerDAO(session)
-                    await interviewer_dao.create(
-                        interviewer_data["faculty_id"],
-                        interviewer_data["faculty_sheet_id"],
-                        interviewer_data["tab_name"],
-                        interviewer_data["sheet_kind"],
-                        token
-                    )
-                    saved_count += 1
-                    
-            except Exception as e:
-                print(f"Ошибка сохранения собеседующего {interviewer_data['tab_name']}: {e}")
-        
+        # Сохраняем всех новых собеседующих одним INSERT, токены - одним pipeline
+        try:
+            created = await repository.create_interviewers(all_interviewers)
+            await redis_client.store_invite_tokens({
+                token: (interviewer_id, faculty_id) for interviewer_id, _, token in created
+            })
+            saved_count = len(created)
+        except Exception as e:
+            print(f"Ошибка сохранения собеседующих факультета {faculty_id}: {e}")
+            saved_count = 0
+
         await callback.message.edit_text(
             f"✅ Парсинг завершен!\n\n"
             f"Факультет: {faculty.title}\n"
             f"Найдено новых собеседующих: {len(all_interviewers)}\n"
-            f"Сохранено в базу: {saved_count}\n\n"
+            f"Сохранено в базу: {saved_count}\n"
+            f"{freshness_text}\n\n"
             f"Теперь можно создавать ссылки для регистрации через '👥 Собеседующие'",
             reply_markup=InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="👥 Собеседующие", callback_data="faculty|interviewers")],
+                reparse_button,
                 [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
             ])
         )
         await callback.answer()
 
+    @router.callback_query(F.data == "faculty|import_participants")
+    async def cb_import_participants(callback: CallbackQuery) -> None:
+        # Проверяем права доступа
+        admin = await repository.get_admin(callback.from_user.id)
+        if not admin and not AuthService.is_superadmin(callback.from_user.id):
+            await callback.answer("Недоступно", show_alert=True)
+            return
+
+        if admin:
+            await import_participants_for_faculty(callback, admin.faculty_id)
+            return
+
+        # Если суперадмин, показываем выбор факультета
+        faculties = await faculty_directory.all()
+
+        buttons = []
+        for faculty in faculties:
+            buttons.append([
+                InlineKeyboardButton(
+                    text=faculty.title,
+                    callback_data=f"import_faculty|{faculty.id}"
+                )
+            ])
+        buttons.append([InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")])
+
+        await callback.message.edit_text(
+            "Выберите факультет для импорта участников:",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons)
+        )
+        await callback.answer()
+
+    @router.callback_query(F.data.startswith("import_faculty|"))
+    async def cb_import_faculty(callback: CallbackQuery) -> None:
+        if not AuthService.is_superadmin(callback.from_user.id):
+            await callback.answer("Недоступно", show_alert=True)
+            return
+
+        faculty_id = int(callback.data.split("|")[1])
+        await import_participants_for_faculty(callback, faculty_id)
+
+    async def import_participants_for_faculty(callback: CallbackQuery, faculty_id: int) -> None:
+        """Инкрементально импортирует участников факультета из таблицы svod"""
+        back_kb = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
+        ])
+
+        faculty = await faculty_directory.get(faculty_id)
+        svod_sheet = await repository.get_sheet(faculty_id, SheetKind.SVOD)
+
+        if not svod_sheet:
+            await callback.message.edit_text(
+                f"❌ Для факультета '{faculty.title}' не настроена сводная таблица.\n\n"
+                "Настройте таблицы через панель суперадмина: /superadmin",
+                reply_markup=back_kb
+            )
+            await callback.answer()
+            return
+
+        # Пока идут запросы к Google, соединение апдейта свободно; база возьмёт новое после чтения
+        await UpdateScope.release_current(repository)
+        try:
+            with Staleness() as staleness:
+                revision = await gs_client.get_revision(svod_sheet.spreadsheet_id)
+            if revision == svod_sheet.synced_revision:
+                # Таблица не менялась с прошлого импорта - лист не читаем
+                total = await repository.count_participants(faculty_id)
+                result = ParticipantSyncResult(total=total, unchanged=True)
+                fetched_at = staleness.since or time.time()
+            else:
+                row_count = await gs_client.get_row_count(svod_sheet.spreadsheet_id, PARTICIPANTS_TAB)
+                if row_count > STREAM_IMPORT_MIN_ROWS:
+                    # Большой лист не держим в памяти целиком: страницы копятся на диске,
+                    # соединение берётся только на COPY и слияние
+                    result = await stream_import_participants(
+                        repository.connection,
+                        iter_participant_pages(gs_client, svod_sheet.spreadsheet_id),
+                        faculty_id,
+                        svod_sheet.id,
+                    )
+                    fetched_at = time.time()
+                else:
+                    snapshot = await sheet_cache.get_participants(svod_sheet.spreadsheet_id, revision=revision)
+                    result = await sync_participants(repository, svod_sheet, snapshot.rows)
+                    fetched_at = snapshot.fetched_at
+                # Версия из кэша при недоступном Google может быть старше импортированных данных
+                if staleness.since is None:
+                    await repository.set_synced_revision(svod_sheet.id, revision)
+        except Exception as e:
+            await callback.message.edit_text(
+                f"❌ Ошибка импорта участников: {describe_sheets_error(e)}",
+                reply_markup=back_kb
+            )
+            await callback.answer()
+            return
+
+        freshness_text = f"Данные таблицы на {time.strftime('%H:%M', time.localtime(fetched_at))}"
+        if result.unchanged:
+            text = (
+                f"✅ Таблица участников не изменилась с прошлого импорта.\n\n"
+                f"Факультет: {faculty.title}\n"
+                f"Участников в таблице: {result.total}\n"
+                f"{freshness_text}"
+            )
+        else:
+            text = (
+                f"✅ Импорт участников завершен!\n\n"
+                f"Факультет: {faculty.title}\n"
+                f"Участников в таблице: {result.total}\n"
+                f"Добавлено: {result.inserted}\n"
+                f"Обновлено: {result.changed}\n"
+                f"Удалено: {result.deleted}\n"
+                f"{freshness_text}"
+            )
+        await callback.message.edit_text(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="📤 Выгрузить статусы регистрации", callback_data=f"export_status|{faculty_id}")],
+            [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
+        ]))
+        await callback.answer()
+
+    @router.callback_query(F.data.startswith("export_status|"))
+    async def cb_export_registration_status(callback: CallbackQuery) -> None:
+        """Записывает в svod, кто из участников уже привязал Telegram"""
+        faculty_id = int(callback.data.split("|")[1])
+        back_kb = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
+        ])
+
+        admin = await repository.get_admin(callback.from_user.id)
+        if not AuthService.is_superadmin(callback.from_user.id) and (not admin or admin.faculty_id != faculty_id):
+            await callback.answer("Недоступно", show_alert=True)
+            return
+
+        svod_sheet = await repository.get_sheet(faculty_id, SheetKind.SVOD)
+        registered = await repository.get_registration_status(faculty_id)
+
+        if not svod_sheet:
+            await callback.answer("Сводная таблица не настроена", show_alert=True)
+            return
+
+        await UpdateScope.release_current(repository)
+        try:
+            queued = await export_registration_status(gs_client, sheet_writer, svod_sheet.spreadsheet_id, registered)
+            # Выгрузку по кнопке отправляем сразу, не дожидаясь таймера; ошибка записи видна админу
+            written = await sheet_writer.flush(svod_sheet.spreadsheet_id)
+        except Exception as e:
+            await callback.message.edit_text(
+                f"❌ Ошибка выгрузки статусов: {describe_sheets_error(e)}",
+                reply_markup=back_kb
+            )
+            await callback.answer()
+            return
+
+        registered_count = sum(registered.values())
+        await callback.message.edit_text(
+            f"✅ Статусы регистрации выгружены в сводную таблицу.\n\n"
+            f"Зарегистрировано: {registered_count} из {len(registered)}\n"
+            f"Изменено ячеек: {queued}, записано: {written}",
+            reply_markup=back_kb
+        )
+        await callback.answer()
+
+    @router.callback_query(F.data == "faculty|manage_slots")
+    async def cb_manage_slots(callback: CallbackQuery) -> None:
+        admin = await repository.get_admin(callback.from_user.id)
+        if not admin and not AuthService.is_superadmin(callback.from_user.id):
+            await callback.answer("Недоступно", show_alert=True)
+            return
+
+        if admin:
+            await show_availability(callback, admin.faculty_id)
+            return
+
+        # Если суперадмин, показываем выбор факультета
+        faculties = await faculty_directory.all()
+
+        buttons = [
+            [InlineKeyboardButton(text=faculty.title, callback_data=f"slots_faculty|{faculty.id}")]
+            for faculty in faculties
+        ]
+        buttons.append([InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")])
+        await callback.message.edit_text(
+            "Выберите факультет для просмотра слотов:",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons)
+        )
+        await callback.answer()
+
+    @router.callback_query(F.data.startswith("slots_faculty|") | F.data.startswith("slots_refresh|"))
+    async def cb_show_slots(callback: CallbackQuery) -> None:
+        action, faculty_id = callback.data.split("|")
+        faculty_id = int(faculty_id)
+        admin = await repository.get_admin(callback.from_user.id)
+        if not AuthService.is_superadmin(callback.from_user.id) and (not admin or admin.faculty_id != faculty_id):
+            await callback.answer("Недоступно", show_alert=True)
+            return
+        await show_availability(callback, faculty_id, refresh=action == "slots_refresh")
+
+    async def show_availability(callback: CallbackQuery, faculty_id: int, refresh: bool = False) -> None:
+        """Свободные места по дням из матрицы занятости (refresh - перечитать листы собеседующих)"""
+        back_kb = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
+        ])
+
+        faculty = await faculty_directory.get(faculty_id)
+        try:
+            matrix = None if refresh else await load_availability(repository, faculty_id)
+            if matrix is None:
+                matrix = await build_availability(repository, gs_client, faculty_id)
+        except Exception as e:
+            await callback.message.edit_text(
+                f"❌ Ошибка чтения слотов: {describe_sheets_error(e)}",
+                reply_markup=back_kb
+            )
+            await callback.answer()
+            return
+
+        text = f"⏰ Слоты факультета '{faculty.title}':\n\n"
+        if not matrix.slots:
+            text += "В листах собеседующих не найдено слотов (нужна колонка 'Время').\n"
+        else:
+            for day, capacity in matrix.capacity_by_day().items():
+                text += f"📅 {day or 'Без даты'}: свободно {capacity}\n"
+            text += (
+                f"\nСобеседующих: {len(matrix.masks)}\n"
+                f"Слотов: {len(matrix.slots)}\n"
+                f"Всего свободных мест: {matrix.total_capacity}\n"
+            )
+        if matrix.synced_at:
+            text += f"Обновлено: {matrix.synced_at.astimezone().strftime('%d.%m %H:%M')}"
+
+        await callback.message.edit_text(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔄 Перечитать таблицы", callback_data=f"slots_refresh|{faculty_id}")],
+            [InlineKeyboardButton(text="🔙 Назад", callback_data="faculty|back")]
+        ]))
+        await callback.answer()
+
     @router.callback_query(F.data.startswith("create_invite|"))
     async def cb_create_invite(callback: CallbackQuery) -> None:
         if not AuthService.is_superadmin(callback.from_user.id):
@@ -245,22 +503,18 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
     @router.callback_query(F.data == "faculty|interviewers")
     async def cb_manage_interviewers(callback: CallbackQuery) -> None:
         # Проверяем права доступа
-        async with sessionmaker() as session:
-            admin_dao = FacultyAdminDAO(session)
-            admin = await admin_dao.get_by_telegram_id(callback.from_user.id)
-            
-            if not admin and not AuthService.is_superadmin(callback.from_user.id):
-                await callback.answer("Недоступно", show_alert=True)
-                return
+        admin = await repository.get_admin(callback.from_user.id)
+        if not admin and not AuthService.is_superadmin(callback.from_user.id):
+            await callback.answer("Недоступно", show_alert=True)
+            return
 
         # Если пользователь - админ факультета, показываем собеседующих его факультета
         if admin:
             faculty_id = admin.faculty_id
         else:
             # Если суперадмин, показываем выбор факультета
-            faculty_dao = FacultyDAO(session)
-            faculties = await faculty_dao.get_all()
-            
+            faculties = await faculty_directory.all()
+
             buttons = []
             for faculty in faculties:
                 buttons.append([
@@ -292,12 +546,8 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
 
     async def show_faculty_interviewers(callback: CallbackQuery, faculty_id: int) -> None:
         """Показывает собеседующих факультета"""
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            interviewer_dao = InterviewerDAO(session)
-            
-            faculty = await faculty_dao.get_by_id(faculty_id)
-            interviewers = await interviewer_dao.get_by_faculty(faculty_id)
+        faculty = await faculty_directory.get(faculty_id)
+        interviewers = await repository.list_interviewers(faculty_id)
 
         if not interviewers:
             await callback.message.edit_text(
@@ -352,39 +602,24 @@ def setup_faculty_admin_router(redis_client: RedisClient, gs_client: GSpreadClie
     async def cb_create_interviewer_links(callback: CallbackQuery) -> None:
         faculty_id = int(callback.data.split("|")[1])
         
-        async with sessionmaker() as session:
-            interviewer_dao = InterviewerDAO(session)
-            unregistered = await interviewer_dao.get_unregistered_by_faculty(faculty_id)
+        unregistered = await repository.list_interviewers(faculty_id, unregistered_only=True)
 
         if not unregistered:
             await callback.answer("Все собеседующие уже зарегистрированы", show_alert=True)
             return
 
-        # Создаем ссылки для незарегистрированных собеседующих
+        # Новые токены: в базу - одним UPDATE, в Redis - одним pipeline
+        tokens = {interviewer.id: redis_client.new_invite_token() for interviewer in unregistered}
+        await repository.set_invite_tokens(tokens)
+        await UpdateScope.release_current(repository)
+        await redis_client.store_invite_tokens({
+            tokens[interviewer.id]: (interviewer.id, interviewer.faculty_id) for interviewer in unregistered
+        })
+
+        me = await bot.get_me()
         links_text = "🔗 Ссылки для регистрации собеседующих:\n\n"
-        
         for interviewer in unregistered:
-            # Генерируем токен через Redis
-            token = await redis_client.generate_invite_token(
-                interviewer.id, 
-                interviewer.faculty_id
-            )
-            
-            # Обновляем токен в базе данных
-            async with sessionmaker() as session:
-                from sqlalchemy import update
-                await session.execute(
-                    update(Interviewer)
-                    .where(Interviewer.id == interviewer.id)
-                    .values(invite_token=token)
-                )
-                await session.commit()
-            
-            # Получаем имя бота
-            me = await bot.get_me()
-            bot_username = me.username
-            invite_link = f"https://t.me/{bot_username}?start=inv_{token}"
-            
+            invite_link = f"https://t.me/{me.username}?start=inv_{tokens[interviewer.id]}"
             links_text += f"👤 {interviewer.tab_name} ({interviewer.experience_kind.value}):\n{invite_link}\n\n"
 
         await callback.message.answer(links_text)
@@ -1,11 +1,12 @@
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.filters import CommandStart
 from aiogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from database.dao import InterviewerDAO
-from database.engine import sessionmaker
+from database.repository import Repository, create_repository
 from services.redis_client import RedisClient
 
 
@@ -13,8 +14,12 @@ class InterviewerRegistrationStates(StatesGroup):
     waiting_name_confirmation = State()
 
 
-def setup_interviewer_registration_router(redis_client: RedisClient) -> Router:
+def setup_interviewer_registration_router(
+    redis_client: RedisClient,
+    repository: Optional[Repository] = None,
+) -> Router:
     router = Router()
+    repository = repository or create_repository()
 
     @router.message(CommandStart())
     async def handle_start_command(message: Message, state: FSMContext) -> None:
@@ -50,31 +55,27 @@ def setup_interviewer_registration_router(redis_client: RedisClient) -> Router:
             return
 
         # Проверяем, не зарегистрирован ли уже этот пользователь
-        async with sessionmaker() as session:
-            interviewer_dao = InterviewerDAO(session)
-            existing_interviewer = await interviewer_dao.get_by_telegram_id(message.from_user.id)
-            
-            if existing_interviewer:
-                await message.answer(
-                    f"✅ Вы уже зарегистрированы как собеседующий!\n"
-                    f"Факультет: {existing_interviewer.faculty.title}\n"
-                    f"Тип: {existing_interviewer.experience_kind.value}"
-                )
-                return
+        existing_interviewer = await repository.get_interviewer_by_telegram_id(message.from_user.id)
+        if existing_interviewer:
+            await message.answer(
+                f"✅ Вы уже зарегистрированы как собеседующий!\n"
+                f"Факультет: {existing_interviewer.faculty.title}\n"
+                f"Тип: {existing_interviewer.experience_kind.value}"
+            )
+            return
 
-            # Получаем собеседующего по ID из приглашения
-            interviewer = await interviewer_dao.get_by_invite_token(token)
-            
-            if not interviewer:
-                await message.answer("❌ Собеседующий не найден в базе данных.")
-                return
+        # Получаем собеседующего по ID из приглашения
+        interviewer = await repository.get_interviewer_by_invite_token(token)
+        if not interviewer:
+            await message.answer("❌ Собеседующий не найден в базе данных.")
+            return
 
-            # Проверяем, не зарегистрирован ли уже этот собеседующий
-            if interviewer.tg_id:
-                await message.answer(
-                    "❌ Этот собеседующий уже зарегистрирован другим пользователем."
-                )
-                return
+        # Проверяем, не зарегистрирован ли уже этот собеседующий
+        if interviewer.tg_id:
+            await message.answer(
+                "❌ Этот собеседующий уже зарегистрирован другим пользователем."
+            )
+            return
 
         # Сохраняем данные для подтверждения
         await state.update_data(
@@ -107,13 +108,11 @@ def setup_interviewer_registration_router(redis_client: RedisClient) -> Router:
         interviewer_id = data["interviewer_id"]
         
         # Регистрируем собеседующего
-        async with sessionmaker() as session:
-            interviewer_dao = InterviewerDAO(session)
-            interviewer = await interviewer_dao.register_telegram_user(
-                token,
-                callback.from_user.id,
-                callback.from_user.username
-            )
+        interviewer = await repository.register_interviewer(
+            token,
+            callback.from_user.id,
+            callback.from_user.username
+        )
 
         if interviewer:
             # Удаляем токен из Redis
@@ -1,13 +1,15 @@
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from database.dao import FacultyDAO, FacultyAdminDAO, FacultySheetDAO
-from database.engine import sessionmaker
 from database.models import SheetKind
+from database.repository import Repository, create_repository
 from services.auth import AuthService
+from services.gspread_client import AsyncGSpreadClient
 
 
 class SuperAdminStates(StatesGroup):
@@ -21,8 +23,19 @@ class SuperAdminStates(StatesGroup):
     waiting_svod_sheet = State()
 
 
-def setup_superadmin_router() -> Router:
+def setup_superadmin_router(
+    gs_client: Optional[AsyncGSpreadClient] = None,
+    repository: Optional[Repository] = None,
+) -> Router:
     router = Router()
+    repository = repository or create_repository()
+
+    def sheets() -> AsyncGSpreadClient:
+        # Без общего клиента из main.py создаём один на роутер, а не на каждую команду
+        nonlocal gs_client
+        if gs_client is None:
+            gs_client = AsyncGSpreadClient()
+        return gs_client
 
     def superadmin_menu_kb() -> InlineKeyboardMarkup:
         buttons = [
@@ -54,9 +67,7 @@ def setup_superadmin_router() -> Router:
             await callback.answer("Недоступно")
             return
 
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            faculties = await faculty_dao.get_all()
+        faculties = await repository.list_faculties()
 
         buttons = []
         for faculty in faculties:
@@ -97,9 +108,7 @@ def setup_superadmin_router() -> Router:
         faculty_name = data["faculty_name"]
         faculty_slug = message.text.lower().strip()
 
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            faculty = await faculty_dao.create(faculty_slug, faculty_name)
+        await repository.create_faculty(faculty_slug, faculty_name)
 
         await state.clear()
         await message.answer(f"✅ Факультет '{faculty_name}' успешно создан!")
@@ -111,9 +120,7 @@ def setup_superadmin_router() -> Router:
             await callback.answer("Недоступно")
             return
 
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            faculties = await faculty_dao.get_all()
+        faculties = await repository.list_faculties()
 
         buttons = []
         for faculty in faculties:
@@ -139,12 +146,8 @@ def setup_superadmin_router() -> Router:
 
         faculty_id = int(callback.data.split("|")[1])
 
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            admin_dao = FacultyAdminDAO(session)
-            
-            faculty = await faculty_dao.get_by_id(faculty_id)
-            admins = await admin_dao.get_by_faculty(faculty_id)
+        faculty = await repository.get_faculty(faculty_id)
+        admins = await repository.list_admins(faculty_id)
 
         buttons = []
         for admin in admins:
@@ -182,9 +185,7 @@ def setup_superadmin_router() -> Router:
             data = await state.get_data()
             faculty_id = data["faculty_id"]
 
-            async with sessionmaker() as session:
-                admin_dao = FacultyAdminDAO(session)
-                await admin_dao.create(faculty_id, telegram_id)
+            await repository.add_admin(faculty_id, telegram_id)
 
             await state.clear()
             await message.answer(f"✅ Админ с ID {telegram_id} успешно добавлен!")
@@ -199,9 +200,7 @@ def setup_superadmin_router() -> Router:
             await callback.answer("Недоступно")
             return
 
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            faculties = await faculty_dao.get_all()
+        faculties = await repository.list_faculties()
 
         buttons = []
         for faculty in faculties:
@@ -228,12 +227,8 @@ def setup_superadmin_router() -> Router:
 
         faculty_id = int(callback.data.split("|")[1])
 
-        async with sessionmaker() as session:
-            faculty_dao = FacultyDAO(session)
-            sheet_dao = FacultySheetDAO(session)
-            
-            faculty = await faculty_dao.get_by_id(faculty_id)
-            sheets = await sheet_dao.get_by_faculty(faculty_id)
+        faculty = await repository.get_faculty(faculty_id)
+        sheets = await repository.get_sheets(faculty_id)
 
         # Группируем листы по типу
         ne_opyt_sheet = next((s for s in sheets if s.kind == SheetKind.NE_OPYT), None)
@@ -344,9 +339,7 @@ def setup_superadmin_router() -> Router:
         
         # Проверяем доступ к таблице
         try:
-            from services.gspread_client import GSpreadClient
-            gs_client = GSpreadClient()
-            worksheets = gs_client.list_worksheet_titles(spreadsheet_id)
+            worksheets = await sheets().list_worksheet_titles(spreadsheet_id)
             
             if not worksheets:
                 await message.answer("❌ Не удалось получить доступ к таблице или она пуста.")
@@ -358,19 +351,9 @@ def setup_superadmin_router() -> Router:
         
         # Сохраняем в базу данных
         try:
-            async with sessionmaker() as session:
-                sheet_dao = FacultySheetDAO(session)
-                
-                # Удаляем существующую запись если есть
-                existing_sheet = await sheet_dao.get_by_faculty_and_kind(faculty_id, SheetKind(sheet_kind))
-                if existing_sheet:
-                    await session.execute(
-                        f"DELETE FROM faculty_sheets WHERE id = {existing_sheet.id}"
-                    )
-                
-                # Создаем новую запись
-                await sheet_dao.create(faculty_id, SheetKind(sheet_kind), spreadsheet_id)
-                
+            # Прежняя таблица того же вида заменяется
+            await repository.upsert_sheet(faculty_id, SheetKind(sheet_kind), spreadsheet_id)
+            
             kind_names = {
                 "ne_opyt": "без опыта",
                 "opyt": "с опытом",
@@ -4,13 +4,45 @@
 
 import asyncio
 import os
+from typing import Optional
+
+import asyncpg
 from aiogram import Router, F
 from aiogram.types import Message, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from bot.middlewares.db_scope import DbScopeMiddleware
+from database.models import SheetKind
+from database.repository import AsyncpgRepository, Repository, hot_statements
+from services.faculty_directory import FacultyDirectory
 from services.redis_client import RedisClient
-from services.gspread_client import GSpreadClient
+from services.bulk_import import BulkImportReport, import_all_participants
+from services.gspread_client import AsyncGSpreadClient
+
+
+_FACULTY_STATS_SQL = """
+    SELECT f.title, s.*
+    FROM faculty_stats s
+    JOIN faculties f ON f.id = s.faculty_id
+    ORDER BY f.title
+"""
+
+# Те же счётчики прямым подсчётом, пока init_database не создал faculty_stats
+_LIVE_FACULTY_STATS_SQL = """
+    SELECT
+        f.title,
+        f.id AS faculty_id,
+        (SELECT COUNT(*) FROM participants p WHERE p.faculty_id = f.id AND p.removed_at IS NULL) AS participants,
+        (SELECT COUNT(*) FROM participants p
+         WHERE p.faculty_id = f.id AND p.removed_at IS NULL AND p.tg_id IS NOT NULL) AS participants_registered,
+        (SELECT COUNT(*) FROM interviewers i WHERE i.faculty_id = f.id) AS interviewers,
+        (SELECT COUNT(*) FROM interviewers i
+         WHERE i.faculty_id = f.id AND i.tg_id IS NOT NULL) AS interviewers_registered,
+        (SELECT COUNT(*) FROM faculty_admins a WHERE a.faculty_id = f.id) AS admins
+    FROM faculties f
+    ORDER BY f.title
+"""
 
 
 class SuperAdminStates(StatesGroup):
@@ -77,12 +109,26 @@ def get_sheets_keyboard():
 
 
 class SuperAdminRouter:
-    def __init__(self, db_pool, redis_client: RedisClient, gs_client: GSpreadClient):
+    def __init__(
+        self,
+        db_pool,
+        redis_client: RedisClient,
+        gs_client: AsyncGSpreadClient,
+        repository: Optional[Repository] = None,
+        db_scope: Optional[DbScopeMiddleware] = None,
+        faculty_directory: Optional[FacultyDirectory] = None,
+    ):
         self.db_pool = db_pool
         self.redis_client = redis_client
         self.gs_client = gs_client
+        # Без общего репозитория из main_asyncpg работаем через свой поверх того же пула
+        self.repository = repository or AsyncpgRepository(db_pool)
+        self.db_scope = db_scope
+        self.faculties = faculty_directory or FacultyDirectory(self.repository.list_faculties)
         self.router = Router()
         self.superadmin_id = int(os.getenv("SUPERADMIN_ID", "0"))
+        # Массовый импорт запускается не больше одного раза одновременно
+        self._import_lock = asyncio.Lock()
         self.setup_handlers()
     
     def is_superadmin(self, user_id: int) -> bool:
@@ -96,44 +142,38 @@ class SuperAdminRouter:
             return False
         return True
     
+    def acquire(self):
+        """Соединение апдейта через репозиторий (одно на апдейт под DbScopeMiddleware)"""
+        return self.repository.connection()
+
     async def test_database(self):
         """Тестирует подключение к базе данных"""
         if not self.db_pool:
             return False
             
         try:
-            async with self.db_pool.acquire() as conn:
+            async with self.acquire() as conn:
                 result = await conn.fetchval("SELECT 1")
                 return True
         except Exception as e:
             print(f"❌ Ошибка теста базы данных: {e}")
             return False
     
-    async def get_faculties_count(self):
-        """Получает количество факультетов"""
-        if not self.db_pool:
-            return 0
-            
-        try:
-            async with self.db_pool.acquire() as conn:
-                count = await conn.fetchval("SELECT COUNT(*) FROM faculties")
-                return count or 0
-        except Exception as e:
-            print(f"❌ Ошибка получения количества факультетов: {e}")
-            return 0
-    
-    async def get_admins_count(self):
-        """Получает количество админов"""
+    async def get_faculty_stats(self):
+        """Счётчики факультетов из faculty_stats (их ведут триггеры); пустой список, если база недоступна"""
         if not self.db_pool:
-            return 0
+            return []
             
         try:
-            async with self.db_pool.acquire() as conn:
-                count = await conn.fetchval("SELECT COUNT(*) FROM faculty_admins")
-                return count or 0
+            async with self.acquire() as conn:
+                try:
+                    return await conn.fetch(_FACULTY_STATS_SQL)
+                except asyncpg.UndefinedTableError:
+                    print("⚠️ Таблицы faculty_stats нет, считаю напрямую - запустите init_database.py")
+                    return await conn.fetch(_LIVE_FACULTY_STATS_SQL)
         except Exception as e:
-            print(f"❌ Ошибка получения количества админов: {e}")
-            return 0
+            print(f"❌ Ошибка получения статистики факультетов: {e}")
+            return []
     
     async def cmd_superadmin(self, message: Message):
         """Обработчик входа в панель суперадмина"""
@@ -157,7 +197,11 @@ class SuperAdminRouter:
         if not await self.check_superadmin(message):
             return
             
-        count = await self.get_faculties_count()
+        try:
+            count = len(await self.faculties.all())
+        except Exception as e:
+            print(f"❌ Ошибка получения количества факультетов: {e}")
+            count = 0
         text = (
             f"🏛️ Управление факультетами\n\n"
             f"📊 Всего факультетов: {count}\n\n"
@@ -171,7 +215,7 @@ class SuperAdminRouter:
         if not await self.check_superadmin(message):
             return
             
-        count = await self.get_admins_count()
+        count = sum(row['admins'] for row in await self.get_faculty_stats())
         text = (
             f"👑 Управление администраторами\n\n"
             f"📊 Всего админов: {count}\n\n"
@@ -191,25 +235,24 @@ class SuperAdminRouter:
             return
         
         try:
-            async with self.db_pool.acquire() as conn:
-                faculties = await conn.fetch("SELECT id, title FROM faculties ORDER BY title")
-                
-                if not faculties:
-                    await message.answer("❌ Сначала создайте факультеты", reply_markup=get_admins_keyboard())
-                    return
-                
-                text = (
-                    "👑 Назначение администратора\n\n"
-                    "📱 Введите Telegram ID администратора:"
-                )
-                
-                await message.answer(text, reply_markup=ReplyKeyboardMarkup(
-                    keyboard=[[KeyboardButton(text="❌ Отмена")]],
-                    resize_keyboard=True,
-                    one_time_keyboard=True
-                ))
-                await state.set_state(SuperAdminStates.waiting_admin_telegram_id)
-                
+            faculties = await self.faculties.all()
+            
+            if not faculties:
+                await message.answer("❌ Сначала создайте факультеты", reply_markup=get_admins_keyboard())
+                return
+            
+            text = (
+                "👑 Назначение администратора\n\n"
+                "📱 Введите Telegram ID администратора:"
+            )
+            
+            await message.answer(text, reply_markup=ReplyKeyboardMarkup(
+                keyboard=[[KeyboardButton(text="❌ Отмена")]],
+                resize_keyboard=True,
+                one_time_keyboard=True
+            ))
+            await state.set_state(SuperAdminStates.waiting_admin_telegram_id)
+            
         except Exception as e:
             await message.answer(f"❌ Ошибка: {e}", reply_markup=get_admins_keyboard())
     
@@ -222,22 +265,16 @@ class SuperAdminRouter:
             text = "❌ База данных недоступна"
         else:
             try:
-                async with self.db_pool.acquire() as conn:
-                    admins = await conn.fetch("""
-                        SELECT fa.id, fa.telegram_user_id, f.title as faculty_name
-                        FROM faculty_admins fa
-                        JOIN faculties f ON fa.faculty_id = f.id
-                        ORDER BY f.title
-                    """)
-                    
-                    if admins:
-                        text = "👑 Список администраторов:\n\n"
-                        for i, admin in enumerate(admins, 1):
-                            text += f"{i}. Telegram ID: {admin['telegram_user_id']}\n"
-                            text += f"   🏛️ Факультет: {admin['faculty_name']}\n"
-                            text += f"   📱 ID: {admin['telegram_user_id']}\n\n"
-                    else:
-                        text = "👑 Администраторы не найдены"
+                admins = await self.repository.list_admins()
+                
+                if admins:
+                    text = "👑 Список администраторов:\n\n"
+                    for i, admin in enumerate(admins, 1):
+                        text += f"{i}. Telegram ID: {admin.telegram_user_id}\n"
+                        text += f"   🏛️ Факультет: {admin.faculty.title}\n"
+                        text += f"   📱 ID: {admin.telegram_user_id}\n\n"
+                else:
+                    text = "👑 Администраторы не найдены"
             except Exception as e:
                 text = f"❌ Ошибка получения списка админов: {e}"
         
@@ -286,14 +323,39 @@ class SuperAdminRouter:
             return
             
         db_status = "🟢 Активно" if await self.test_database() else "🔴 Недоступно"
-        faculties_count = await self.get_faculties_count()
-        admins_count = await self.get_admins_count()
+        # Одна выборка из faculty_stats вместо COUNT(*) по таблицам
+        stats = await self.get_faculty_stats()
+        statements = hot_statements.stats()
+        directory = self.faculties.stats()
         
         text = (
             "📈 Статус системы\n\n"
             f"🗄️ База данных: {db_status}\n"
-            f"🏛️ Факультетов: {faculties_count}\n"
-            f"👑 Админов: {admins_count}\n"
+            f"🏛️ Факультетов: {len(stats)}\n"
+            f"👑 Админов: {sum(row['admins'] for row in stats)}\n"
+            f"👥 Участников: {sum(row['participants'] for row in stats)}, "
+            f"в боте {sum(row['participants_registered'] for row in stats)}\n"
+            f"🎙️ Собеседующих: {sum(row['interviewers'] for row in stats)}, "
+            f"ждут регистрации {sum(row['interviewers'] - row['interviewers_registered'] for row in stats)}\n"
+            f"🧾 Подготовленные запросы: {statements['hits']} попаданий, {statements['misses']} промахов\n"
+            f"📚 Справочник факультетов: {directory['hits']} из памяти, {directory['loads']} загрузок\n"
+        )
+        if self.db_scope:
+            scope = self.db_scope.stats()
+            text += (
+                f"⏳ Соединение на апдейт: в среднем {scope['avg_hold_ms']} мс, "
+                f"максимум {scope['max_hold_ms']} мс\n"
+            )
+        if stats:
+            text += "\n📊 По факультетам:\n"
+            for row in stats:
+                text += (
+                    f"• {row['title']}: участников {row['participants']} "
+                    f"(в боте {row['participants_registered']}), "
+                    f"собеседующих {row['interviewers_registered']}/{row['interviewers']}\n"
+                )
+            text += "\n"
+        text += (
             "🤖 Бот: 🟢 Работает\n"
             "🐳 Docker: 🟢 Активен\n"
             "🔌 Redis: 🟢 Доступен\n\n"
@@ -328,18 +390,14 @@ class SuperAdminRouter:
             text = "❌ База данных недоступна"
         else:
             try:
-                async with self.db_pool.acquire() as conn:
-                    faculties = await conn.fetch("SELECT title, description FROM faculties ORDER BY title")
-                    
-                    if faculties:
-                        text = "📋 Список факультетов:\n\n"
-                        for i, faculty in enumerate(faculties, 1):
-                            text += f"{i}. {faculty['title']}\n"
-                            if faculty['description']:
-                                text += f"   📄 {faculty['description']}\n"
-                            text += "\n"
-                    else:
-                        text = "📋 Факультеты не найдены"
+                faculties = await self.repository.list_faculties()
+                
+                if faculties:
+                    text = "📋 Список факультетов:\n\n"
+                    for i, faculty in enumerate(faculties, 1):
+                        text += f"{i}. {faculty.title}\n\n"
+                else:
+                    text = "📋 Факультеты не найдены"
             except Exception as e:
                 text = f"❌ Ошибка получения списка факультетов: {e}"
         
@@ -382,11 +440,78 @@ class SuperAdminRouter:
                     "Проверьте настройки credentials.\n"
                     "Статус: 🔴 Недоступно"
                 )
+
+            stats = self.gs_client.rate_limit_stats()
+            text += (
+                "\n\n⏱️ Лимит запросов:\n"
+                f"• Запросов: {stats['acquired']}\n"
+                f"• Ожидание квоты: {stats['waited_seconds']} с (макс. {stats['max_wait_seconds']} с)\n"
+                f"• Отказов: {stats['rejected']}\n"
+                f"• Повторов: {stats['retries']} (из них 429: {stats['throttled_responses']})"
+            )
+
+            circuit = self.gs_client.circuit_stats()
+            circuit_status = {"closed": "🟢 Замкнута", "open": "🔴 Разомкнута", "half_open": "🟡 Пробный запрос"}
+            text += (
+                f"\n\n🔌 Цепь запросов: {circuit_status[circuit['state']]}\n"
+                f"• Размыканий: {circuit['times_opened']}\n"
+                f"• Отказов без запроса: {circuit['rejected']}\n"
+                f"• Запасные копии: {circuit['stale_entries']} чтений, {circuit['stale_rows']} строк"
+            )
         except Exception as e:
             text = f"❌ Ошибка тестирования Google Sheets: {e}"
         
         await message.answer(text, reply_markup=get_sheets_keyboard())
     
+    async def cmd_import_all(self, message: Message):
+        """Обработчик импорта участников всех факультетов"""
+        if not await self.check_superadmin(message):
+            return
+
+        if not self.db_pool:
+            await message.answer("❌ База данных недоступна", reply_markup=get_sheets_keyboard())
+            return
+        if self._import_lock.locked():
+            await message.answer("⏳ Импорт всех факультетов уже выполняется", reply_markup=get_sheets_keyboard())
+            return
+
+        async with self._import_lock:
+            await message.answer("⏳ Импортирую участников всех факультетов...")
+            try:
+                report = await import_all_participants(self.db_pool, self.gs_client)
+                text = self.format_import_report(report)
+            except Exception as e:
+                text = f"❌ Ошибка импорта: {e}"
+
+        await message.answer(text, reply_markup=get_sheets_keyboard())
+
+    @staticmethod
+    def format_import_report(report: BulkImportReport) -> str:
+        """Текст отчёта массового импорта"""
+        text = (
+            "🔄 Импорт участников завершён\n\n"
+            f"✅ Успешно: {len(report.succeeded)}\n"
+            f"💤 Без изменений: {len(report.unchanged)}\n"
+            f"❌ С ошибками: {len(report.failed)}\n"
+            f"⏭️ Без сводной таблицы: {len(report.skipped)}\n"
+            f"👥 Участников в таблицах: {report.total}\n"
+            f"⏱️ Время: {report.duration:.1f} с\n"
+        )
+        for faculty in report.faculties:
+            if faculty.skipped:
+                continue
+            if faculty.error:
+                text += f"\n❌ {faculty.title}: {faculty.error}"
+            elif faculty.unchanged:
+                text += f"\n💤 {faculty.title}: таблица не менялась"
+            else:
+                text += (
+                    f"\n✅ {faculty.title}: {faculty.total} "
+                    f"(+{faculty.inserted} ~{faculty.changed} -{faculty.deleted}), {faculty.duration:.1f} с"
+                )
+        # Лимит длины сообщения Telegram
+        return text if len(text) <= 4000 else text[:3990] + "\n..."
+
     async def cmd_back_to_superadmin(self, message: Message):
         """Обработчик возврата к суперадмину"""
         await self.cmd_superadmin(message)
@@ -447,21 +572,18 @@ class SuperAdminRouter:
                 await state.clear()
                 return
             
-            async with self.db_pool.acquire() as conn:
-                faculty_id = await conn.fetchval("""
-                    INSERT INTO faculties (slug, title, description) 
-                    VALUES ($1, $2, $3)
-                    RETURNING id
-                """, f"faculty-{faculty_name.lower().replace(' ', '-')}", faculty_name, faculty_description)
-                
-                text = (
-                    f"✅ Факультет создан успешно!\n\n"
-                    f"📝 Название: {faculty_name}\n"
-                    f"📄 Описание: {faculty_description or 'Не указано'}\n"
-                    f"🆔 ID: {faculty_id}"
-                )
-                
-                await message.answer(text, reply_markup=get_faculties_keyboard())
+            faculty = await self.repository.create_faculty(
+                f"faculty-{faculty_name.lower().replace(' ', '-')}", faculty_name
+            )
+            
+            text = (
+                f"✅ Факультет создан успешно!\n\n"
+                f"📝 Название: {faculty.title}\n"
+                f"📄 Описание: {faculty_description or 'Не указано'}\n"
+                f"🆔 ID: {faculty.id}"
+            )
+            
+            await message.answer(text, reply_markup=get_faculties_keyboard())
                 
         except Exception as e:
             if "unique constraint" in str(e).lower():
@@ -504,21 +626,20 @@ class SuperAdminRouter:
             return
         
         try:
-            async with self.db_pool.acquire() as conn:
-                faculties = await conn.fetch("SELECT id, title FROM faculties ORDER BY title")
-                
-                if not faculties:
-                    await message.answer("❌ Сначала создайте факультеты", reply_markup=get_sheets_keyboard())
-                    await state.clear()
-                    return
-                
-                text = "🏛️ Выберите факультет для привязки таблицы:\n\n"
-                for i, faculty in enumerate(faculties, 1):
-                    text += f"{i}. {faculty['title']}\n"
-                
-                await message.answer(text)
-                await state.set_state(SuperAdminStates.waiting_faculty_for_sheet)
-                
+            faculties = await self.faculties.all()
+            
+            if not faculties:
+                await message.answer("❌ Сначала создайте факультеты", reply_markup=get_sheets_keyboard())
+                await state.clear()
+                return
+            
+            text = "🏛️ Выберите факультет для привязки таблицы:\n\n"
+            for i, faculty in enumerate(faculties, 1):
+                text += f"{i}. {faculty.title}\n"
+            
+            await message.answer(text)
+            await state.set_state(SuperAdminStates.waiting_faculty_for_sheet)
+            
         except Exception as e:
             await message.answer(f"❌ Ошибка получения факультетов: {e}", reply_markup=get_sheets_keyboard())
             await state.clear()
@@ -533,42 +654,28 @@ class SuperAdminRouter:
             await message.answer("❌ Добавление таблицы отменено", reply_markup=get_sheets_keyboard())
             return
         
-        # Получаем список факультетов
+        # Ищем факультет по номеру из списка или названию
         try:
-            async with self.db_pool.acquire() as conn:
-                faculties = await conn.fetch("SELECT id, title FROM faculties ORDER BY title")
-                
-                # Пытаемся найти факультет по номеру или названию
-                faculty = None
-                try:
-                    faculty_num = int(message.text)
-                    if 1 <= faculty_num <= len(faculties):
-                        faculty = faculties[faculty_num - 1]
-                except ValueError:
-                    # Поиск по названию
-                    for f in faculties:
-                        if f['title'].lower() == message.text.lower():
-                            faculty = f
-                            break
-                
-                if not faculty:
-                    await message.answer("❌ Факультет не найден. Попробуйте снова:")
-                    return
-                
-                # Сохраняем ID факультета
-                await state.update_data(faculty_id=faculty['id'], faculty_name=faculty['title'])
-                
-                text = (
-                    f"🏛️ Факультет: {faculty['title']}\n\n"
-                    "📊 Выберите тип таблицы:\n"
-                    "1. ne_opyt - Без опыта\n"
-                    "2. opyt - С опытом\n"
-                    "3. svod - Сводная"
-                )
-                
-                await message.answer(text)
-                await state.set_state(SuperAdminStates.waiting_sheet_type)
-                
+            faculty = await self.faculties.resolve(message.text)
+            
+            if not faculty:
+                await message.answer("❌ Факультет не найден. Попробуйте снова:")
+                return
+            
+            # Сохраняем ID факультета
+            await state.update_data(faculty_id=faculty.id, faculty_name=faculty.title)
+            
+            text = (
+                f"🏛️ Факультет: {faculty.title}\n\n"
+                "📊 Выберите тип таблицы:\n"
+                "1. ne_opyt - Без опыта\n"
+                "2. opyt - С опытом\n"
+                "3. svod - Сводная"
+            )
+            
+            await message.answer(text)
+            await state.set_state(SuperAdminStates.waiting_sheet_type)
+            
         except Exception as e:
             await message.answer(f"❌ Ошибка: {e}", reply_markup=get_sheets_keyboard())
             await state.clear()
@@ -606,22 +713,20 @@ class SuperAdminRouter:
         
         # Сохраняем таблицу в базу данных
         try:
-            async with self.db_pool.acquire() as conn:
-                await conn.execute("""
-                    INSERT INTO faculty_sheets (faculty_id, kind, spreadsheet_id, sheet_name)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (faculty_id, kind) 
-                    DO UPDATE SET spreadsheet_id = EXCLUDED.spreadsheet_id, sheet_name = EXCLUDED.sheet_name
-                """, faculty_id, sheet_type, sheet_id, sheet_type)
-                
-                text = (
-                    f"✅ Таблица добавлена успешно!\n\n"
-                    f"🏛️ Факультет: {faculty_name}\n"
-                    f"📊 Тип: {sheet_type}\n"
-                    f"🔗 Ссылка: {sheet_link}"
-                )
-                
-                await message.answer(text, reply_markup=get_sheets_keyboard())
+            await self.repository.upsert_sheet(faculty_id, SheetKind(sheet_type), sheet_id, sheet_type)
+
+            # Таблица могла быть перепривязана - сбрасываем закэшированные метаданные
+            if self.gs_client:
+                self.gs_client.invalidate(sheet_id)
+
+            text = (
+                f"✅ Таблица добавлена успешно!\n\n"
+                f"🏛️ Факультет: {faculty_name}\n"
+                f"📊 Тип: {sheet_type}\n"
+                f"🔗 Ссылка: {sheet_link}"
+            )
+            
+            await message.answer(text, reply_markup=get_sheets_keyboard())
                 
         except Exception as e:
             await message.answer(f"❌ Ошибка сохранения таблицы: {e}", reply_markup=get_sheets_keyboard())
@@ -649,30 +754,26 @@ class SuperAdminRouter:
         
         # Проверяем, не назначен ли уже этот пользователь админом
         try:
-            async with self.db_pool.acquire() as conn:
-                existing_admin = await conn.fetchval(
-                    "SELECT id FROM faculty_admins WHERE telegram_user_id = $1", 
-                    telegram_id
-                )
-                
-                if existing_admin:
-                    await message.answer(
-                        f"❌ Пользователь с ID {telegram_id} уже назначен администратором!",
-                        reply_markup=get_admins_keyboard()
-                    )
-                    await state.clear()
-                    return
-                
-                # Сохраняем Telegram ID
-                await state.update_data(telegram_id=telegram_id)
-                
-                text = (
-                    f"📱 Telegram ID: {telegram_id}\n\n"
-                    "👤 Введите имя администратора:"
+            existing_admin = await self.repository.get_admin(telegram_id)
+            
+            if existing_admin:
+                await message.answer(
+                    f"❌ Пользователь с ID {telegram_id} уже назначен администратором!",
+                    reply_markup=get_admins_keyboard()
                 )
-                
-                await message.answer(text)
-                await state.set_state(SuperAdminStates.waiting_admin_name)
+                await state.clear()
+                return
+            
+            # Сохраняем Telegram ID
+            await state.update_data(telegram_id=telegram_id)
+            
+            text = (
+                f"📱 Telegram ID: {telegram_id}\n\n"
+                "👤 Введите имя администратора:"
+            )
+            
+            await message.answer(text)
+            await state.set_state(SuperAdminStates.waiting_admin_name)
                 
         except Exception as e:
             await message.answer(f"❌ Ошибка: {e}", reply_markup=get_admins_keyboard())
@@ -698,16 +799,15 @@ class SuperAdminRouter:
         
         # Получаем список факультетов
         try:
-            async with self.db_pool.acquire() as conn:
-                faculties = await conn.fetch("SELECT id, title FROM faculties ORDER BY title")
-                
-                text = f"👤 Имя: {admin_name}\n\n🏛️ Выберите факультет:\n\n"
-                for i, faculty in enumerate(faculties, 1):
-                    text += f"{i}. {faculty['title']}\n"
-                
-                await message.answer(text)
-                await state.set_state(SuperAdminStates.waiting_admin_faculty)
-                
+            faculties = await self.faculties.all()
+            
+            text = f"👤 Имя: {admin_name}\n\n🏛️ Выберите факультет:\n\n"
+            for i, faculty in enumerate(faculties, 1):
+                text += f"{i}. {faculty.title}\n"
+            
+            await message.answer(text)
+            await state.set_state(SuperAdminStates.waiting_admin_faculty)
+            
         except Exception as e:
             await message.answer(f"❌ Ошибка получения факультетов: {e}", reply_markup=get_admins_keyboard())
             await state.clear()
@@ -723,48 +823,31 @@ class SuperAdminRouter:
             return
         
         try:
-            async with self.db_pool.acquire() as conn:
-                faculties = await conn.fetch("SELECT id, title FROM faculties ORDER BY title")
-                
-                # Пытаемся найти факультет по номеру или названию
-                faculty = None
-                try:
-                    faculty_num = int(message.text)
-                    if 1 <= faculty_num <= len(faculties):
-                        faculty = faculties[faculty_num - 1]
-                except ValueError:
-                    # Поиск по названию
-                    for f in faculties:
-                        if f['title'].lower() == message.text.lower():
-                            faculty = f
-                            break
-                
-                if not faculty:
-                    await message.answer("❌ Факультет не найден. Попробуйте снова:")
-                    return
-                
-                # Получаем данные из состояния
-                data = await state.get_data()
-                telegram_id = data.get('telegram_id')
-                admin_name = data.get('admin_name')
-                
-                # Создаем администратора в базе данных
-                admin_id = await conn.fetchval("""
-                    INSERT INTO faculty_admins (faculty_id, telegram_user_id) 
-                    VALUES ($1, $2)
-                    RETURNING id
-                """, faculty['id'], telegram_id)
-                
-                text = (
-                    f"✅ Администратор назначен успешно!\n\n"
-                    f"👤 Имя: {admin_name}\n"
-                    f"📱 Telegram ID: {telegram_id}\n"
-                    f"🏛️ Факультет: {faculty['title']}\n"
-                    f"🆔 ID: {admin_id}"
-                )
-                
-                await message.answer(text, reply_markup=get_admins_keyboard())
-                
+            # Ищем факультет по номеру из списка или названию
+            faculty = await self.faculties.resolve(message.text)
+            
+            if not faculty:
+                await message.answer("❌ Факультет не найден. Попробуйте снова:")
+                return
+            
+            # Получаем данные из состояния
+            data = await state.get_data()
+            telegram_id = data.get('telegram_id')
+            admin_name = data.get('admin_name')
+            
+            # Создаем администратора в базе данных
+            admin = await self.repository.add_admin(faculty.id, telegram_id)
+            
+            text = (
+                f"✅ Администратор назначен успешно!\n\n"
+                f"👤 Имя: {admin_name}\n"
+                f"📱 Telegram ID: {telegram_id}\n"
+                f"🏛️ Факультет: {faculty.title}\n"
+                f"🆔 ID: {admin.id}"
+            )
+            
+            await message.answer(text, reply_markup=get_admins_keyboard())
+            
         except Exception as e:
             if "unique constraint" in str(e).lower():
                 await message.answer("❌ Этот пользователь уже назначен администратором!", reply_markup=get_admins_keyboard())
@@ -794,6 +877,7 @@ class SuperAdminRouter:
         # Управление Google Sheets
         self.router.message.register(self.cmd_add_sheet_link, F.text == "🔗 Добавить ссылку")
         self.router.message.register(self.cmd_test_sheets, F.text == "🧪 Тест подключения")
+        self.router.message.register(self.cmd_import_all, F.text == "🔄 Обновить данные")
         
         # FSM состояния для создания факультетов
         self.router.message.register(self.process_faculty_name, SuperAdminStates.waiting_faculty_name)
@@ -818,7 +902,14 @@ class SuperAdminRouter:
         return self.router
 
 
-def setup_superadmin_router(db_pool, redis_client: RedisClient, gs_client: GSpreadClient):
+def setup_superadmin_router(
+    db_pool,
+    redis_client: RedisClient,
+    gs_client: AsyncGSpreadClient,
+    repository: Optional[Repository] = None,
+    db_scope: Optional[DbScopeMiddleware] = None,
+    faculty_directory: Optional[FacultyDirectory] = None,
+):
     """Создает и настраивает роутер суперадмина"""
-    superadmin_router = SuperAdminRouter(db_pool, redis_client, gs_client)
+    superadmin_router = SuperAdminRouter(db_pool, redis_client, gs_client, repository, db_scope, faculty_directory)
     return superadmin_router.get_router()
@@ -60,7 +60,7 @@ async def check_database():
         print(f"  👥 Собеседующих: {interviewers_count}")
         
         # Участники
-        participants_count = await conn.fetchval("SELECT COUNT(*) FROM participants")
+        participants_count = await conn.fetchval("SELECT COUNT(*) FROM participants WHERE removed_at IS NULL")
         print(f"  👤 Участников: {participants_count}")
         
         print("\n✅ База данных готова к работе!")
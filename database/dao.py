@@ -1,9 +1,35 @@
-from typing import List, Optional
-from sqlalchemy import select, update, delete
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from .models import Faculty, FacultyAdmin, FacultySheet, Interviewer, Participant, SheetKind
+from .models import (
+    Faculty,
+    FacultyAdmin,
+    FacultyAvailability,
+    FacultySheet,
+    Interviewer,
+    InterviewerAvailability,
+    Participant,
+    SheetKind,
+    SheetTabState,
+)
+
+# Rows per multi-row INSERT; keeps bind parameters well below the PostgreSQL limit
+UPSERT_CHUNK_SIZE = 1000
+
+# Bumped after every write to faculties; in-process copies of the table reload when it changes
+_faculties_generation = 0
+
+
+def faculties_generation() -> int:
+    return _faculties_generation
+
+
+def mark_faculties_changed() -> None:
+    global _faculties_generation
+    _faculties_generation += 1
 
 
 class BaseDAO:
@@ -16,6 +42,7 @@ class FacultyDAO(BaseDAO):
         faculty = Faculty(slug=slug, title=title, is_active=is_active)
         self.session.add(faculty)
         await self.session.commit()
+        mark_faculties_changed()
         await self.session.refresh(faculty)
         return faculty
 
@@ -40,6 +67,7 @@ class FacultyDAO(BaseDAO):
             update(Faculty).where(Faculty.id == faculty_id).values(**kwargs)
         )
         await self.session.commit()
+        mark_faculties_changed()
         return await self.get_by_id(faculty_id)
 
     async def delete(self, faculty_id: int) -> bool:
@@ -47,6 +75,7 @@ class FacultyDAO(BaseDAO):
             delete(Faculty).where(Faculty.id == faculty_id)
         )
         await self.session.commit()
+        mark_faculties_changed()
         return result.rowcount > 0
 
 
@@ -78,6 +107,12 @@ class FacultyAdminDAO(BaseDAO):
         )
         return list(result.scalars().all())
 
+    async def get_all(self) -> List[FacultyAdmin]:
+        result = await self.session.execute(
+            select(FacultyAdmin).options(selectinload(FacultyAdmin.faculty))
+        )
+        return list(result.scalars().all())
+
     async def is_superadmin(self, telegram_user_id: int) -> bool:
         result = await self.session.execute(
             select(FacultyAdmin.is_superadmin)
@@ -106,6 +141,28 @@ class FacultySheetDAO(BaseDAO):
         await self.session.refresh(sheet)
         return sheet
 
+    async def upsert(
+        self, faculty_id: int, kind: SheetKind, spreadsheet_id: str, sheet_name: Optional[str] = None
+    ) -> FacultySheet:
+        """Binds a spreadsheet to the faculty, replacing the previous one of the same kind"""
+        stmt = pg_insert(FacultySheet).values(
+            faculty_id=faculty_id, kind=kind, spreadsheet_id=spreadsheet_id, sheet_name=sheet_name
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FacultySheet.faculty_id, FacultySheet.kind],
+            set_={
+                "spreadsheet_id": stmt.excluded.spreadsheet_id,
+                "sheet_name": stmt.excluded.sheet_name,
+                # The new spreadsheet has not been imported yet
+                "synced_revision": None,
+            },
+        ).returning(FacultySheet)
+        result = await self.session.execute(stmt.execution_options(populate_existing=True))
+        sheet = result.scalar_one()
+        await self.session.commit()
+        await self.session.refresh(sheet)
+        return sheet
+
     async def get_by_faculty_and_kind(self, faculty_id: int, kind: SheetKind) -> Optional[FacultySheet]:
         result = await self.session.execute(
             select(FacultySheet)
@@ -121,6 +178,63 @@ class FacultySheetDAO(BaseDAO):
         )
         return list(result.scalars().all())
 
+    async def get_all(self) -> List[FacultySheet]:
+        result = await self.session.execute(select(FacultySheet))
+        return list(result.scalars().all())
+
+    async def set_synced_revision(self, sheet_id: int, revision: str) -> None:
+        await self.session.execute(
+            update(FacultySheet).where(FacultySheet.id == sheet_id).values(synced_revision=revision)
+        )
+        await self.session.commit()
+
+
+class ParticipantDAO(BaseDAO):
+    async def count_by_faculty(self, faculty_id: int) -> int:
+        result = await self.session.execute(
+            select(func.count()).select_from(Participant)
+            .where(Participant.faculty_id == faculty_id)
+            .where(Participant.removed_at.is_(None))
+        )
+        return result.scalar_one()
+
+    async def get_registration_status(self, faculty_id: int) -> Dict[int, bool]:
+        """vk_id -> whether the participant has linked a Telegram account"""
+        result = await self.session.execute(
+            select(Participant.vk_id, Participant.tg_id.is_not(None))
+            .where(Participant.faculty_id == faculty_id)
+            .where(Participant.removed_at.is_(None))
+        )
+        return {vk_id: registered for vk_id, registered in result.all()}
+
+
+class SheetTabStateDAO(BaseDAO):
+    async def get(self, faculty_sheet_id: int, tab_name: str) -> Optional[SheetTabState]:
+        result = await self.session.execute(
+            select(SheetTabState)
+            .where(SheetTabState.faculty_sheet_id == faculty_sheet_id)
+            .where(SheetTabState.tab_name == tab_name)
+        )
+        return result.scalar_one_or_none()
+
+    async def save(self, faculty_sheet_id: int, tab_name: str, content_hash: str, row_count: int) -> None:
+        stmt = pg_insert(SheetTabState).values(
+            faculty_sheet_id=faculty_sheet_id,
+            tab_name=tab_name,
+            content_hash=content_hash,
+            row_count=row_count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SheetTabState.faculty_sheet_id, SheetTabState.tab_name],
+            set_={
+                "content_hash": stmt.excluded.content_hash,
+                "row_count": stmt.excluded.row_count,
+                "synced_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
 
 class InterviewerDAO(BaseDAO):
     async def create(self, faculty_id: int, faculty_sheet_id: int, tab_name: str, 
@@ -137,6 +251,42 @@ class InterviewerDAO(BaseDAO):
         await self.session.refresh(interviewer)
         return interviewer
 
+    async def create_many(self, rows: Sequence[Dict]) -> List[Tuple[int, str, str]]:
+        """Inserts interviewers with multi-row INSERT ... ON CONFLICT DO NOTHING.
+
+        Each row dict carries faculty_id, faculty_sheet_id, tab_name, experience_kind
+        and invite_token. Returns (id, tab_name, invite_token) of the rows actually
+        inserted; tabs added concurrently by someone else are skipped.
+        """
+        created: List[Tuple[int, str, str]] = []
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = (
+                pg_insert(Interviewer)
+                .values(list(rows[start:start + UPSERT_CHUNK_SIZE]))
+                .on_conflict_do_nothing(index_elements=[Interviewer.faculty_sheet_id, Interviewer.tab_name])
+                .returning(Interviewer.id, Interviewer.tab_name, Interviewer.invite_token)
+            )
+            result = await self.session.execute(stmt)
+            created.extend(tuple(row) for row in result.all())
+        await self.session.commit()
+        return created
+
+    async def set_invite_tokens(self, tokens: Dict[int, str]) -> None:
+        """Bulk UPDATE of invite tokens by primary key (interviewer_id -> token)"""
+        if not tokens:
+            return
+        await self.session.execute(
+            update(Interviewer),
+            [{"id": interviewer_id, "invite_token": token} for interviewer_id, token in tokens.items()],
+        )
+        await self.session.commit()
+
+    async def get_tab_names(self, faculty_id: int) -> Set[str]:
+        result = await self.session.execute(
+            select(Interviewer.tab_name).where(Interviewer.faculty_id == faculty_id)
+        )
+        return set(result.scalars().all())
+
     async def get_by_invite_token(self, invite_token: str) -> Optional[Interviewer]:
         result = await self.session.execute(
             select(Interviewer)
@@ -193,3 +343,52 @@ class InterviewerDAO(BaseDAO):
         )
         await self.session.commit()
         return result.rowcount > 0
+
+
+class AvailabilityDAO(BaseDAO):
+    async def get(self, faculty_id: int) -> Optional[Tuple[FacultyAvailability, Dict[int, bytes]]]:
+        """Slot axis of the faculty matrix and interviewer_id -> free slot bitset"""
+        availability = await self.session.get(FacultyAvailability, faculty_id)
+        if availability is None:
+            return None
+        result = await self.session.execute(
+            select(InterviewerAvailability.interviewer_id, InterviewerAvailability.free_mask)
+            .where(InterviewerAvailability.faculty_id == faculty_id)
+        )
+        return availability, {interviewer_id: mask for interviewer_id, mask in result.all()}
+
+    async def replace(
+        self,
+        faculty_id: int,
+        slot_days: Sequence[str],
+        slot_times: Sequence[str],
+        masks: Dict[int, Tuple[bytes, int]],
+    ) -> None:
+        """Replaces the whole faculty matrix in a single transaction.
+
+        masks maps interviewer_id to (free slot bitset, number of free slots).
+        """
+        stmt = pg_insert(FacultyAvailability).values(
+            faculty_id=faculty_id,
+            slot_days=list(slot_days),
+            slot_times=list(slot_times),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FacultyAvailability.faculty_id],
+            set_={
+                "slot_days": stmt.excluded.slot_days,
+                "slot_times": stmt.excluded.slot_times,
+                "synced_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.execute(
+            delete(InterviewerAvailability).where(InterviewerAvailability.faculty_id == faculty_id)
+        )
+        rows = [
+            {"interviewer_id": interviewer_id, "faculty_id": faculty_id, "free_mask": mask, "free_count": count}
+            for interviewer_id, (mask, count) in masks.items()
+        ]
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            await self.session.execute(pg_insert(InterviewerAvailability).values(rows[start:start + UPSERT_CHUNK_SIZE]))
+        await self.session.commit()
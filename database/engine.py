@@ -6,6 +6,8 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set in environment variables")
+# docker-compose задаёт URL в виде для main_asyncpg; SQLAlchemy понимает только postgresql+asyncpg://
+DATABASE_URL = DATABASE_URL.replace("asyncpg+postgresql://", "postgresql+asyncpg://")
 
 engine = create_async_engine(DATABASE_URL, echo=True)
 sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
\ No newline at end of file
@@ -3,15 +3,21 @@ from __future__ import annotations
 import enum
 from typing import List, Optional
 
+from datetime import datetime
+
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    DateTime,
     Enum,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     UniqueConstraint,
+    func,
 )
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -77,6 +83,8 @@ class FacultySheet(Base):
     spreadsheet_id: Mapped[str] = mapped_column(String(128), nullable=False)
     # Optional individual sheet/tab names if needed; can be kept as the default
     sheet_name: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    # Drive revision of the spreadsheet as of the last successful participant import
+    synced_revision: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     faculty: Mapped[Faculty] = relationship(back_populates="sheets")
 
@@ -106,11 +114,37 @@ class Participant(Base):
     source_sheet_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("faculty_sheets.id", ondelete="SET NULL"), nullable=True
     )
+    # Fingerprint of the imported sheet row, used to detect changes on re-import
+    row_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    # Set when the row disappears from the sheet; the row and its Telegram link are kept
+    removed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     faculty: Mapped[Faculty] = relationship(back_populates="participants")
     source_sheet: Mapped[Optional[FacultySheet]] = relationship()
 
 
+class SheetTabState(Base):
+    __tablename__ = "sheet_tab_states"
+    __table_args__ = (
+        UniqueConstraint("faculty_sheet_id", "tab_name", name="uq_sheet_tab_state"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    faculty_sheet_id: Mapped[int] = mapped_column(
+        ForeignKey("faculty_sheets.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    tab_name: Mapped[str] = mapped_column(String(128), nullable=False)
+
+    # Fingerprint of the whole tab as of the last successful sync
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    sheet: Mapped[FacultySheet] = relationship()
+
+
 class Interviewer(Base):
     __tablename__ = "interviewers"
     __table_args__ = (
@@ -148,11 +182,44 @@ class Interviewer(Base):
     sheet: Mapped[FacultySheet] = relationship()
 
 
+class FacultyAvailability(Base):
+    __tablename__ = "faculty_availability"
+
+    faculty_id: Mapped[int] = mapped_column(
+        ForeignKey("faculties.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    # Slot axis of the availability matrix: bit i of every mask is (slot_days[i], slot_times[i])
+    slot_days: Mapped[List[str]] = mapped_column(ARRAY(String(64)), nullable=False)
+    slot_times: Mapped[List[str]] = mapped_column(ARRAY(String(32)), nullable=False)
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class InterviewerAvailability(Base):
+    __tablename__ = "interviewer_availability"
+
+    interviewer_id: Mapped[int] = mapped_column(
+        ForeignKey("interviewers.id", ondelete="CASCADE"), primary_key=True
+    )
+    faculty_id: Mapped[int] = mapped_column(
+        ForeignKey("faculties.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+
+    # Free slots as a little-endian bitset over FacultyAvailability slots (get_bit() friendly)
+    free_mask: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    free_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 __all__ = [
     "SheetKind",
     "Faculty",
     "FacultyAdmin",
     "FacultySheet",
     "Participant",
+    "SheetTabState",
     "Interviewer",
+    "FacultyAvailability",
+    "InterviewerAvailability",
 ]
@@ -0,0 +1,81 @@
+"""
+Реестр подготовленных запросов для горячих выборок.
+
+Каждое соединение пула один раз, при создании, готовит все запросы
+реестра (хук init у asyncpg.create_pool), а дальше обработчики выполняют
+уже готовый план без разбора и планирования SQL. Запрос к таблице или
+колонке, которой ещё нет в схеме, при создании пропускается и готовится
+при первом обращении, поэтому недоделанная схема не ломает создание пула.
+Попадания и промахи считаются по каждому запросу.
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Mapping, Optional
+
+import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
+
+
+class PreparedConnection(asyncpg.Connection):
+    """Соединение пула со своими подготовленными запросами"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: Dict[str, PreparedStatement] = {}
+
+
+class StatementRegistry:
+    def __init__(self, queries: Mapping[str, str]) -> None:
+        self.queries = dict(queries)
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def pool_options(self) -> Dict[str, Any]:
+        """Аргументы для asyncpg.create_pool, чтобы соединения готовили запросы при создании"""
+        return {"connection_class": PreparedConnection, "init": self.prepare_all}
+
+    async def prepare_all(self, conn: asyncpg.Connection) -> None:
+        for name in self.queries:
+            try:
+                await self._prepare(conn, name)
+            except (asyncpg.UndefinedTableError, asyncpg.UndefinedColumnError) as e:
+                print(f"⚠️ Запрос {name} не подготовлен заранее: {e}")
+
+    async def _prepare(self, conn: asyncpg.Connection, name: str) -> Optional[PreparedStatement]:
+        cache = getattr(conn, "prepared_statements", None)
+        if cache is None:
+            # Пул создан без pool_options() - хранить готовый запрос негде
+            return None
+        statement = cache[name] = await conn.prepare(self.queries[name])
+        return statement
+
+    async def _run(self, conn: asyncpg.Connection, method: str, name: str, *args: Any) -> Any:
+        cache = getattr(conn, "prepared_statements", None)
+        statement = cache.get(name) if cache is not None else None
+        if statement is None:
+            self.misses[name] += 1
+            statement = await self._prepare(conn, name)
+            if statement is None:
+                return await getattr(conn, method)(self.queries[name], *args)
+        else:
+            self.hits[name] += 1
+        try:
+            return await getattr(statement, method)(*args)
+        except (asyncpg.exceptions.InvalidCachedStatementError, asyncpg.exceptions.FeatureNotSupportedError):
+            # Схема таблицы изменилась после подготовки - готовим заново
+            self.misses[name] += 1
+            statement = await self._prepare(conn, name)
+            return await getattr(statement, method)(*args)
+
+    async def fetch(self, conn: asyncpg.Connection, name: str, *args: Any) -> List[asyncpg.Record]:
+        return await self._run(conn, "fetch", name, *args)
+
+    async def fetchrow(self, conn: asyncpg.Connection, name: str, *args: Any) -> Optional[asyncpg.Record]:
+        return await self._run(conn, "fetchrow", name, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "by_statement": {name: (self.hits[name], self.misses[name]) for name in self.queries},
+        }
@@ -13,6 +13,120 @@ import asyncpg
 # Загружаем переменные окружения
 load_dotenv()
 
+# Счётчики экрана статуса по таблицам: колонка faculty_stats -> вклад одной строки
+FACULTY_STATS_COUNTERS = {
+    "participants": {
+        "participants": "(removed_at IS NULL)::int",
+        "participants_registered": "(removed_at IS NULL AND tg_id IS NOT NULL)::int",
+    },
+    "interviewers": {"interviewers": "1", "interviewers_registered": "(tg_id IS NOT NULL)::int"},
+    "faculty_admins": {"admins": "1"},
+}
+
+
+def faculty_stats_trigger_sql(table, counters):
+    """Функция и триггеры, которые переносят изменения таблицы в faculty_stats.
+
+    Триггеры срабатывают один раз на оператор и видят все затронутые строки
+    через таблицы переходов, поэтому загрузка тысяч участников обновляет
+    строку факультета одним UPDATE в той же транзакции.
+    """
+    columns = list(counters)
+    added = ", ".join(f"{expr} AS {column}" for column, expr in counters.items())
+    removed = ", ".join(f"-{expr} AS {column}" for column, expr in counters.items())
+    sources = {
+        "INSERT": f"SELECT faculty_id, {added} FROM new_rows",
+        "DELETE": f"SELECT faculty_id, {removed} FROM old_rows",
+        "UPDATE": (
+            f"SELECT faculty_id, {added} FROM new_rows "
+            f"UNION ALL SELECT faculty_id, {removed} FROM old_rows"
+        ),
+    }
+    branches = []
+    for op, source in sources.items():
+        branches.append(f"""
+        {"IF" if op == "INSERT" else "ELSIF"} TG_OP = '{op}' THEN
+            UPDATE faculty_stats AS s SET
+                {", ".join(f"{c} = s.{c} + d.{c}" for c in columns)},
+                updated_at = CURRENT_TIMESTAMP
+            FROM (
+                SELECT faculty_id, {", ".join(f"sum({c}) AS {c}" for c in columns)}
+                FROM ({source}) AS changes
+                GROUP BY faculty_id
+            ) AS d
+            WHERE s.faculty_id = d.faculty_id AND ({" OR ".join(f"d.{c} <> 0" for c in columns)});""")
+    statements = [f"""
+        CREATE OR REPLACE FUNCTION faculty_stats_{table}() RETURNS trigger AS $$
+        BEGIN{"".join(branches)}
+        END IF;
+        RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """]
+    referencing = {
+        "INSERT": "NEW TABLE AS new_rows",
+        "UPDATE": "NEW TABLE AS new_rows OLD TABLE AS old_rows",
+        "DELETE": "OLD TABLE AS old_rows",
+    }
+    for op, transition in referencing.items():
+        trigger = f"faculty_stats_{table}_{op.lower()}"
+        statements.append(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+        statements.append(
+            f"CREATE TRIGGER {trigger} AFTER {op} ON {table} REFERENCING {transition} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION faculty_stats_{table}()"
+        )
+    return statements
+
+
+async def create_faculty_stats(conn):
+    """Таблица faculty_stats, триггеры и пересчёт счётчиков по текущим данным"""
+    columns = [column for counters in FACULTY_STATS_COUNTERS.values() for column in counters]
+    async with conn.transaction():
+        await conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS faculty_stats (
+                faculty_id INTEGER PRIMARY KEY REFERENCES faculties(id) ON DELETE CASCADE,
+                {", ".join(f"{column} INTEGER DEFAULT 0 NOT NULL" for column in columns)},
+                updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL
+            )
+        """)
+        # Строка счётчиков появляется вместе с факультетом
+        await conn.execute("""
+            CREATE OR REPLACE FUNCTION faculty_stats_faculties() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO faculty_stats (faculty_id) SELECT id FROM new_rows ON CONFLICT DO NOTHING;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        await conn.execute("DROP TRIGGER IF EXISTS faculty_stats_faculties_insert ON faculties")
+        await conn.execute("""
+            CREATE TRIGGER faculty_stats_faculties_insert AFTER INSERT ON faculties
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION faculty_stats_faculties()
+        """)
+        for table, counters in FACULTY_STATS_COUNTERS.items():
+            for statement in faculty_stats_trigger_sql(table, counters):
+                await conn.execute(statement)
+
+        # Пересчёт под блокировкой: записи ждут, пока счётчики не сойдутся с данными
+        await conn.execute(
+            f"LOCK TABLE faculties, {', '.join(FACULTY_STATS_COUNTERS)} IN SHARE ROW EXCLUSIVE MODE"
+        )
+        await conn.execute("DELETE FROM faculty_stats")
+        joins = []
+        for table, counters in FACULTY_STATS_COUNTERS.items():
+            aggregates = ", ".join(f"sum({expr}) AS {column}" for column, expr in counters.items())
+            joins.append(
+                f"LEFT JOIN (SELECT faculty_id, {aggregates} FROM {table} GROUP BY faculty_id) AS {table} "
+                f"ON {table}.faculty_id = f.id"
+            )
+        await conn.execute(f"""
+            INSERT INTO faculty_stats (faculty_id, {", ".join(columns)})
+            SELECT f.id, {", ".join(f"COALESCE({column}, 0)" for column in columns)}
+            FROM faculties AS f
+            {" ".join(joins)}
+        """)
+
 
 async def create_tables():
     """Создает все необходимые таблицы"""
@@ -85,6 +199,8 @@ async def create_tables():
                 tg_id BIGINT,
                 tg_username VARCHAR(64),
                 source_sheet_id INTEGER REFERENCES faculty_sheets(id) ON DELETE SET NULL,
+                row_hash VARCHAR(64),
+                removed_at TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(faculty_id, vk_id)
@@ -110,6 +226,42 @@ async def create_tables():
             )
         """)
         
+        # Создаем таблицу sheet_tab_states
+        print("📋 Создание таблицы sheet_tab_states...")
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS sheet_tab_states (
+                id SERIAL PRIMARY KEY,
+                faculty_sheet_id INTEGER REFERENCES faculty_sheets(id) ON DELETE CASCADE,
+                tab_name VARCHAR(128) NOT NULL,
+                content_hash VARCHAR(64) NOT NULL,
+                row_count INTEGER DEFAULT 0 NOT NULL,
+                synced_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                UNIQUE(faculty_sheet_id, tab_name)
+            )
+        """)
+        await conn.execute("ALTER TABLE participants ADD COLUMN IF NOT EXISTS row_hash VARCHAR(64)")
+        await conn.execute("ALTER TABLE participants ADD COLUMN IF NOT EXISTS removed_at TIMESTAMP")
+        await conn.execute("ALTER TABLE faculty_sheets ADD COLUMN IF NOT EXISTS synced_revision VARCHAR(64)")
+        
+        # Создаем таблицы матрицы занятости собеседующих
+        print("📋 Создание таблиц faculty_availability и interviewer_availability...")
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS faculty_availability (
+                faculty_id INTEGER PRIMARY KEY REFERENCES faculties(id) ON DELETE CASCADE,
+                slot_days VARCHAR(64)[] NOT NULL,
+                slot_times VARCHAR(32)[] NOT NULL,
+                synced_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL
+            )
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS interviewer_availability (
+                interviewer_id INTEGER PRIMARY KEY REFERENCES interviewers(id) ON DELETE CASCADE,
+                faculty_id INTEGER NOT NULL REFERENCES faculties(id) ON DELETE CASCADE,
+                free_mask BYTEA NOT NULL,
+                free_count INTEGER DEFAULT 0 NOT NULL
+            )
+        """)
+        
         # Создаем индексы для производительности
         print("📊 Создание индексов...")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_admins_telegram_user_id ON faculty_admins(telegram_user_id)")
@@ -117,6 +269,11 @@ async def create_tables():
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_interviewers_invite_token ON interviewers(invite_token)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_participants_vk_id ON participants(vk_id)")
         await conn.execute("CREATE INDEX IF NOT EXISTS idx_participants_tg_id ON participants(tg_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_interviewer_availability_faculty_id ON interviewer_availability(faculty_id)")
+        
+        # Счётчики для экрана статуса
+        print("📈 Создание счётчиков faculty_stats...")
+        await create_faculty_stats(conn)
         
         print("✅ Все таблицы созданы успешно!")
         
@@ -1,11 +1,17 @@
 import os 
 import asyncio
+from typing import List
 
 from aiogram import Bot, Dispatcher
 from dotenv import load_dotenv
 
-from services.gspread_client import GSpreadClient
+from bot.middlewares.db_scope import DbScopeMiddleware
+from database.repository import create_repository
+from services.faculty_directory import FacultyDirectory
+from services.gspread_client import AsyncGSpreadClient, SheetsWriteBuffer
 from services.redis_client import CacheKeys, RedisClient
+from services.sheet_prefetch import PrefetchTarget, SheetPrefetchWorker
+from services.singleflight import create_distributed_singleflight
 from bot.routers.common import setup_common_router
 from bot.routers.superadmin import setup_superadmin_router
 from bot.routers.faculty_admin import setup_faculty_admin_router
@@ -21,7 +27,18 @@ dp = Dispatcher()
 
 # Services
 redis_client = RedisClient()
-gs_client = GSpreadClient()
+gs_client = AsyncGSpreadClient(distributed=create_distributed_singleflight(redis_client))
+repository = create_repository()
+faculty_directory = FacultyDirectory(repository.list_faculties)
+
+
+async def load_prefetch_targets() -> List[PrefetchTarget]:
+    sheets = await repository.list_sheets()
+    return [PrefetchTarget(s.faculty_id, s.kind.value, s.spreadsheet_id) for s in sheets]
+
+
+sheet_prefetch = SheetPrefetchWorker(gs_client, redis_client, load_prefetch_targets)
+sheet_writer = SheetsWriteBuffer(gs_client)
 
 
 async def get_bot_username() -> str:
@@ -33,20 +50,33 @@ async def get_bot_username() -> str:
     return bot_username
 
 
+# One database connection (or session) per update
+dp.update.outer_middleware(DbScopeMiddleware(repository))
+
+
 # Routers
-dp.include_router(setup_common_router(redis_client))
-dp.include_router(setup_superadmin_router())
-dp.include_router(setup_faculty_admin_router(redis_client, gs_client, bot))
-dp.include_router(setup_interviewer_registration_router(redis_client))
+dp.include_router(setup_common_router(redis_client, repository=repository))
+dp.include_router(setup_superadmin_router(gs_client, repository=repository))
+dp.include_router(setup_faculty_admin_router(
+    redis_client, gs_client, bot, sheet_prefetch, sheet_writer,
+    repository=repository, faculty_directory=faculty_directory,
+))
+dp.include_router(setup_interviewer_registration_router(redis_client, repository=repository))
 
 
 async def main():
     print("Bot is running")
     await bot.delete_webhook(drop_pending_updates=True)
+    sheet_prefetch.start()
+    sheet_writer.start()
     try:
         await dp.start_polling(bot)
     finally:
+        await sheet_prefetch.stop()
+        await sheet_writer.stop()
         await redis_client.close()
+        await repository.close()
+        gs_client.close()
 
 
 if __name__ == "__main__":
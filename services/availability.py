@@ -0,0 +1,182 @@
+"""
+Матрица занятости собеседующих факультета: собеседующие × слоты.
+
+Лист каждого собеседующего в opyt/ne_opyt разбирается в битовую маску
+свободных слотов: бит i - слот i общего для факультета списка слотов.
+Матрица хранится в Postgres, поэтому вопросы «кто свободен во вторник
+в 14:00» и «сколько мест в каждый день» решаются битовыми операциями,
+без повторного чтения таблиц.
+"""
+
+import asyncio
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from database.repository import Repository, UpdateScope
+from services.gspread_client import AsyncGSpreadClient
+from services.sheet_rows import iter_slot_rows
+
+# (день, время) - как в листе собеседующего
+Slot = Tuple[str, str]
+
+_DATE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})(?:\.(\d{2,4}))?")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def _slot_sort_key(slot: Slot) -> tuple:
+    """Дни "14.10" упорядочиваются по дате, остальные - по тексту; время - по числам"""
+    day, time = slot
+    match = _DATE_RE.search(day)
+    if match:
+        day_key = (0, int(match.group(3) or 0), int(match.group(2)), int(match.group(1)), "")
+    else:
+        day_key = (1, 0, 0, 0, day)
+    return day_key, tuple(int(n) for n in _NUMBER_RE.findall(time)), time
+
+
+def encode_mask(mask: int, size: int) -> bytes:
+    """Битовая маска в bytes: бит i - бит i % 8 байта i // 8, как get_bit() в Postgres"""
+    return mask.to_bytes((size + 7) // 8, "little")
+
+
+def decode_mask(data: bytes) -> int:
+    return int.from_bytes(data, "little")
+
+
+class AvailabilityMatrix:
+    """Свободные слоты собеседующих в виде битовых масок над общим списком слотов"""
+
+    __slots__ = ("faculty_id", "slots", "masks", "synced_at", "_index", "_day_masks")
+
+    def __init__(
+        self,
+        faculty_id: int,
+        slots: Sequence[Slot],
+        masks: Dict[int, int],
+        synced_at: Optional[datetime] = None,
+    ) -> None:
+        self.faculty_id = faculty_id
+        self.slots: List[Slot] = list(slots)
+        self.masks = masks
+        self.synced_at = synced_at
+        self._index = {slot: i for i, slot in enumerate(self.slots)}
+        day_masks: Dict[str, int] = defaultdict(int)
+        for i, (day, _) in enumerate(self.slots):
+            day_masks[day] |= 1 << i
+        self._day_masks = dict(day_masks)
+
+    @classmethod
+    def from_tabs(cls, faculty_id: int, tabs: Dict[int, List[List[str]]]) -> "AvailabilityMatrix":
+        """tabs - interviewer_id -> значения его листа (первая строка - заголовок)"""
+        parsed = {interviewer_id: list(iter_slot_rows(values)) for interviewer_id, values in tabs.items()}
+        slots = sorted({(row.day, row.time) for rows in parsed.values() for row in rows}, key=_slot_sort_key)
+        index = {slot: i for i, slot in enumerate(slots)}
+
+        masks: Dict[int, int] = {}
+        for interviewer_id, rows in parsed.items():
+            free = busy = 0
+            for row in rows:
+                bit = 1 << index[(row.day, row.time)]
+                if row.busy:
+                    busy |= bit
+                else:
+                    free |= bit
+            # Повтор слота с записанным участником означает, что слот занят
+            masks[interviewer_id] = free & ~busy
+        return cls(faculty_id, slots, masks)
+
+    @property
+    def days(self) -> List[str]:
+        return list(self._day_masks)
+
+    def free_at(self, day: str, time: str) -> List[int]:
+        """Собеседующие, свободные в слот (день, время)"""
+        i = self._index.get((day, time))
+        if i is None:
+            return []
+        return [interviewer_id for interviewer_id, mask in self.masks.items() if mask >> i & 1]
+
+    def free_slots(self, interviewer_id: int) -> List[Slot]:
+        mask = self.masks.get(interviewer_id, 0)
+        return [slot for i, slot in enumerate(self.slots) if mask >> i & 1]
+
+    def capacity_by_day(self) -> Dict[str, int]:
+        """День -> число свободных пар (собеседующий, слот)"""
+        return {
+            day: sum((mask & day_mask).bit_count() for mask in self.masks.values())
+            for day, day_mask in self._day_masks.items()
+        }
+
+    def slot_capacity(self) -> List[int]:
+        """Число свободных собеседующих для каждого слота, в порядке self.slots"""
+        counts = [0] * len(self.slots)
+        for mask in self.masks.values():
+            while mask:
+                low = mask & -mask
+                counts[low.bit_length() - 1] += 1
+                mask ^= low
+        return counts
+
+    @property
+    def total_capacity(self) -> int:
+        return sum(mask.bit_count() for mask in self.masks.values())
+
+
+async def build_availability(
+    repository: Repository,
+    gs_client: AsyncGSpreadClient,
+    faculty_id: int,
+) -> AvailabilityMatrix:
+    """Читает листы всех собеседующих факультета, строит матрицу и сохраняет её в базе.
+
+    Листы читаются одним batchGet на таблицу, таблицы opyt и ne_opyt - параллельно.
+    """
+    interviewers = await repository.list_interviewers(faculty_id)
+    sheets = {sheet.id: sheet.spreadsheet_id for sheet in await repository.get_sheets(faculty_id)}
+    # Соединение апдейта не ждёт Google; replace_availability возьмёт новое
+    await UpdateScope.release_current(repository)
+
+    # spreadsheet_id -> [(interviewer_id, лист)]
+    by_spreadsheet: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    for interviewer in interviewers:
+        spreadsheet_id = sheets.get(interviewer.faculty_sheet_id)
+        if spreadsheet_id:
+            by_spreadsheet[spreadsheet_id].append((interviewer.id, interviewer.tab_name))
+
+    batches = await asyncio.gather(*(
+        gs_client.read_tabs_batch(spreadsheet_id, [tab_name for _, tab_name in tabs])
+        for spreadsheet_id, tabs in by_spreadsheet.items()
+    ))
+    values: Dict[int, List[List[str]]] = {}
+    for tabs, batch in zip(by_spreadsheet.values(), batches):
+        for interviewer_id, tab_name in tabs:
+            values[interviewer_id] = batch.get(tab_name, [])
+
+    matrix = AvailabilityMatrix.from_tabs(faculty_id, values)
+    size = len(matrix.slots)
+    await repository.replace_availability(
+        faculty_id,
+        [day for day, _ in matrix.slots],
+        [time for _, time in matrix.slots],
+        {
+            interviewer_id: (encode_mask(mask, size), mask.bit_count())
+            for interviewer_id, mask in matrix.masks.items()
+        },
+    )
+    matrix.synced_at = datetime.now(timezone.utc)
+    return matrix
+
+
+async def load_availability(repository: Repository, faculty_id: int) -> Optional[AvailabilityMatrix]:
+    """Сохранённая матрица факультета или None, если её ещё не строили"""
+    stored = await repository.get_availability(faculty_id)
+    if stored is None:
+        return None
+    return AvailabilityMatrix(
+        faculty_id,
+        list(zip(stored.slot_days, stored.slot_times)),
+        {interviewer_id: decode_mask(mask) for interviewer_id, mask in stored.masks.items()},
+        synced_at=stored.synced_at,
+    )
@@ -0,0 +1,142 @@
+"""
+Импорт участников сразу для всех факультетов.
+
+Факультеты обрабатываются параллельно, но не более concurrency одновременно.
+Все чтения из Google оплачиваются из общего бюджета - доли квоты Sheets API,
+чтобы массовый импорт не отнимал квоту у остальных действий в боте. Таблицы,
+версия которых в Drive не менялась с прошлого импорта, не перечитываются.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from services.gspread_client import AsyncGSpreadClient, describe_sheets_error
+from services.participant_stream import iter_participant_pages, stream_import_participants
+from services.rate_limiter import TokenBucket
+
+_TARGETS_SQL = """
+    SELECT f.id AS faculty_id, f.title, fs.id AS sheet_id, fs.spreadsheet_id, fs.synced_revision
+    FROM faculties f
+    LEFT JOIN faculty_sheets fs ON fs.faculty_id = f.id AND lower(fs.kind) = 'svod'
+    ORDER BY f.title
+"""
+
+
+@dataclass
+class FacultyImportReport:
+    faculty_id: int
+    title: str
+    inserted: int = 0
+    changed: int = 0
+    deleted: int = 0
+    total: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+    # Сводная таблица не настроена - факультет пропущен
+    skipped: bool = False
+    # Версия таблицы не менялась с прошлого импорта - лист не читался
+    unchanged: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.skipped
+
+
+@dataclass
+class BulkImportReport:
+    faculties: List[FacultyImportReport] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def succeeded(self) -> List[FacultyImportReport]:
+        return [r for r in self.faculties if r.ok]
+
+    @property
+    def failed(self) -> List[FacultyImportReport]:
+        return [r for r in self.faculties if r.error is not None]
+
+    @property
+    def unchanged(self) -> List[FacultyImportReport]:
+        return [r for r in self.faculties if r.unchanged]
+
+    @property
+    def skipped(self) -> List[FacultyImportReport]:
+        return [r for r in self.faculties if r.skipped]
+
+    @property
+    def total(self) -> int:
+        return sum(r.total for r in self.faculties)
+
+
+def create_import_budget(gs_client: AsyncGSpreadClient, share: Optional[float] = None) -> TokenBucket:
+    """Бюджет массового импорта: доля GSHEETS_BULK_QUOTA_SHARE от общей квоты"""
+    if share is None:
+        share = float(os.getenv("GSHEETS_BULK_QUOTA_SHARE", "0.5"))
+    limiter = gs_client.sync.limiter
+    rate = limiter.rate * share
+    # Импорту можно подождать квоту дольше, чем интерактивным действиям
+    max_wait = float(os.getenv("GSHEETS_BULK_MAX_WAIT", "600"))
+    return TokenBucket(capacity=max(1.0, limiter.capacity * share), rate=rate, max_wait=max_wait)
+
+
+async def import_all_participants(
+    db_pool,
+    gs_client: AsyncGSpreadClient,
+    concurrency: Optional[int] = None,
+    budget: Optional[TokenBucket] = None,
+) -> BulkImportReport:
+    """Импортирует участников из svod всех факультетов и собирает общий отчёт"""
+    if concurrency is None:
+        concurrency = int(os.getenv("GSHEETS_IMPORT_CONCURRENCY", "3"))
+    budget = budget or create_import_budget(gs_client)
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    async with db_pool.acquire() as conn:
+        targets = await conn.fetch(_TARGETS_SQL)
+
+    async def import_one(target) -> FacultyImportReport:
+        report = FacultyImportReport(faculty_id=target["faculty_id"], title=target["title"])
+        if target["sheet_id"] is None:
+            report.skipped = True
+            return report
+
+        async with semaphore:
+            faculty_started = time.perf_counter()
+            try:
+                await budget.acquire_async()
+                revision = await gs_client.get_revision(target["spreadsheet_id"])
+                if revision == target["synced_revision"]:
+                    report.unchanged = True
+                    async with db_pool.acquire() as conn:
+                        report.total = await conn.fetchval(
+                            "SELECT COUNT(*) FROM participants WHERE faculty_id = $1 AND removed_at IS NULL",
+                            target["faculty_id"],
+                        )
+                else:
+                    # Соединение из пула берётся только после чтения листа
+                    result = await stream_import_participants(
+                        db_pool.acquire,
+                        iter_participant_pages(gs_client, target["spreadsheet_id"], budget=budget),
+                        target["faculty_id"],
+                        target["sheet_id"],
+                    )
+                    # Версию берём до чтения: правка во время импорта даст новую версию
+                    async with db_pool.acquire() as conn:
+                        await conn.execute(
+                            "UPDATE faculty_sheets SET synced_revision = $2 WHERE id = $1", target["sheet_id"], revision
+                        )
+                    report.inserted = result.inserted
+                    report.changed = result.changed
+                    report.deleted = result.deleted
+                    report.total = result.total
+            except Exception as e:
+                report.error = describe_sheets_error(e)
+            report.duration = time.perf_counter() - faculty_started
+        return report
+
+    faculties = await asyncio.gather(*(import_one(target) for target in targets))
+    return BulkImportReport(faculties=list(faculties), duration=time.perf_counter() - started)
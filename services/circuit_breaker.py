@@ -0,0 +1,73 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+
+class SheetsUnavailable(RuntimeError):
+    """Google Sheets недоступен: цепь разомкнута после серии сбоев"""
+
+    def __init__(self, message: str = "Google Sheets временно недоступен, попробуйте через минуту") -> None:
+        super().__init__(message)
+
+
+class CircuitBreaker:
+    """Размыкатель цепи для запросов к Google.
+
+    После failure_threshold сбоев подряд цепь размыкается, и вызовы сразу
+    получают отказ, не занимая потоки. Через reset_timeout пропускается один
+    пробный вызов (half-open): успех замыкает цепь, сбой снова размыкает.
+    Вызывается только из event loop, поэтому блокировки не нужны.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None) -> None:
+        self.failure_threshold = failure_threshold if failure_threshold is not None else int(
+            os.getenv("GSHEETS_BREAKER_FAILURES", "5")
+        )
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(
+            os.getenv("GSHEETS_BREAKER_RESET", "30")
+        )
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Можно ли сейчас идти в Google"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,104 @@
+"""
+Справочник факультетов в памяти процесса.
+
+Факультетов немного, а список нужен почти в каждом шаге мастеров
+суперадмина и в кнопках админа факультета. Справочник загружается
+целиком одним запросом, отвечает по id, slug и названию без учёта
+регистра, перечитывается раз в ttl секунд и сбрасывается сразу после
+создания, изменения или удаления факультета: запись через FacultyDAO или
+репозиторий увеличивает поколение таблицы faculties, а запись в обход них
+сбрасывает справочник через invalidate_faculty_directory.
+"""
+
+import asyncio
+import os
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from database.dao import faculties_generation, mark_faculties_changed
+
+if TYPE_CHECKING:
+    from database.repository import FacultyRecord
+
+
+def invalidate_faculty_directory() -> None:
+    """Вызывается после записи в faculties в обход FacultyDAO и репозитория"""
+    mark_faculties_changed()
+
+
+class FacultyDirectory:
+    def __init__(
+        self,
+        load_faculties: Callable[[], Awaitable[List["FacultyRecord"]]],
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.load_faculties = load_faculties
+        self.ttl = ttl if ttl is not None else float(os.getenv("FACULTY_DIRECTORY_TTL", "300"))
+        self.hits = 0
+        self.loads = 0
+        self._faculties: List["FacultyRecord"] = []
+        self._by_id: Dict[int, "FacultyRecord"] = {}
+        self._by_slug: Dict[str, "FacultyRecord"] = {}
+        self._by_title: Dict[str, "FacultyRecord"] = {}
+        self._loaded_at: Optional[float] = None
+        self._generation = -1
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and self._generation == faculties_generation()
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def _ensure(self) -> None:
+        if self._is_fresh():
+            self.hits += 1
+            return
+        async with self._lock:
+            # Пока ждали блокировку, справочник мог перечитать другой обработчик
+            if self._is_fresh():
+                self.hits += 1
+                return
+            generation = faculties_generation()
+            faculties = await self.load_faculties()
+            self._faculties = sorted(faculties, key=lambda f: f.title)
+            self._by_id = {f.id: f for f in self._faculties}
+            self._by_slug = {f.slug: f for f in self._faculties}
+            self._by_title = {f.title.lower(): f for f in self._faculties}
+            self._loaded_at = time.monotonic()
+            # Запись во время загрузки оставит справочник устаревшим до следующего обращения
+            self._generation = generation
+            self.loads += 1
+
+    def invalidate(self) -> None:
+        invalidate_faculty_directory()
+
+    async def all(self) -> List["FacultyRecord"]:
+        """Все факультеты, по названию"""
+        await self._ensure()
+        return list(self._faculties)
+
+    async def get(self, faculty_id: int) -> Optional["FacultyRecord"]:
+        await self._ensure()
+        return self._by_id.get(faculty_id)
+
+    async def by_slug(self, slug: str) -> Optional["FacultyRecord"]:
+        await self._ensure()
+        return self._by_slug.get(slug)
+
+    async def by_title(self, title: str) -> Optional["FacultyRecord"]:
+        await self._ensure()
+        return self._by_title.get(title.strip().lower())
+
+    async def resolve(self, text: str) -> Optional["FacultyRecord"]:
+        """Факультет по ответу в мастере: номер из списка all() или название"""
+        faculties = await self.all()
+        text = text.strip()
+        if text.isdigit():
+            number = int(text)
+            return faculties[number - 1] if 1 <= number <= len(faculties) else None
+        return self._by_title.get(text.lower())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"faculties": len(self._faculties), "hits": self.hits, "loads": self.loads}
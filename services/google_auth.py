@@ -0,0 +1,87 @@
+"""
+HTTP-транспорт и токен сервисного аккаунта для Google API.
+
+Сессия держит пул keep-alive соединений по числу потоков, которые ходят
+в Google, а токен обновляется в фоне заранее, поэтому ни один запрос
+пользователя не тратит время на TLS-рукопожатие и обмен токена.
+"""
+
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import requests
+from google.auth.credentials import Credentials
+from google.auth.transport.requests import AuthorizedSession, Request
+from requests.adapters import HTTPAdapter
+
+# Хосты Google, к которым ходит бот: sheets, www.googleapis.com (Drive), oauth2
+GOOGLE_HOSTS = 3
+
+
+def create_http_session(credentials: Credentials, pool_size: int) -> requests.Session:
+    """Авторизованная сессия с пулом на pool_size соединений к каждому хосту.
+
+    Повторы здесь отключены - их делает RateLimitedHTTPClient с учётом квоты.
+    """
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=GOOGLE_HOSTS, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    return session
+
+
+class CredentialRefresher:
+    """Фоновое обновление токена за refresh_lead секунд до истечения"""
+
+    def __init__(self, credentials: Credentials, refresh_lead: Optional[float] = None, retry_interval: float = 30.0) -> None:
+        self.credentials = credentials
+        self.refresh_lead = refresh_lead if refresh_lead is not None else float(
+            os.getenv("GSPREAD_TOKEN_REFRESH_LEAD", "600")
+        )
+        self.retry_interval = retry_interval
+        self.refreshes = 0
+        self.failures = 0
+        # Своя сессия, чтобы обмен токена тоже шёл по живому соединению
+        self._request = Request(requests.Session())
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _seconds_until_refresh(self) -> float:
+        expiry = self.credentials.expiry
+        if not self.credentials.token or expiry is None:
+            return 0.0
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth хранит expiry в naive UTC
+        return max(1.0, (expiry - now).total_seconds() - self.refresh_lead)
+
+    def refresh(self) -> None:
+        self.credentials.refresh(self._request)
+        self.refreshes += 1
+
+    def _run(self) -> None:
+        # Первый токен получаем сразу при старте, а не в первом запросе пользователя
+        delay = 0.0
+        while not self._stop.wait(delay):
+            try:
+                self.refresh()
+                delay = self._seconds_until_refresh()
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ Не удалось обновить токен Google: {e}")
+                delay = self.retry_interval
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="gspread-token", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "expiry": self.credentials.expiry.isoformat() if self.credentials.expiry else None,
+        }
@@ -1,47 +1,458 @@
+import asyncio
+import contextvars
+import dataclasses
+import functools
 import os
-from typing import List, Dict
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
 
 import gspread
+from cachetools import LRUCache, TTLCache
 from google.oauth2.service_account import Credentials
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from gspread.urls import DRIVE_FILES_API_V3_URL
+from gspread.utils import absolute_range_name, rowcol_to_a1
+import requests
+from requests import Response
 
+from services.circuit_breaker import CircuitBreaker, SheetsUnavailable
+from services.google_auth import CredentialRefresher, create_http_session
+from services.rate_limiter import (
+    SheetsQuotaExceeded,
+    TokenBucket,
+    call_deadline,
+    create_sheets_rate_limiter,
+    remaining_wait,
+)
+from services.sheet_rows import (
+    PARTICIPANT_HEADERS,
+    HeaderPlan,
+    ParticipantRow,
+    iter_interviewer_rows,
+    iter_participant_rows,
+)
+from services.sheet_snapshots import SheetSnapshotStore, TabSnapshot, values_hash
+from services.singleflight import RedisSingleFlight, SingleFlight, flight_key
+
+# Ограничения одного запроса values:batchGet: число диапазонов и длина URL
+BATCH_GET_MAX_RANGES = int(os.getenv("GSPREAD_BATCH_MAX_RANGES", "100"))
+BATCH_GET_MAX_URL_LENGTH = 7000
+
+# Поле -> возможные заголовки колонки (см. sheet_rows.PARTICIPANT_HEADERS)
+ColumnAliases = Dict[str, Tuple[str, ...]]
+
+
+def column_letter(index: int) -> str:
+    """0 -> 'A', 26 -> 'AA'"""
+    return rowcol_to_a1(1, index + 1)[:-1]
+
+
+def column_runs(columns: Sequence[int]) -> List[Tuple[int, int]]:
+    """Отсортированные индексы колонок в непрерывные отрезки: [0, 1, 2, 7] -> [(0, 2), (7, 7)]"""
+    runs: List[Tuple[int, int]] = []
+    for index in columns:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1] = (runs[-1][0], index)
+        else:
+            runs.append((index, index))
+    return runs
+
+
+def _is_retryable(err: APIError) -> bool:
+    if err.code in (408, 429) or err.code >= 500:
+        return True
+    # Drive API сообщает о превышении квоты через 403 usageLimits
+    errors = err.error.get("errors") or []
+    return err.code == 403 and bool(errors) and errors[0].get("domain") == "usageLimits"
+
+
+def describe_sheets_error(error: BaseException) -> str:
+    """Понятное пользователю описание ошибки обращения к Google Sheets"""
+    if isinstance(error, (SheetsQuotaExceeded, SheetsUnavailable)):
+        return str(error)
+    if isinstance(error, asyncio.TimeoutError):
+        return "Google Sheets не ответил вовремя, попробуйте позже"
+    if isinstance(error, gspread.WorksheetNotFound):
+        return f"Лист не найден: {error}"
+    if isinstance(error, APIError):
+        return f"Google Sheets вернул ошибку {error.code}: {error.error.get('message', '')}"
+    return str(error)
+
+
+def is_outage(error: BaseException) -> bool:
+    """Сбой, говорящий о недоступности Google, а не об ошибке в запросе"""
+    if isinstance(error, (asyncio.TimeoutError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    return isinstance(error, APIError) and error.code >= 500
+
+
+def is_transient(error: BaseException) -> bool:
+    """Временный сбой (квота, недоступность, таймаут) - запрос имеет смысл повторить позже"""
+    if isinstance(error, (SheetsQuotaExceeded, SheetsUnavailable)) or is_outage(error):
+        return True
+    return isinstance(error, APIError) and _is_retryable(error)
+
+
+# Время, на которое отданы данные из кэша при недоступном Google, в текущей задаче
+_stale_since: ContextVar[Optional[float]] = ContextVar("sheets_stale_since", default=None)
+
+
+class Staleness:
+    """Отмечает, были ли внутри блока отданы устаревшие данные вместо ответа Google.
+
+    with Staleness() as staleness:
+        titles = await gs_client.list_worksheet_titles(spreadsheet_id)
+    fetched_at = staleness.since or time.time()
+    """
 
-class GSpreadClient:
     def __init__(self) -> None:
-        creds_path = os.getenv("GOOGLE_CREDENTIALS_JSON")
-        if not creds_path:
-            raise RuntimeError("Set GOOGLE_CREDENTIALS_JSON to path of service account JSON")
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets.readonly",
-            "https://www.googleapis.com/auth/drive.readonly",
-        ]
-        credentials = Credentials.from_service_account_file(creds_path, scopes=scopes)
-        self._client = gspread.authorize(credentials)
+        self.since: Optional[float] = None
+
+    def __enter__(self) -> "Staleness":
+        self._token = _stale_since.set(None)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.since = _stale_since.get()
+        _stale_since.reset(self._token)
+
+
+class RateLimitedHTTPClient(HTTPClient):
+    """HTTP-клиент gspread с общим лимитом запросов и повтором на 429/5xx.
+
+    Каждый запрос к API берёт токен из TokenBucket, а временные ошибки
+    повторяются с экспоненциальной задержкой и full jitter.
+    """
+
+    def __init__(self, auth: Any, session: Any = None, limiter: Optional[TokenBucket] = None) -> None:
+        super().__init__(auth, session)
+        self.limiter = limiter or create_sheets_rate_limiter()
+        self.max_retries = int(os.getenv("GSPREAD_MAX_RETRIES", "5"))
+        self.backoff_base = float(os.getenv("GSPREAD_BACKOFF_BASE", "1"))
+        self.backoff_max = float(os.getenv("GSPREAD_BACKOFF_MAX", "32"))
+
+    def request(self, *args: Any, **kwargs: Any) -> Response:
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                return super().request(*args, **kwargs)
+            except APIError as err:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                # Повтор, который не успеет до таймаута вызова, не делаем
+                if not _is_retryable(err) or attempt >= self.max_retries or remaining_wait(delay) < delay:
+                    if err.code == 429:
+                        self.limiter.stats.record_rejection()
+                        raise SheetsQuotaExceeded() from err
+                    raise
+                self.limiter.stats.record_retry(throttled=err.code == 429)
+                time.sleep(delay)
+                attempt += 1
+
+
+class GSpreadClient:
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        limiter: Optional[TokenBucket] = None,
+        snapshots: Optional[SheetSnapshotStore] = None,
+        pool_size: Optional[int] = None,
+    ) -> None:
+        """session - готовая requests.Session (например, FakeSheetsBackend.session()),
+        тогда credentials не нужны и все запросы идут через неё.
+        snapshots - хранилище снимков листов на диске (по умолчанию из GSHEETS_SNAPSHOT_DIR).
+        pool_size - число keep-alive соединений, по числу потоков, вызывающих клиент.
+        """
+        self.refresher: Optional[CredentialRefresher] = None
+        if session is None:
+            creds_path = os.getenv("GOOGLE_CREDENTIALS_JSON")
+            if not creds_path:
+                raise RuntimeError("Set GOOGLE_CREDENTIALS_JSON to path of service account JSON")
+            scopes = [
+                "https://www.googleapis.com/auth/spreadsheets",
+                "https://www.googleapis.com/auth/drive.readonly",
+            ]
+            credentials = Credentials.from_service_account_file(creds_path, scopes=scopes)
+            if pool_size is None:
+                pool_size = int(os.getenv("GSPREAD_MAX_WORKERS", "4"))
+            session = create_http_session(credentials, pool_size)
+            self.refresher = CredentialRefresher(credentials)
+            self.refresher.start()
+        self._session = session
+        self.limiter = limiter or create_sheets_rate_limiter()
+        self._client = gspread.authorize(
+            None,
+            http_client=functools.partial(RateLimitedHTTPClient, limiter=self.limiter),
+            session=session,
+        )
+        # Ограничиваем ожидание ответа Google, чтобы зависший запрос не держал поток вечно
+        self._client.set_timeout(float(os.getenv("GSPREAD_HTTP_TIMEOUT", "30")))
+
+        # Кэш открытых таблиц и списков их листов: spreadsheet_id -> объект.
+        # TTLCache вытесняет по LRU при переполнении и по времени жизни записи.
+        cache_size = int(os.getenv("GSPREAD_CACHE_SIZE", "64"))
+        cache_ttl = float(os.getenv("GSPREAD_CACHE_TTL", "300"))
+        self._spreadsheets: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._worksheets: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        # (таблица, лист) -> (индексы нужных колонок, их заголовки) для чтения с проекцией
+        self._projections: LRUCache = LRUCache(maxsize=cache_size)
+        self._cache_lock = threading.Lock()
+
+        self.snapshots = snapshots if snapshots is not None else SheetSnapshotStore.from_env()
+
+    def _open(self, spreadsheet_id: str) -> gspread.Spreadsheet:
+        with self._cache_lock:
+            sh = self._spreadsheets.get(spreadsheet_id)
+        if sh is None:
+            sh = self._client.open_by_key(spreadsheet_id)
+            with self._cache_lock:
+                self._spreadsheets[spreadsheet_id] = sh
+        return sh
+
+    def _get_worksheets(self, spreadsheet_id: str) -> List[gspread.Worksheet]:
+        with self._cache_lock:
+            worksheets = self._worksheets.get(spreadsheet_id)
+        if worksheets is None:
+            worksheets = self._open(spreadsheet_id).worksheets()
+            with self._cache_lock:
+                self._worksheets[spreadsheet_id] = worksheets
+        return worksheets
+
+    def _get_worksheet(self, spreadsheet_id: str, title: str) -> gspread.Worksheet:
+        for ws in self._get_worksheets(spreadsheet_id):
+            if ws.title == title:
+                return ws
+        # Лист мог появиться после того, как список попал в кэш
+        self.invalidate(spreadsheet_id)
+        for ws in self._get_worksheets(spreadsheet_id):
+            if ws.title == title:
+                return ws
+        raise gspread.WorksheetNotFound(title)
+
+    def invalidate(self, spreadsheet_id: Optional[str] = None) -> None:
+        """Сбрасывает кэш метаданных одной таблицы или всех сразу"""
+        with self._cache_lock:
+            if spreadsheet_id is None:
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+            else:
+                self._spreadsheets.pop(spreadsheet_id, None)
+                self._worksheets.pop(spreadsheet_id, None)
 
     def list_worksheet_titles(self, spreadsheet_id: str) -> List[str]:
-        sh = self._client.open_by_key(spreadsheet_id)
-        return [ws.title for ws in sh.worksheets()]
+        return [ws.title for ws in self._get_worksheets(spreadsheet_id)]
+
+    def read_tab(
+        self,
+        spreadsheet_id: str,
+        worksheet_title: str,
+        columns: Optional[ColumnAliases] = None,
+        revision: Optional[str] = None,
+    ) -> TabSnapshot:
+        """Читает лист.
+
+        columns - читать только колонки с этими заголовками (см. read_projected),
+        иначе лист читается целиком.
+        revision - версия таблицы в Drive, полученная до чтения: снимок с диска
+        той же версии отдаётся без запроса к Google, а прочитанный лист
+        сохраняется на диск с этой версией.
+        """
+        projection = ",".join(columns) if columns else ""
+        if self.snapshots and revision is not None:
+            cached = self.snapshots.get(spreadsheet_id, worksheet_title, revision, projection)
+            if cached is not None:
+                return cached
+        if columns is not None:
+            values = self.read_projected(spreadsheet_id, worksheet_title, columns)
+        else:
+            values = self._get_worksheet(spreadsheet_id, worksheet_title).get_all_values()
+        snapshot = TabSnapshot(
+            spreadsheet_id=spreadsheet_id,
+            title=worksheet_title,
+            values=values,
+            fetched_at=time.time(),
+            revision=revision,
+            content_hash=values_hash(values),
+            projection=projection,
+        )
+        # Без версии снимок нечем проверить, и на диск он не пишется
+        if self.snapshots and revision is not None:
+            try:
+                self.snapshots.save(snapshot)
+            except OSError as e:
+                print(f"⚠️ Не удалось сохранить снимок листа {worksheet_title}: {e}")
+        return snapshot
+
+    def read_columns(
+        self,
+        spreadsheet_id: str,
+        worksheet_title: str,
+        columns: Sequence[int],
+        first_row: int = 1,
+        last_row: Optional[int] = None,
+    ) -> List[List[str]]:
+        """Строки first_row..last_row, но только из колонок columns (индексы с 0, по возрастанию).
+
+        Соседние колонки читаются одним диапазоном, все диапазоны - одним batchGet.
+        В результате колонки идут подряд в порядке columns.
+        """
+        runs = column_runs(columns)
+        stop = "" if last_row is None else str(last_row)
+        ranges = [
+            absolute_range_name(worksheet_title, f"{column_letter(start)}{first_row}:{column_letter(end)}{stop}")
+            for start, end in runs
+        ]
+        response = self._open(spreadsheet_id).values_batch_get(ranges, params={"majorDimension": "COLUMNS"})
+
+        cells: List[List[str]] = []
+        for (start, end), value_range in zip(runs, response.get("valueRanges", [])):
+            got = value_range.get("values", [])
+            # Google не отдаёт пустые колонки в конце диапазона
+            cells.extend(got + [[] for _ in range(end - start + 1 - len(got))])
+        height = max((len(column) for column in cells), default=0)
+        return [[column[r] if r < len(column) else "" for column in cells] for r in range(height)]
+
+    def read_projected(self, spreadsheet_id: str, worksheet_title: str, columns: ColumnAliases) -> List[List[str]]:
+        """Значения листа только из колонок с заголовками из columns (первая строка - заголовок).
+
+        Номера колонок определяются по заголовку один раз и запоминаются; если
+        заголовок в запомненных колонках изменился, они определяются заново.
+        """
+        key = (spreadsheet_id, worksheet_title)
+        with self._cache_lock:
+            projection = self._projections.get(key)
+        if projection is not None:
+            indices, expected = projection
+            values = self.read_columns(spreadsheet_id, worksheet_title, indices)
+            if values and tuple(values[0]) == expected:
+                return values
+
+        header_values = self.read_range(spreadsheet_id, worksheet_title, "1:1")
+        header = header_values[0] if header_values else []
+        indices = HeaderPlan.compile(header, columns).used_columns()
+        if not indices:
+            return header_values
+        with self._cache_lock:
+            self._projections[key] = (indices, tuple(header[i] for i in indices))
+        return self.read_columns(spreadsheet_id, worksheet_title, indices)
+
+    def iter_participants(self, spreadsheet_id: str, worksheet_title: str = "участники") -> Iterator[ParticipantRow]:
+        """Потоково отдаёт участников компактными кортежами ParticipantRow"""
+        values = self.read_tab(spreadsheet_id, worksheet_title, PARTICIPANT_HEADERS).values
+        return iter_participant_rows(values)  # first row is headers
 
     def read_participants(self, spreadsheet_id: str, worksheet_title: str = "участники") -> List[Dict]:
-        sh = self._client.open_by_key(spreadsheet_id)
-        ws = sh.worksheet(worksheet_title)
-        rows = ws.get_all_records()  # assumes first row is headers
-        # Normalize keys to expected Russian headers -> fields
-        normalized = []
-        for r in rows:
-            norm = {
-                "vk_id": r.get("vk_id") or r.get("VK_ID") or r.get("vk") or r.get("vk id"),
-                "first_name": r.get("first_name") or r.get("Имя") or r.get("name"),
-                "last_name": r.get("last_name") or r.get("Фамилия") or r.get("surname"),
-            }
-            if norm["vk_id"] is None:
-                continue
-            normalized.append(norm)
-        return normalized
+        return [row._asdict() for row in self.iter_participants(spreadsheet_id, worksheet_title)]
+
+    def read_participant_rows(self, spreadsheet_id: str, worksheet_title: str = "участники") -> List[ParticipantRow]:
+        return list(self.iter_participants(spreadsheet_id, worksheet_title))
+
+    def get_revision(self, spreadsheet_id: str) -> str:
+        """Версия файла таблицы в Drive - меняется при любом изменении содержимого.
+
+        Один маленький запрос метаданных вместо чтения листов: если версия
+        совпала с сохранённой при прошлой синхронизации, лист читать не нужно.
+        """
+        response = self._client.http_client.request(
+            "get",
+            f"{DRIVE_FILES_API_V3_URL}/{spreadsheet_id}",
+            params={"fields": "id,modifiedTime,version", "supportsAllDrives": True},
+        )
+        metadata = response.json()
+        # version есть не у всех файлов (например, в общих дисках) - тогда хватит modifiedTime
+        return str(metadata.get("version") or metadata["modifiedTime"])
+
+    def get_row_count(self, spreadsheet_id: str, worksheet_title: str) -> int:
+        """Число строк сетки листа (по метаданным, без чтения значений).
+
+        Метаданные перечитываются: по закэшированному размеру импорт не увидел бы дописанные строки.
+        """
+        self.invalidate(spreadsheet_id)
+        return self._get_worksheet(spreadsheet_id, worksheet_title).row_count
+
+    def ensure_columns(self, spreadsheet_id: str, worksheet_title: str, count: int) -> int:
+        """Расширяет сетку листа до count колонок, если она уже; возвращает число колонок.
+
+        Размер берётся из свежих метаданных: по устаревшему resize мог бы удалить колонки.
+        """
+        self.invalidate(spreadsheet_id)
+        ws = self._get_worksheet(spreadsheet_id, worksheet_title)
+        if ws.col_count < count:
+            ws.add_cols(count - ws.col_count)
+        return ws.col_count
+
+    def read_range(self, spreadsheet_id: str, worksheet_title: str, a1_range: Optional[str] = None) -> List[List[str]]:
+        """Значения одного A1-диапазона листа (None - весь лист)"""
+        response = self._open(spreadsheet_id).values_get(
+            absolute_range_name(worksheet_title, a1_range), params={"majorDimension": "ROWS"}
+        )
+        return response.get("values", [])
+
+    def read_tabs_batch(
+        self,
+        spreadsheet_id: str,
+        titles: Sequence[str],
+        ranges: Union[None, str, Sequence[Optional[str]]] = None,
+    ) -> Dict[str, List[List[str]]]:
+        """Читает несколько листов через values:batchGet.
+
+        ranges - общий A1-диапазон для всех листов или список диапазонов
+        в порядке titles (None - весь лист). Диапазоны разбиваются на пачки,
+        чтобы не превысить лимиты размера запроса.
+        """
+        if ranges is None or isinstance(ranges, str):
+            ranges = [ranges] * len(titles)
+        if len(ranges) != len(titles):
+            raise ValueError("ranges must match titles")
+
+        a1_ranges = [absolute_range_name(title, rng) for title, rng in zip(titles, ranges)]
+
+        chunks: List[List[int]] = []
+        chunk: List[int] = []
+        url_length = 0
+        for index, a1 in enumerate(a1_ranges):
+            # Каждый диапазон уходит в query string как "&ranges=<quoted>"
+            length = len(quote(a1, safe="")) + len("&ranges=")
+            if chunk and (len(chunk) >= BATCH_GET_MAX_RANGES or url_length + length > BATCH_GET_MAX_URL_LENGTH):
+                chunks.append(chunk)
+                chunk, url_length = [], 0
+            chunk.append(index)
+            url_length += length
+        if chunk:
+            chunks.append(chunk)
+
+        sh = self._open(spreadsheet_id)
+        result: Dict[str, List[List[str]]] = {}
+        for chunk in chunks:
+            response = sh.values_batch_get(
+                [a1_ranges[i] for i in chunk], params={"majorDimension": "ROWS"}
+            )
+            for index, value_range in zip(chunk, response.get("valueRanges", [])):
+                result[titles[index]] = value_range.get("values", [])
+        return result
+
+    def write_ranges(self, spreadsheet_id: str, data: Sequence[Dict[str, Any]]) -> int:
+        """Записывает несколько диапазонов одним values:batchUpdate.
+
+        data - список {"range": A1-диапазон с именем листа, "values": [[...]]}.
+        Возвращает число обновлённых ячеек.
+        """
+        if not data:
+            return 0
+        response = self._open(spreadsheet_id).values_batch_update(
+            {"valueInputOption": "RAW", "data": list(data)}
+        )
+        return response.get("totalUpdatedCells", 0)
 
     def get_interviewer_sheets(self, spreadsheet_id: str) -> List[str]:
         """Получает список листов с собеседующими (ne_opyt и opyt)"""
-        sh = self._client.open_by_key(spreadsheet_id)
-        worksheets = sh.worksheets()
+        worksheets = self._get_worksheets(spreadsheet_id)
         
         interviewer_sheets = []
         for ws in worksheets:
@@ -53,25 +464,21 @@ class GSpreadClient:
 
     def read_interviewers_from_sheet(self, spreadsheet_id: str, sheet_name: str) -> List[Dict]:
         """Читает собеседующих из конкретного листа"""
-        sh = self._client.open_by_key(spreadsheet_id)
-        ws = sh.worksheet(sheet_name)
-        rows = ws.get_all_records()
-        
-        interviewers = []
-        for r in rows:
-            # Ищем имя собеседующего в различных возможных колонках
-            name = (r.get("name") or r.get("Имя") or r.get("ФИО") or 
-                   r.get("interviewer") or r.get("собеседующий") or
-                   r.get("проверяющий") or r.get("экзаменатор"))
-            
-            if name and name.strip():
-                interviewers.append({
-                    "name": name.strip(),
-                    "sheet_name": sheet_name
-                })
-        
-        return interviewers
-    
+        return [
+            {"name": row.name, "sheet_name": sheet_name}
+            for row in iter_interviewer_rows(self.read_tab(spreadsheet_id, sheet_name).values)
+        ]
+
+    def list_spreadsheet_files(self) -> List[Dict]:
+        """Список таблиц, доступных сервисному аккаунту"""
+        return self._client.list_spreadsheet_files()
+
+    def close(self) -> None:
+        """Останавливает фоновое обновление токена и закрывает соединения"""
+        if self.refresher:
+            self.refresher.stop()
+        self._session.close()
+
     async def test_connection(self) -> bool:
         """Тестирует подключение к Google Sheets API"""
         try:
@@ -83,3 +490,381 @@ class GSpreadClient:
             return False
 
 
+# Перевод результатов в JSON и обратно для RedisSingleFlight
+_TAB_CODEC = (dataclasses.asdict, lambda data: TabSnapshot(**data))
+_ROWS_CODEC = (lambda rows: [list(row) for row in rows], lambda data: [ParticipantRow(*row) for row in data])
+
+
+class AsyncGSpreadClient:
+    """Асинхронная обёртка над GSpreadClient.
+
+    gspread работает синхронно, поэтому каждый вызов выполняется в отдельном
+    ограниченном пуле потоков с таймаутом, и event loop не блокируется на Sheets.
+    """
+
+    def __init__(
+        self,
+        client: Optional[GSpreadClient] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        distributed: Optional[RedisSingleFlight] = None,
+    ) -> None:
+        """distributed - склейка одинаковых запросов между процессами через Redis"""
+        if max_workers is None:
+            max_workers = int(os.getenv("GSPREAD_MAX_WORKERS", "4"))
+        # Пул соединений по числу потоков: каждый поток держит своё keep-alive соединение
+        self._sync = client or GSpreadClient(pool_size=max_workers)
+        if timeout is None:
+            timeout = float(os.getenv("GSPREAD_CALL_TIMEOUT", "45"))
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gspread")
+        # Одновременные одинаковые чтения ждут один запрос к Google
+        self.singleflight = SingleFlight()
+        self.distributed = distributed
+        self.breaker = CircuitBreaker()
+        # Последний успешный результат каждого чтения - на случай недоступности Google.
+        # Размер считается в строках листа, а не в записях: один лист участников весит как тысячи мелких чтений
+        self._last_good: LRUCache = LRUCache(
+            maxsize=int(os.getenv("GSHEETS_STALE_CACHE_ROWS", "20000")), getsizeof=_stale_entry_rows
+        )
+
+    @property
+    def sync(self) -> GSpreadClient:
+        """Синхронный клиент (для скриптов и фоновых задач вне event loop)"""
+        return self._sync
+
+    async def _run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        timeout = timeout if timeout is not None else self.timeout
+        # Крайний срок уходит в поток: ожидание токена и повторы не переживут wait_for
+        context = contextvars.copy_context()
+        context.run(call_deadline.set, time.monotonic() + timeout)
+        return await asyncio.wait_for(loop.run_in_executor(self._executor, context.run, call), timeout=timeout)
+
+    async def _guarded(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Вызов через размыкатель цепи: при недоступном Google отказ сразу, без ожидания таймаута"""
+        if not self.breaker.allow():
+            raise SheetsUnavailable()
+        try:
+            result = await self._run(func, *args, timeout=timeout)
+        except Exception as e:
+            if is_outage(e):
+                self.breaker.record_failure()
+            else:
+                # Google ответил (пусть и ошибкой) - значит, он доступен
+                self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _shared(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        codec: Optional[Tuple[Callable[[Any], Any], Callable[[Any], Any]]] = None,
+    ) -> Any:
+        """Чтение через single-flight по ключу (метод, таблица, лист, диапазон...).
+
+        Все ожидающие получают один и тот же объект результата - его нельзя менять.
+        codec - (encode, decode) для результатов, которые не являются JSON как есть.
+        Если Google недоступен, отдаётся последний успешный результат того же
+        чтения, а время его получения отмечается для Staleness.
+        """
+        key = flight_key(func.__name__, *args)
+        try:
+            value = await self.singleflight.do(key, lambda: self._fetch(key, func, args, timeout, codec))
+        except Exception as e:
+            last_good = self._last_good.get(key)
+            if last_good is None or not (isinstance(e, SheetsUnavailable) or is_outage(e)):
+                raise
+            value, fetched_at = last_good
+            stale_since = _stale_since.get()
+            _stale_since.set(fetched_at if stale_since is None else min(stale_since, fetched_at))
+            return value
+        try:
+            self._last_good[key] = (value, time.time())
+        except ValueError:
+            # Результат больше всего кэша - без запасной копии
+            self._last_good.pop(key, None)
+        return value
+
+    async def _fetch(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        timeout: Optional[float],
+        codec: Optional[Tuple[Callable[[Any], Any], Callable[[Any], Any]]],
+    ) -> Any:
+        async def call() -> Any:
+            return await self._guarded(func, *args, timeout=timeout)
+
+        if self.distributed is None:
+            return await call()
+        encode, decode = codec or (lambda value: value, lambda data: data)
+        return await self.distributed.do(key, call, encode, decode)
+
+    async def list_worksheet_titles(self, spreadsheet_id: str, timeout: Optional[float] = None) -> List[str]:
+        return await self._shared(self._sync.list_worksheet_titles, spreadsheet_id, timeout=timeout)
+
+    async def read_participants(
+        self, spreadsheet_id: str, worksheet_title: str = "участники", timeout: Optional[float] = None
+    ) -> List[Dict]:
+        return await self._shared(self._sync.read_participants, spreadsheet_id, worksheet_title, timeout=timeout)
+
+    async def read_tabs_batch(
+        self,
+        spreadsheet_id: str,
+        titles: Sequence[str],
+        ranges: Union[None, str, Sequence[Optional[str]]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, List[List[str]]]:
+        return await self._shared(self._sync.read_tabs_batch, spreadsheet_id, titles, ranges, timeout=timeout)
+
+    async def read_tab(
+        self,
+        spreadsheet_id: str,
+        worksheet_title: str,
+        timeout: Optional[float] = None,
+        columns: Optional[ColumnAliases] = None,
+        revision: Optional[str] = None,
+    ) -> TabSnapshot:
+        """Значения листа (см. GSpreadClient.read_tab).
+
+        columns - читать только колонки с этими заголовками (см. GSpreadClient.read_projected).
+        revision - версия таблицы в Drive: снимок этой версии на диске заменяет чтение из Google.
+        """
+        return await self._shared(
+            self._sync.read_tab, spreadsheet_id, worksheet_title, columns, revision, timeout=timeout, codec=_TAB_CODEC
+        )
+
+    async def read_participant_rows(
+        self, spreadsheet_id: str, worksheet_title: str = "участники", timeout: Optional[float] = None
+    ) -> List[ParticipantRow]:
+        return await self._shared(
+            self._sync.read_participant_rows, spreadsheet_id, worksheet_title, timeout=timeout, codec=_ROWS_CODEC
+        )
+
+    async def get_revision(self, spreadsheet_id: str, timeout: Optional[float] = None) -> str:
+        return await self._shared(self._sync.get_revision, spreadsheet_id, timeout=timeout)
+
+    async def get_row_count(self, spreadsheet_id: str, worksheet_title: str, timeout: Optional[float] = None) -> int:
+        return await self._shared(self._sync.get_row_count, spreadsheet_id, worksheet_title, timeout=timeout)
+
+    async def read_range(
+        self, spreadsheet_id: str, worksheet_title: str, a1_range: Optional[str] = None, timeout: Optional[float] = None
+    ) -> List[List[str]]:
+        return await self._shared(self._sync.read_range, spreadsheet_id, worksheet_title, a1_range, timeout=timeout)
+
+    async def read_columns(
+        self,
+        spreadsheet_id: str,
+        worksheet_title: str,
+        columns: Sequence[int],
+        first_row: int = 1,
+        last_row: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[List[str]]:
+        # Страницы потокового импорта не склеиваются и не копятся в запасном кэше - иначе весь лист осел бы в памяти
+        return await self._guarded(
+            self._sync.read_columns, spreadsheet_id, worksheet_title, columns, first_row, last_row, timeout=timeout
+        )
+
+    async def write_ranges(
+        self, spreadsheet_id: str, data: Sequence[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> int:
+        return await self._guarded(self._sync.write_ranges, spreadsheet_id, data, timeout=timeout)
+
+    async def ensure_columns(
+        self, spreadsheet_id: str, worksheet_title: str, count: int, timeout: Optional[float] = None
+    ) -> int:
+        return await self._guarded(self._sync.ensure_columns, spreadsheet_id, worksheet_title, count, timeout=timeout)
+
+    async def get_interviewer_sheets(self, spreadsheet_id: str, timeout: Optional[float] = None) -> List[str]:
+        return await self._shared(self._sync.get_interviewer_sheets, spreadsheet_id, timeout=timeout)
+
+    async def read_interviewers_from_sheet(
+        self, spreadsheet_id: str, sheet_name: str, timeout: Optional[float] = None
+    ) -> List[Dict]:
+        return await self._shared(self._sync.read_interviewers_from_sheet, spreadsheet_id, sheet_name, timeout=timeout)
+
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Метрики ограничителя запросов: ожидание, отказы, повторы"""
+        return self._sync.limiter.stats.snapshot()
+
+    def circuit_stats(self) -> Dict[str, Any]:
+        """Состояние размыкателя цепи и запасных копий на время недоступности Google"""
+        return {**self.breaker.stats(), "stale_entries": len(self._last_good), "stale_rows": self._last_good.currsize}
+
+    def invalidate(self, spreadsheet_id: Optional[str] = None) -> None:
+        """Сбрасывает кэш метаданных (см. GSpreadClient.invalidate)"""
+        self._sync.invalidate(spreadsheet_id)
+
+    async def test_connection(self) -> bool:
+        """Тестирует подключение к Google Sheets API"""
+        try:
+            await self._run(self._sync.list_spreadsheet_files)
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка тестирования подключения к Google Sheets: {e}")
+            return False
+
+    def close(self) -> None:
+        """Останавливает пул потоков, не дожидаясь зависших запросов"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._sync.close()
+
+
+# spreadsheet_id -> (лист, колонка) -> строка -> значение
+PendingCells = Dict[str, Dict[Tuple[str, int], Dict[int, Any]]]
+
+
+def _stale_entry_rows(entry: Tuple[Any, float]) -> int:
+    """Вес записи запасного кэша AsyncGSpreadClient - число строк в результате чтения"""
+    value = entry[0]
+    if isinstance(value, TabSnapshot):
+        return max(1, len(value.values))
+    if isinstance(value, dict):
+        return max(1, sum(len(rows) for rows in value.values() if isinstance(rows, list)))
+    if isinstance(value, list):
+        return max(1, len(value))
+    return 1
+
+
+def coalesce_cells(cells: Dict[Tuple[str, int], Dict[int, Any]]) -> List[Dict[str, Any]]:
+    """Склеивает ячейки одной колонки, идущие подряд, в вертикальные диапазоны"""
+    data: List[Dict[str, Any]] = []
+    for (title, col), rows in sorted(cells.items()):
+        run: List[Any] = []
+        run_start = prev = None
+        for row in sorted(rows):
+            if run and row != prev + 1:
+                data.append(_column_range(title, col, run_start, run))
+                run = []
+            if not run:
+                run_start = row
+            run.append(rows[row])
+            prev = row
+        if run:
+            data.append(_column_range(title, col, run_start, run))
+    return data
+
+
+def _column_range(title: str, col: int, start_row: int, values: List[Any]) -> Dict[str, Any]:
+    a1 = f"{rowcol_to_a1(start_row, col)}:{rowcol_to_a1(start_row + len(values) - 1, col)}"
+    return {"range": absolute_range_name(title, a1), "values": [[value] for value in values]}
+
+
+def _cell_count(cells: Dict[Tuple[str, int], Dict[int, Any]]) -> int:
+    return sum(len(rows) for rows in cells.values())
+
+
+class SheetsWriteBuffer:
+    """Отложенная запись в Google Sheets.
+
+    Изменения ячеек копятся в памяти (повторная запись в ту же ячейку
+    заменяет предыдущую), склеиваются в диапазоны и уходят одним
+    values:batchUpdate на таблицу - по таймеру или при накоплении
+    max_pending ячеек. После временного сбоя (квота, 5xx, таймаут) изменения
+    остаются в очереди до следующей записи, после постоянного (нет доступа,
+    запись за пределами листа) - отбрасываются.
+    """
+
+    def __init__(
+        self,
+        gs_client: AsyncGSpreadClient,
+        max_pending: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        self.gs_client = gs_client
+        self.max_pending = max_pending if max_pending is not None else int(
+            os.getenv("GSHEETS_WRITE_MAX_PENDING", "500")
+        )
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv("GSHEETS_WRITE_FLUSH_INTERVAL", "10")
+        )
+        self.cells_written = 0
+        self.cells_dropped = 0
+        self.requests_sent = 0
+        self._pending: PendingCells = {}
+        self._pending_count = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._timer_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    def set_cell(self, spreadsheet_id: str, worksheet_title: str, row: int, col: int, value: Any) -> None:
+        """Ставит в очередь запись значения в ячейку (row, col нумеруются с 1)"""
+        column = self._pending.setdefault(spreadsheet_id, {}).setdefault((worksheet_title, col), {})
+        if row not in column:
+            self._pending_count += 1
+        column[row] = "" if value is None else value
+        if self._pending_count >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self, spreadsheet_id: Optional[str] = None) -> int:
+        """Отправляет накопленные изменения; возвращает число записанных ячеек.
+
+        spreadsheet_id - записать только эту таблицу и пробросить ошибку записи вызывающему.
+        """
+        async with self._flush_lock:
+            if spreadsheet_id is None:
+                pending, self._pending = self._pending, {}
+            else:
+                cells = self._pending.pop(spreadsheet_id, None)
+                pending = {spreadsheet_id: cells} if cells else {}
+            self._pending_count -= sum(_cell_count(cells) for cells in pending.values())
+            written = 0
+            try:
+                for target, cells in pending.items():
+                    try:
+                        written += await self.gs_client.write_ranges(target, coalesce_cells(cells))
+                        self.requests_sent += 1
+                    except Exception as e:
+                        if is_transient(e):
+                            print(f"⚠️ Не удалось записать изменения в таблицу {target}, повторим позже: {describe_sheets_error(e)}")
+                            self._requeue(target, cells)
+                        else:
+                            self.cells_dropped += _cell_count(cells)
+                            print(f"❌ Изменения для таблицы {target} отброшены: {describe_sheets_error(e)}")
+                        if spreadsheet_id is not None:
+                            raise
+            finally:
+                self.cells_written += written
+            return written
+
+    def _requeue(self, spreadsheet_id: str, cells: Dict[Tuple[str, int], Dict[int, Any]]) -> None:
+        # Более свежие значения, поставленные во время записи, не перетираем
+        for (title, col), rows in cells.items():
+            for row, value in rows.items():
+                column = self._pending.setdefault(spreadsheet_id, {}).setdefault((title, col), {})
+                if row not in column:
+                    column[row] = value
+                    self._pending_count += 1
+
+    async def _run_timer(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending_count:
+                await self.flush()
+
+    def start(self) -> None:
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._run_timer())
+
+    async def stop(self) -> None:
+        """Останавливает таймер и дописывает всё, что осталось в очереди"""
+        if self._timer_task:
+            self._timer_task.cancel()
+            try:
+                await self._timer_task
+            except asyncio.CancelledError:
+                pass
+            self._timer_task = None
+        await self.flush()
@@ -0,0 +1,263 @@
+"""
+Потоковый импорт больших листов участников прямо в Postgres.
+
+Лист читается страницами по page_size строк и только из нужных колонок.
+Каждая страница сразу дописывается во временный CSV-файл на диске, а
+следующая в это время уже загружается из Google. В памяти одновременно не
+больше двух страниц. Соединение с базой берётся, только когда лист прочитан:
+файл уходит одним COPY во временную таблицу и сливается с participants в
+одной транзакции. bulk_upsert_participants делает то же для уже прочитанных
+строк, а sync_participants вызывает его, только если лист изменился с
+прошлого импорта.
+"""
+
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from typing import AsyncContextManager, AsyncIterator, BinaryIO, Callable, Iterable, List, Optional
+
+import asyncpg
+
+from database.repository import FacultySheetRecord, Repository
+from services.gspread_client import AsyncGSpreadClient
+from services.participant_sync import ParticipantSyncResult, fingerprint_rows, normalize_vk_id, row_fingerprint
+from services.rate_limiter import TokenBucket
+from services.sheet_rows import PARTICIPANT_HEADERS, PARTICIPANTS_TAB, HeaderPlan, ParticipantRow
+
+PAGE_SIZE = int(os.getenv("GSHEETS_IMPORT_PAGE_SIZE", "1000"))
+
+# Листы с сеткой больше этого числа строк импортируются потоково
+STREAM_IMPORT_MIN_ROWS = int(os.getenv("GSHEETS_STREAM_IMPORT_MIN_ROWS", "5000"))
+
+STAGING_TABLE = "participants_import"
+STAGING_COLUMNS = ("seq", "vk_id", "first_name", "last_name", "row_hash")
+
+_CREATE_STAGING_SQL = f"""
+    CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+        seq INTEGER NOT NULL,
+        vk_id BIGINT NOT NULL,
+        first_name VARCHAR(128) NOT NULL,
+        last_name VARCHAR(128) NOT NULL,
+        row_hash VARCHAR(64) NOT NULL
+    )
+"""
+
+# При дублях vk_id побеждает последняя строка листа; неизменённые строки не переписываются,
+# снятые ранее участники, вернувшиеся в лист, восстанавливаются
+_MERGE_SQL = f"""
+    WITH latest AS (
+        SELECT DISTINCT ON (vk_id) vk_id, first_name, last_name, row_hash
+        FROM {STAGING_TABLE}
+        ORDER BY vk_id, seq DESC
+    ), merged AS (
+        INSERT INTO participants (faculty_id, vk_id, first_name, last_name, row_hash, source_sheet_id)
+        SELECT $1, vk_id, first_name, last_name, row_hash, $2 FROM latest
+        ON CONFLICT (faculty_id, vk_id) DO UPDATE SET
+            first_name = EXCLUDED.first_name,
+            last_name = EXCLUDED.last_name,
+            row_hash = EXCLUDED.row_hash,
+            source_sheet_id = EXCLUDED.source_sheet_id,
+            removed_at = NULL,
+            updated_at = NOW()
+        WHERE participants.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+           OR participants.removed_at IS NOT NULL
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE inserted) AS inserted,
+        COUNT(*) FILTER (WHERE NOT inserted) AS changed,
+        (SELECT COUNT(DISTINCT vk_id) FROM {STAGING_TABLE}) AS total
+    FROM merged
+"""
+
+# Участников, пропавших из листа, только помечаем: строка и привязка tg_id сохраняются
+_DELETE_MISSING_SQL = f"""
+    UPDATE participants p SET removed_at = NOW(), updated_at = NOW()
+    WHERE p.faculty_id = $1
+      AND p.removed_at IS NULL
+      AND NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} i WHERE i.vk_id = p.vk_id)
+"""
+
+
+async def iter_participant_pages(
+    gs_client: AsyncGSpreadClient,
+    spreadsheet_id: str,
+    worksheet_title: str = PARTICIPANTS_TAB,
+    page_size: int = PAGE_SIZE,
+    budget: Optional[TokenBucket] = None,
+) -> AsyncIterator[List[ParticipantRow]]:
+    """Отдаёт участников листа страницами по page_size строк.
+
+    Запрос следующей страницы уходит до того, как текущая отдана
+    вызывающему, поэтому загрузка из Google идёт параллельно с записью.
+    budget - дополнительная квота, из которой оплачивается каждое чтение.
+    """
+
+    async def charge() -> None:
+        if budget is not None:
+            await budget.acquire_async()
+
+    row_count = await gs_client.get_row_count(spreadsheet_id, worksheet_title)
+    await charge()
+    header_values = await gs_client.read_range(spreadsheet_id, worksheet_title, "1:1")
+    if not header_values:
+        return
+    header = header_values[0]
+    columns = HeaderPlan.compile(header, PARTICIPANT_HEADERS).used_columns()
+    # Страницы читаются только из нужных колонок, поэтому план строится по ним
+    plan = HeaderPlan.compile([header[i] for i in columns], PARTICIPANT_HEADERS)
+    if not plan.has("vk_id"):
+        return
+
+    async def read(start: int, stop: int) -> List[List[str]]:
+        await charge()
+        return await gs_client.read_columns(spreadsheet_id, worksheet_title, columns, start, stop)
+
+    def fetch(start: int) -> "asyncio.Task[List[List[str]]]":
+        return asyncio.create_task(read(start, min(start + page_size - 1, row_count)))
+
+    start = 2
+    pending: Optional[asyncio.Task] = fetch(start) if start <= row_count else None
+    try:
+        while pending is not None:
+            values = await pending
+            start += page_size
+            # Пустые строки внутри листа не конец данных - идём до конца сетки
+            pending = fetch(start) if start <= row_count else None
+            page = [
+                ParticipantRow(vk_id, first_name, last_name)
+                for vk_id, first_name, last_name in plan.iter_rows(values)
+                if vk_id is not None
+            ]
+            if page:
+                yield page
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def normalize_participants(rows: Iterable[ParticipantRow], seq: int = 0) -> List[tuple]:
+    """Строки листа в записи для COPY в staging-таблицу; seq - номер последней уже записанной строки"""
+    records = []
+    for raw_vk_id, raw_first_name, raw_last_name in rows:
+        vk_id = normalize_vk_id(raw_vk_id)
+        if vk_id is None:
+            continue
+        first_name = (raw_first_name or "").strip()
+        last_name = (raw_last_name or "").strip()
+        seq += 1
+        records.append((seq, vk_id, first_name, last_name, row_fingerprint(vk_id, first_name, last_name)))
+    return records
+
+
+async def _spool_pages(pages: AsyncIterator[List[ParticipantRow]], spool: BinaryIO) -> int:
+    """Дописывает страницы в CSV-файл для COPY; возвращает число записанных строк"""
+    stream = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+    # Строки в кавычках: пустое имя в CSV без кавычек Postgres прочитал бы как NULL
+    writer = csv.writer(stream, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+    seq = 0
+    async for page in pages:
+        records = normalize_participants(page, seq)
+        if records:
+            writer.writerows(records)
+            seq = records[-1][0]
+    stream.flush()
+    # Файл закрывает вызывающий, обёртка его не трогает
+    stream.detach()
+    spool.seek(0)
+    return seq
+
+
+async def _create_staging(conn: asyncpg.Connection) -> None:
+    await conn.execute(_CREATE_STAGING_SQL)
+    await conn.execute(f"TRUNCATE {STAGING_TABLE}")
+
+
+async def _merge(
+    conn: asyncpg.Connection,
+    faculty_id: int,
+    source_sheet_id: Optional[int],
+    delete_missing: bool,
+    seq: int,
+) -> ParticipantSyncResult:
+    """Слияние временной таблицы с participants; вызывается внутри транзакции"""
+    merged = await conn.fetchrow(_MERGE_SQL, faculty_id, source_sheet_id)
+    # Пустой лист или лист без колонки vk_id скорее ошибка, чем конец отбора - не чистим базу
+    status = await conn.execute(_DELETE_MISSING_SQL, faculty_id) if delete_missing and seq else "UPDATE 0"
+    return ParticipantSyncResult(
+        inserted=merged["inserted"],
+        changed=merged["changed"],
+        deleted=int(status.split()[-1]),
+        total=merged["total"],
+    )
+
+
+async def bulk_upsert_participants(
+    conn: asyncpg.Connection,
+    rows: Iterable[ParticipantRow],
+    faculty_id: int,
+    source_sheet_id: Optional[int] = None,
+    delete_missing: bool = False,
+) -> ParticipantSyncResult:
+    """Записывает участников факультета одним COPY и одним INSERT ... ON CONFLICT в одной транзакции.
+
+    delete_missing - пометить снятыми участников факультета, которых нет среди rows.
+    """
+
+    records = normalize_participants(rows)
+    async with conn.transaction():
+        await _create_staging(conn)
+        if records:
+            await conn.copy_records_to_table(STAGING_TABLE, records=records, columns=STAGING_COLUMNS)
+        result = await _merge(conn, faculty_id, source_sheet_id, delete_missing, len(records))
+        await conn.execute(f"DROP TABLE {STAGING_TABLE}")
+    return result
+
+
+async def sync_participants(
+    repository: Repository,
+    sheet: FacultySheetRecord,
+    rows: Iterable[ParticipantRow],
+    worksheet_title: str = PARTICIPANTS_TAB,
+) -> ParticipantSyncResult:
+    """Приводит участников факультета к уже прочитанным строкам листа; неизменённый лист не трогает базу"""
+    rows = list(rows)
+    current, content_hash = fingerprint_rows(rows)
+    if await repository.get_tab_hash(sheet.id, worksheet_title) == content_hash:
+        return ParticipantSyncResult(total=len(current), unchanged=True)
+    async with repository.connection() as conn:
+        result = await bulk_upsert_participants(conn, rows, sheet.faculty_id, sheet.id, delete_missing=True)
+    await repository.save_tab_state(sheet.id, worksheet_title, content_hash, len(current))
+    return result
+
+
+async def stream_import_participants(
+    connect: Callable[[], AsyncContextManager[asyncpg.Connection]],
+    pages: AsyncIterator[List[ParticipantRow]],
+    faculty_id: int,
+    faculty_sheet_id: int,
+    worksheet_title: str = PARTICIPANTS_TAB,
+) -> ParticipantSyncResult:
+    """Сохраняет страницы участников во временный файл и сливает их с participants.
+
+    connect - фабрика соединения (repository.connection, pool.acquire). Пока
+    идёт чтение из Google, соединение не занято: оно берётся после последней
+    страницы на COPY файла и слияние в одной транзакции. Участники, которых
+    нет в листе, помечаются снятыми, сохранённый отпечаток листа сбрасывается,
+    чтобы следующий инкрементальный импорт сравнил лист с базой заново.
+    """
+    with tempfile.TemporaryFile() as spool:
+        seq = await _spool_pages(pages, spool)
+        async with connect() as conn, conn.transaction():
+            await _create_staging(conn)
+            if seq:
+                await conn.copy_to_table(STAGING_TABLE, source=spool, columns=STAGING_COLUMNS, format="csv")
+            result = await _merge(conn, faculty_id, faculty_sheet_id, True, seq)
+            await conn.execute(
+                "DELETE FROM sheet_tab_states WHERE faculty_sheet_id = $1 AND tab_name = $2",
+                faculty_sheet_id, worksheet_title,
+            )
+            await conn.execute(f"DROP TABLE {STAGING_TABLE}")
+    return result
@@ -0,0 +1,58 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from services.sheet_rows import ParticipantRow
+
+_VK_ID_RE = re.compile(r"^(?:https?://)?(?:m\.)?(?:vk\.com/)?(?:id)?(\d+)/?$", re.IGNORECASE)
+
+
+def normalize_vk_id(value: Any) -> Optional[int]:
+    """Приводит vk_id из таблицы (число, "id123", ссылка vk.com/id123) к int"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    match = _VK_ID_RE.match(str(value).strip())
+    return int(match.group(1)) if match else None
+
+
+def row_fingerprint(vk_id: int, first_name: str, last_name: str) -> str:
+    """Отпечаток содержимого строки участника"""
+    payload = "\x1f".join((str(vk_id), first_name, last_name))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def fingerprint_rows(rows: Iterable[ParticipantRow]) -> Tuple[Dict[int, Dict], str]:
+    """Нормализует строки листа и считает отпечатки строк и всего листа"""
+    current: Dict[int, Dict] = {}
+    for raw_vk_id, raw_first_name, raw_last_name in rows:
+        vk_id = normalize_vk_id(raw_vk_id)
+        if vk_id is None:
+            continue
+        first_name = (raw_first_name or "").strip()
+        last_name = (raw_last_name or "").strip()
+        # При дублях vk_id в листе побеждает последняя строка
+        current[vk_id] = {
+            "vk_id": vk_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "row_hash": row_fingerprint(vk_id, first_name, last_name),
+        }
+
+    tab_hash = hashlib.sha1()
+    for row in current.values():
+        tab_hash.update(row["row_hash"].encode("ascii"))
+    return current, tab_hash.hexdigest()
+
+
+@dataclass
+class ParticipantSyncResult:
+    inserted: int = 0
+    changed: int = 0
+    deleted: int = 0
+    total: int = 0
+    # True, если лист не изменился с прошлого импорта и база не трогалась
+    unchanged: bool = False
+
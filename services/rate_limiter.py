@@ -0,0 +1,200 @@
+import asyncio
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+import redis
+
+# Крайний срок текущего вызова Sheets по time.monotonic(); выставляет AsyncGSpreadClient._run,
+# чтобы поток не ждал токен дольше, чем вызывающий готов ждать ответ
+call_deadline: ContextVar[Optional[float]] = ContextVar("sheets_call_deadline", default=None)
+
+# Как часто повторять предупреждение о переходе на локальный лимит, сек
+FALLBACK_WARNING_INTERVAL = 60.0
+
+
+def remaining_wait(limit: float) -> float:
+    """limit, урезанный до времени, оставшегося до крайнего срока вызова"""
+    deadline = call_deadline.get()
+    if deadline is None:
+        return limit
+    return max(0.0, min(limit, deadline - time.monotonic()))
+
+
+class SheetsQuotaExceeded(RuntimeError):
+    """Квота Google Sheets исчерпана: ждать токен дольше допустимого или Google вернул 429"""
+
+    def __init__(self, message: str = "Превышена квота запросов к Google Sheets, попробуйте через минуту") -> None:
+        super().__init__(message)
+
+
+@dataclass
+class RateLimiterStats:
+    """Метрики ограничителя: сколько ждали, сколько отказов и повторов"""
+    acquired: int = 0
+    rejected: int = 0
+    waited_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    retries: int = 0
+    throttled_responses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_acquire(self, waited: float) -> None:
+        with self._lock:
+            self.acquired += 1
+            self.waited_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def record_rejection(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def record_retry(self, throttled: bool) -> None:
+        with self._lock:
+            self.retries += 1
+            if throttled:
+                self.throttled_responses += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+                "waited_seconds": round(self.waited_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "retries": self.retries,
+                "throttled_responses": self.throttled_responses,
+            }
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket на процесс.
+
+    Токены резервируются заранее: вызывающий получает время ожидания своей
+    очереди, поэтому параллельные потоки выстраиваются честно, без гонок.
+    """
+
+    def __init__(self, capacity: float, rate: float, max_wait: float, stats: Optional[RateLimiterStats] = None) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.max_wait = max_wait
+        self.stats = stats or RateLimiterStats()
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float, max_wait: float) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= tokens else (tokens - self._tokens) / self.rate
+            if wait > max_wait:
+                return None
+            self._tokens -= tokens
+            return wait
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Блокирует поток до получения токена, возвращает время ожидания"""
+        wait = self._reserve(tokens, remaining_wait(self.max_wait))
+        if wait is None:
+            self.stats.record_rejection()
+            raise SheetsQuotaExceeded()
+        if wait > 0:
+            time.sleep(wait)
+        self.stats.record_acquire(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """То же, что acquire, но ждёт очереди без блокировки event loop"""
+        wait = self._reserve(tokens, remaining_wait(self.max_wait))
+        if wait is None:
+            self.stats.record_rejection()
+            raise SheetsQuotaExceeded()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self.stats.record_acquire(wait)
+        return wait
+
+
+# KEYS[1] - ключ бакета; ARGV: capacity, rate (токенов в секунду), requested, max_wait.
+# Возвращает время ожидания в секундах или -1, если ждать пришлось бы дольше max_wait.
+_REDIS_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < requested then
+    wait = (requested - tokens) / rate
+end
+if wait > max_wait then
+    return '-1'
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - requested), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket, общий для всех процессов бота через Redis.
+
+    При недоступности Redis переходит на локальный бакет этого процесса.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        key: str,
+        capacity: float,
+        rate: float,
+        max_wait: float,
+        stats: Optional[RateLimiterStats] = None,
+    ) -> None:
+        super().__init__(capacity, rate, max_wait, stats)
+        self.key = key
+        self._redis = redis.Redis.from_url(redis_url, socket_timeout=2)
+        self._script = self._redis.register_script(_REDIS_BUCKET_SCRIPT)
+        self._fallback_warned_at: Optional[float] = None
+        self._fallbacks = 0
+
+    def _reserve(self, tokens: float, max_wait: float) -> Optional[float]:
+        try:
+            wait = float(self._script(keys=[self.key], args=[self.capacity, self.rate, tokens, max_wait]))
+        except redis.RedisError as e:
+            self._warn_fallback(e)
+            return super()._reserve(tokens, max_wait)
+        return None if wait < 0 else wait
+
+    def _warn_fallback(self, error: redis.RedisError) -> None:
+        # Пока Redis лежит, каждый запрос идёт через локальный бакет - не пишем об этом на каждый
+        with self._lock:
+            self._fallbacks += 1
+            now = time.monotonic()
+            if self._fallback_warned_at is not None and now - self._fallback_warned_at < FALLBACK_WARNING_INTERVAL:
+                return
+            self._fallback_warned_at, fallbacks, self._fallbacks = now, self._fallbacks, 0
+        print(f"⚠️ Redis недоступен для лимита Google Sheets, используем локальный ({fallbacks} запр.): {error}")
+
+
+def create_sheets_rate_limiter() -> TokenBucket:
+    """Создаёт ограничитель по квоте чтения Sheets API из переменных окружения"""
+    per_minute = float(os.getenv("GSHEETS_READ_QUOTA_PER_MINUTE", "60"))
+    capacity = float(os.getenv("GSHEETS_QUOTA_BURST", str(per_minute)))
+    max_wait = float(os.getenv("GSHEETS_MAX_QUOTA_WAIT", "20"))
+    rate = per_minute / 60.0
+
+    if os.getenv("GSHEETS_SHARED_QUOTA", "").lower() in ("1", "true", "yes"):
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        return RedisTokenBucket(redis_url, "otbor:gsheets:quota", capacity, rate, max_wait)
+    return TokenBucket(capacity, rate, max_wait)
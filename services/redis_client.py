@@ -1,7 +1,7 @@
 import json
 import os
 import secrets
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis.asyncio as redis
 from dotenv import load_dotenv
@@ -49,17 +49,37 @@ class RedisClient:
         results = await pipe.execute()
         return True
 
-    async def generate_invite_token(self, interviewer_id: int, faculty_id: int, expires_in: int = 86400) -> str:
-        """Генерирует токен приглашения для собеседующего"""
-        token = secrets.token_urlsafe(32)
-        invite_data = {
+    @staticmethod
+    def new_invite_token() -> str:
+        return secrets.token_urlsafe(32)
+
+    @staticmethod
+    def _invite_data(interviewer_id: int, faculty_id: int) -> Dict[str, Any]:
+        return {
             "interviewer_id": interviewer_id,
             "faculty_id": faculty_id,
             "type": "interviewer_invite"
         }
-        await self.set_json(f"invite:{token}", invite_data, ex=expires_in)
+
+    async def generate_invite_token(self, interviewer_id: int, faculty_id: int, expires_in: int = 86400) -> str:
+        """Генерирует токен приглашения для собеседующего"""
+        token = self.new_invite_token()
+        await self.set_json(f"invite:{token}", self._invite_data(interviewer_id, faculty_id), ex=expires_in)
         return token
 
+    async def store_invite_tokens(self, invites: Dict[str, Tuple[int, int]], expires_in: int = 86400) -> None:
+        """Сохраняет пачку уже выданных токенов одним pipeline: token -> (interviewer_id, faculty_id)"""
+        if not invites:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for token, (interviewer_id, faculty_id) in invites.items():
+            pipe.set(
+                f"{self.prefix}invite:{token}",
+                json.dumps(self._invite_data(interviewer_id, faculty_id)),
+                ex=expires_in,
+            )
+        await pipe.execute()
+
     async def get_invite_data(self, token: str) -> Optional[Dict[str, Any]]:
         """Получает данные приглашения по токену"""
         return await self.get_json(f"invite:{token}")
@@ -79,3 +99,5 @@ class CacheKeys:
     INVITES = "invites:{token}"
     PENDING = "pending:{user_id}"
     BOT_USERNAME = "bot_username"
+    SHEET_TABS = "sheets:tabs:{spreadsheet_id}"
+    SHEET_PARTICIPANTS = "sheets:participants:{spreadsheet_id}:{tab}"
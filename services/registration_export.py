@@ -0,0 +1,62 @@
+from typing import Dict
+
+from gspread.utils import rowcol_to_a1
+
+from services.gspread_client import AsyncGSpreadClient, SheetsWriteBuffer
+from services.participant_sync import normalize_vk_id
+from services.sheet_rows import PARTICIPANT_HEADERS, PARTICIPANTS_TAB, HeaderPlan
+
+REGISTRATION_STATUS_HEADER = "Статус регистрации"
+REGISTERED = "зарегистрирован"
+NOT_REGISTERED = "не зарегистрирован"
+
+
+def _column_letter(col: int) -> str:
+    return rowcol_to_a1(1, col)[:-1]
+
+
+async def export_registration_status(
+    gs_client: AsyncGSpreadClient,
+    writer: SheetsWriteBuffer,
+    spreadsheet_id: str,
+    registered: Dict[int, bool],
+    worksheet_title: str = PARTICIPANTS_TAB,
+) -> int:
+    """Ставит в очередь записи статусы регистрации участников в лист svod.
+
+    registered - vk_id -> привязан ли Telegram. Колонка статуса ищется по
+    заголовку и при отсутствии добавляется справа. Пишутся только ячейки,
+    значение которых изменилось. Возвращает число поставленных в очередь ячеек.
+    """
+    header_values = await gs_client.read_range(spreadsheet_id, worksheet_title, "1:1")
+    header = [str(title).strip() for title in header_values[0]] if header_values else []
+    plan = HeaderPlan.compile(header, PARTICIPANT_HEADERS)
+    if not plan.has("vk_id"):
+        return 0
+    vk_col = plan.columns[0][0] + 1
+
+    queued = 0
+    if REGISTRATION_STATUS_HEADER in header:
+        status_col = header.index(REGISTRATION_STATUS_HEADER) + 1
+        letter = _column_letter(status_col)
+        current = await gs_client.read_range(spreadsheet_id, worksheet_title, f"{letter}2:{letter}")
+    else:
+        status_col = len(header) + 1
+        current = []
+        # Если заголовок занимает всю сетку, запись в новую колонку Google отклонит - расширяем лист
+        await gs_client.ensure_columns(spreadsheet_id, worksheet_title, status_col)
+        writer.set_cell(spreadsheet_id, worksheet_title, 1, status_col, REGISTRATION_STATUS_HEADER)
+        queued += 1
+
+    letter = _column_letter(vk_col)
+    vk_values = await gs_client.read_range(spreadsheet_id, worksheet_title, f"{letter}2:{letter}")
+    for index, cells in enumerate(vk_values):
+        vk_id = normalize_vk_id(cells[0]) if cells else None
+        if vk_id is None or vk_id not in registered:
+            continue
+        status = REGISTERED if registered[vk_id] else NOT_REGISTERED
+        old = current[index][0] if index < len(current) and current[index] else ""
+        if old != status:
+            writer.set_cell(spreadsheet_id, worksheet_title, index + 2, status_col, status)
+            queued += 1
+    return queued
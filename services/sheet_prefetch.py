@@ -0,0 +1,220 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from services.circuit_breaker import SheetsUnavailable
+from services.gspread_client import AsyncGSpreadClient, Staleness, is_outage
+from services.participant_stream import STREAM_IMPORT_MIN_ROWS
+from services.redis_client import CacheKeys, RedisClient
+from services.sheet_rows import PARTICIPANT_HEADERS, PARTICIPANTS_TAB, ParticipantRow, iter_participant_rows
+
+INTERVIEWER_KINDS = ("ne_opyt", "opyt")
+
+
+class PrefetchTarget(NamedTuple):
+    faculty_id: int
+    kind: str
+    spreadsheet_id: str
+
+
+@dataclass
+class TabsSnapshot:
+    """Список листов таблицы на момент fetched_at"""
+    titles: List[str]
+    fetched_at: float = 0.0
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+@dataclass
+class ParticipantsSnapshot:
+    rows: List[ParticipantRow]
+    fetched_at: float = 0.0
+    # Версия таблицы в Drive, которой соответствуют строки (None - неизвестна)
+    revision: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class SheetPrefetchWorker:
+    """Фоновая синхронизация Google Sheets в Redis.
+
+    Периодически перечитывает списки листов, листы собеседующих и участников
+    svod для всех таблиц из faculty_sheets. Таблица перечитывается, только если
+    изменилась её версия в Drive. Обработчики читают локальную копию, а к Google
+    идут только при её отсутствии, устаревании или по запросу (force).
+    """
+
+    def __init__(
+        self,
+        gs_client: AsyncGSpreadClient,
+        redis_client: RedisClient,
+        load_targets: Optional[Callable[[], Awaitable[List[PrefetchTarget]]]] = None,
+        interval: Optional[float] = None,
+        max_age: Optional[float] = None,
+    ) -> None:
+        self.gs_client = gs_client
+        self.redis_client = redis_client
+        self.load_targets = load_targets
+        self.interval = interval if interval is not None else float(os.getenv("GSHEETS_PREFETCH_INTERVAL", "300"))
+        # Копия старше max_age считается непригодной и перечитывается синхронно
+        self.max_age = max_age if max_age is not None else float(
+            os.getenv("GSHEETS_PREFETCH_MAX_AGE", str(self.interval * 3))
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh_tabs(self, spreadsheet_id: str, revision: Optional[str] = None) -> TabsSnapshot:
+        """revision - версия таблицы в Drive, полученная до чтения (см. refresh_target)"""
+        fetched_at = time.time()
+        # При недоступном Google клиент отдаёт прошлые ответы - тогда и копия не новее их
+        with Staleness() as staleness:
+            titles = await self.gs_client.list_worksheet_titles(spreadsheet_id)
+        snapshot = TabsSnapshot(titles=titles, fetched_at=staleness.since or fetched_at)
+        await self.redis_client.set_json(
+            CacheKeys.SHEET_TABS.format(spreadsheet_id=spreadsheet_id),
+            {
+                "titles": snapshot.titles,
+                "fetched_at": snapshot.fetched_at,
+                # Устаревший ответ нельзя считать соответствующим версии
+                "revision": revision if staleness.since is None else None,
+            },
+        )
+        return snapshot
+
+    async def refresh_participants(
+        self,
+        spreadsheet_id: str,
+        worksheet_title: str = PARTICIPANTS_TAB,
+        revision: Optional[str] = None,
+    ) -> ParticipantsSnapshot:
+        """revision - версия таблицы в Drive, полученная до чтения листа;
+        снимок листа этой версии на диске заменяет чтение из Google (например, после рестарта).
+        """
+        with Staleness() as staleness:
+            tab = await self.gs_client.read_tab(
+                spreadsheet_id, worksheet_title, columns=PARTICIPANT_HEADERS, revision=revision
+            )
+        if staleness.since is not None:
+            revision = None
+        snapshot = ParticipantsSnapshot(
+            rows=list(iter_participant_rows(tab.values)), fetched_at=tab.fetched_at, revision=revision
+        )
+        await self.redis_client.set_json(
+            CacheKeys.SHEET_PARTICIPANTS.format(spreadsheet_id=spreadsheet_id, tab=worksheet_title),
+            {"rows": [list(row) for row in snapshot.rows], "fetched_at": snapshot.fetched_at, "revision": revision},
+        )
+        return snapshot
+
+    async def get_tabs(self, spreadsheet_id: str, force: bool = False) -> TabsSnapshot:
+        data = await self.redis_client.get_json(CacheKeys.SHEET_TABS.format(spreadsheet_id=spreadsheet_id))
+        cached = TabsSnapshot(data["titles"], data["fetched_at"]) if data else None
+        if cached and not force and cached.age <= self.max_age:
+            return cached
+        try:
+            return await self.refresh_tabs(spreadsheet_id)
+        except Exception as e:
+            # Google лежит - лучше устаревшая копия, чем ошибка; её возраст виден по fetched_at
+            if cached and (isinstance(e, SheetsUnavailable) or is_outage(e)):
+                return cached
+            raise
+
+    async def get_participants(
+        self,
+        spreadsheet_id: str,
+        worksheet_title: str = PARTICIPANTS_TAB,
+        force: bool = False,
+        revision: Optional[str] = None,
+    ) -> ParticipantsSnapshot:
+        """revision - текущая версия таблицы: копия этой же версии годится при любом возрасте,
+        копия другой версии перечитывается
+        """
+        data = await self.redis_client.get_json(
+            CacheKeys.SHEET_PARTICIPANTS.format(spreadsheet_id=spreadsheet_id, tab=worksheet_title)
+        )
+        cached = ParticipantsSnapshot(
+            [ParticipantRow(*row) for row in data["rows"]], data["fetched_at"], data.get("revision")
+        ) if data else None
+        if cached and not force:
+            if revision is not None and cached.revision == revision:
+                return cached
+            if revision is None and cached.age <= self.max_age:
+                return cached
+        try:
+            return await self.refresh_participants(spreadsheet_id, worksheet_title, revision=revision)
+        except Exception as e:
+            if cached and (isinstance(e, SheetsUnavailable) or is_outage(e)):
+                return cached
+            raise
+
+    async def _touch(self, key: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """Продлевает копию, не перечитывая таблицу: её версия в Drive не изменилась"""
+        data = data if data is not None else await self.redis_client.get_json(key)
+        if data is None:
+            return False
+        data["fetched_at"] = time.time()
+        await self.redis_client.set_json(key, data)
+        return True
+
+    async def refresh_target(self, target: PrefetchTarget) -> None:
+        """Перечитывает таблицу, только если её версия в Drive изменилась с прошлого раза"""
+        spreadsheet_id = target.spreadsheet_id
+        with Staleness() as staleness:
+            revision = await self.gs_client.get_revision(spreadsheet_id)
+        if staleness.since is not None:
+            # Google недоступен - копии остаются как есть
+            return
+
+        tabs_key = CacheKeys.SHEET_TABS.format(spreadsheet_id=spreadsheet_id)
+        cached_tabs = await self.redis_client.get_json(tabs_key)
+        if cached_tabs and cached_tabs.get("revision") == revision:
+            await self._touch(tabs_key, cached_tabs)
+            if target.kind == "svod":
+                participants_key = CacheKeys.SHEET_PARTICIPANTS.format(spreadsheet_id=spreadsheet_id, tab=PARTICIPANTS_TAB)
+                await self._touch(participants_key)
+            return
+
+        if target.kind in INTERVIEWER_KINDS:
+            await self.refresh_tabs(spreadsheet_id, revision=revision)
+        elif target.kind == "svod":
+            # Большие листы импортируются потоково, копию в Redis для них не держим
+            row_count = await self.gs_client.get_row_count(spreadsheet_id, PARTICIPANTS_TAB)
+            if row_count <= STREAM_IMPORT_MIN_ROWS:
+                await self.refresh_participants(spreadsheet_id, revision=revision)
+            # Версия в копии списка листов пишется последней: при сбое выше таблица перечитается
+            await self.refresh_tabs(spreadsheet_id, revision=revision)
+
+    async def refresh_all(self) -> None:
+        if not self.load_targets:
+            return
+        for target in await self.load_targets():
+            try:
+                await self.refresh_target(target)
+            except Exception as e:
+                print(f"⚠️ Ошибка фонового обновления таблицы {target.kind} ({target.spreadsheet_id}): {e}")
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                print(f"⚠️ Ошибка фоновой синхронизации Google Sheets: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
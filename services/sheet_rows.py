@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Лист со списком участников в сводной таблице (svod)
+PARTICIPANTS_TAB = "участники"
+
+# Поле -> возможные заголовки колонки в порядке приоритета
+PARTICIPANT_HEADERS: Dict[str, Tuple[str, ...]] = {
+    "vk_id": ("vk_id", "VK_ID", "vk", "vk id"),
+    "first_name": ("first_name", "Имя", "name"),
+    "last_name": ("last_name", "Фамилия", "surname"),
+}
+
+INTERVIEWER_HEADERS: Dict[str, Tuple[str, ...]] = {
+    "name": ("name", "Имя", "ФИО", "interviewer", "собеседующий", "проверяющий", "экзаменатор"),
+}
+
+# Лист собеседующего в opyt/ne_opyt: строка - слот, пустой "Участник" - слот свободен
+SLOT_HEADERS: Dict[str, Tuple[str, ...]] = {
+    "day": ("Дата", "День", "date", "day"),
+    "time": ("Время", "time", "Слот", "slot"),
+    "participant": ("Участник", "participant", "ФИО участника"),
+}
+
+
+class ParticipantRow(NamedTuple):
+    vk_id: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+
+
+class InterviewerRow(NamedTuple):
+    name: str
+
+
+class SlotRow(NamedTuple):
+    day: str
+    time: str
+    busy: bool
+
+
+class HeaderPlan:
+    """Заголовок листа, один раз разобранный в индексы колонок.
+
+    Для каждого поля хранится кортеж индексов колонок-синонимов, найденных
+    в заголовке, в порядке приоритета. Значение поля - первая непустая ячейка
+    из этих колонок, как в цепочке r.get(a) or r.get(b) or ...
+    """
+
+    __slots__ = ("fields", "columns")
+
+    def __init__(self, fields: Sequence[str], columns: Sequence[Tuple[int, ...]]) -> None:
+        self.fields = tuple(fields)
+        self.columns = tuple(columns)
+
+    @classmethod
+    def compile(cls, header: Sequence[str], aliases: Dict[str, Tuple[str, ...]]) -> "HeaderPlan":
+        positions: Dict[str, int] = {}
+        for index, title in enumerate(header):
+            # При повторяющихся заголовках берём первую колонку
+            positions.setdefault(str(title).strip(), index)
+        columns = [
+            tuple(positions[alias] for alias in names if alias in positions)
+            for names in aliases.values()
+        ]
+        return cls(aliases.keys(), columns)
+
+    def used_columns(self) -> List[int]:
+        """Индексы всех найденных колонок по возрастанию - что читать при проекции"""
+        return sorted({index for indices in self.columns for index in indices})
+
+    def has(self, field: str) -> bool:
+        return bool(self.columns[self.fields.index(field)])
+
+    def extract(self, row: Sequence[str]) -> Tuple[Optional[str], ...]:
+        values: List[Optional[str]] = []
+        size = len(row)
+        for indices in self.columns:
+            value = None
+            for index in indices:
+                # Короткие строки: Google обрезает пустые ячейки в конце
+                if index < size and row[index] != "":
+                    value = row[index]
+                    break
+            values.append(value)
+        return tuple(values)
+
+    def iter_rows(self, rows: Iterable[Sequence[str]]) -> Iterator[Tuple[Optional[str], ...]]:
+        extract = self.extract
+        for row in rows:
+            yield extract(row)
+
+
+def iter_participant_rows(values: Iterable[Sequence[str]]) -> Iterator[ParticipantRow]:
+    """Строки листа участников (первая строка - заголовок) без пустого vk_id"""
+    rows = iter(values)
+    header = next(rows, None)
+    if header is None:
+        return
+    plan = HeaderPlan.compile(header, PARTICIPANT_HEADERS)
+    for vk_id, first_name, last_name in plan.iter_rows(rows):
+        if vk_id is None:
+            continue
+        yield ParticipantRow(vk_id, first_name, last_name)
+
+
+def iter_interviewer_rows(values: Iterable[Sequence[str]]) -> Iterator[InterviewerRow]:
+    """Имена собеседующих из листа (первая строка - заголовок)"""
+    rows = iter(values)
+    header = next(rows, None)
+    if header is None:
+        return
+    plan = HeaderPlan.compile(header, INTERVIEWER_HEADERS)
+    if not plan.has("name"):
+        return
+    for (name,) in plan.iter_rows(rows):
+        if name and name.strip():
+            yield InterviewerRow(name.strip())
+
+
+def iter_slot_rows(values: Iterable[Sequence[str]]) -> Iterator[SlotRow]:
+    """Слоты из листа собеседующего (первая строка - заголовок)"""
+    rows = iter(values)
+    header = next(rows, None)
+    if header is None:
+        return
+    plan = HeaderPlan.compile(header, SLOT_HEADERS)
+    if not plan.has("time"):
+        return
+    day = ""
+    for raw_day, raw_time, participant in plan.iter_rows(rows):
+        # Дата обычно в объединённой ячейке - только в первой строке дня
+        if raw_day and raw_day.strip():
+            day = raw_day.strip()
+        if not raw_time or not raw_time.strip():
+            continue
+        yield SlotRow(day, raw_time.strip(), bool(participant and participant.strip()))
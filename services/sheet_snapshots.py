@@ -0,0 +1,109 @@
+"""
+Снимки листов Google Sheets на диске для тёплого старта.
+
+Каждый лист хранится отдельным файлом <каталог>/<spreadsheet_id>/<лист>.jsonl.gz:
+первая строка - метаданные (время чтения, версия таблицы в Drive, набор колонок,
+хэш содержимого), дальше по строке JSON на строку листа. Снимок пишется только
+для чтений с известной версией и отдаётся вместо запроса к Google, пока версия
+таблицы в Drive не изменилась - в том числе после рестарта бота.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+from urllib.parse import quote
+
+SNAPSHOT_SUFFIX = ".jsonl.gz"
+
+
+def values_hash(values: Sequence[Sequence[str]]) -> str:
+    """Хэш содержимого листа"""
+    digest = hashlib.sha1()
+    for row in values:
+        digest.update(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+@dataclass
+class TabSnapshot:
+    """Значения листа на момент fetched_at"""
+    spreadsheet_id: str
+    title: str
+    values: List[List[str]]
+    fetched_at: float
+    revision: Optional[str] = None
+    content_hash: str = ""
+    # Заголовки прочитанных колонок через запятую; пусто - лист целиком
+    projection: str = ""
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class SheetSnapshotStore:
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+
+    @classmethod
+    def from_env(cls) -> Optional["SheetSnapshotStore"]:
+        """Хранилище из GSHEETS_SNAPSHOT_DIR; без переменной снимки не ведутся"""
+        directory = os.getenv("GSHEETS_SNAPSHOT_DIR", "")
+        return cls(directory) if directory else None
+
+    def _path(self, spreadsheet_id: str, title: str) -> Path:
+        return self.directory / quote(spreadsheet_id, safe="") / (quote(title, safe="") + SNAPSHOT_SUFFIX)
+
+    def save(self, snapshot: TabSnapshot) -> None:
+        path = self._path(snapshot.spreadsheet_id, snapshot.title)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "spreadsheet_id": snapshot.spreadsheet_id,
+            "title": snapshot.title,
+            "fetched_at": snapshot.fetched_at,
+            "revision": snapshot.revision,
+            "content_hash": snapshot.content_hash,
+            "projection": snapshot.projection,
+            "rows": len(snapshot.values),
+        }
+        # Пишем во временный файл и подменяем атомарно, чтобы не оставить обрезанный снимок
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+            f.write(json.dumps(meta, ensure_ascii=False) + "\n")
+            for row in snapshot.values:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+    def get(self, spreadsheet_id: str, title: str, revision: str, projection: str = "") -> Optional[TabSnapshot]:
+        """Снимок листа, если он снят с той же версии таблицы и с тем же набором колонок"""
+        path = self._path(spreadsheet_id, title)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                meta = json.loads(f.readline())
+                if meta.get("revision") != revision or meta.get("projection", "") != projection:
+                    return None
+                values = [json.loads(line) for line in f]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Пропущен повреждённый снимок листа {title}: {e}")
+            return None
+        if len(values) != meta["rows"]:
+            print(f"⚠️ Пропущен обрезанный снимок листа {title}: {len(values)} из {meta['rows']} строк")
+            return None
+        return TabSnapshot(
+            spreadsheet_id=spreadsheet_id,
+            title=title,
+            values=values,
+            fetched_at=meta["fetched_at"],
+            revision=revision,
+            content_hash=meta.get("content_hash", ""),
+            projection=projection,
+        )
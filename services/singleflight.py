@@ -0,0 +1,145 @@
+"""
+Склейка одинаковых одновременных запросов (single-flight).
+
+SingleFlight - внутри процесса: пока запрос по ключу выполняется, остальные
+вызывающие ждут тот же результат. RedisSingleFlight - между процессами:
+запрос выполняет владелец Redis-блокировки, а остальные забирают его
+результат из Redis.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from redis.exceptions import LockError, RedisError
+
+from services.redis_client import RedisClient
+
+T = TypeVar("T")
+
+
+def flight_key(*parts: Any) -> str:
+    """Короткий стабильный ключ по частям запроса (таблица, лист, диапазон...)"""
+    payload = json.dumps(parts, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            self.started += 1
+
+            def forget(done: asyncio.Future) -> None:
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            future.add_done_callback(forget)
+        else:
+            self.shared += 1
+        # Отмена одного ожидающего не должна отменять запрос для остальных
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, int]:
+        return {"started": self.started, "shared": self.shared, "in_flight": self.in_flight}
+
+
+class RedisSingleFlight:
+    """Single-flight между процессами бота через Redis.
+
+    Результат хранится в Redis result_ttl секунд, поэтому повторный запрос
+    сразу после завершения (двойное нажатие кнопки) тоже получает его.
+    При недоступности Redis запрос выполняется напрямую.
+    """
+
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        lock_ttl: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+        poll_interval: float = 0.1,
+    ) -> None:
+        self.redis = redis_client.redis
+        self.prefix = f"{redis_client.prefix}singleflight:"
+        self.lock_ttl = lock_ttl if lock_ttl is not None else float(os.getenv("GSHEETS_SINGLEFLIGHT_LOCK_TTL", "60"))
+        self.result_ttl = result_ttl if result_ttl is not None else float(
+            os.getenv("GSHEETS_SINGLEFLIGHT_RESULT_TTL", "5")
+        )
+        self.poll_interval = poll_interval
+        self.started = 0
+        self.shared = 0
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[T]],
+        encode: Callable[[T], Any] = lambda value: value,
+        decode: Callable[[Any], T] = lambda data: data,
+    ) -> T:
+        """encode/decode переводят результат в JSON-совместимый вид и обратно"""
+        result_key = f"{self.prefix}result:{key}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        try:
+            while True:
+                cached = await self.redis.get(result_key)
+                if cached is not None:
+                    self.shared += 1
+                    return decode(json.loads(cached))
+
+                lock = self.redis.lock(f"{self.prefix}lock:{key}", timeout=self.lock_ttl)
+                if await lock.acquire(blocking=False):
+                    self.started += 1
+                    try:
+                        value = await func()
+                        # Результат кладём до снятия блокировки, иначе ожидающий начнёт запрос заново
+                        await self._store(result_key, encode(value))
+                    finally:
+                        await self._release(lock)
+                    return value
+
+                if loop.time() >= deadline:
+                    # Владелец блокировки завис - читаем сами
+                    break
+                await asyncio.sleep(self.poll_interval)
+        except RedisError as e:
+            print(f"⚠️ Redis недоступен для склейки запросов Google Sheets: {e}")
+        return await func()
+
+    async def _store(self, result_key: str, data: Any) -> None:
+        try:
+            await self.redis.set(result_key, json.dumps(data, ensure_ascii=False), px=int(self.result_ttl * 1000))
+        except RedisError as e:
+            print(f"⚠️ Не удалось сохранить результат запроса Google Sheets в Redis: {e}")
+
+    async def _release(self, lock: Any) -> None:
+        try:
+            await lock.release()
+        except LockError:
+            # Блокировка истекла, пока шёл запрос
+            pass
+        except RedisError as e:
+            print(f"⚠️ Не удалось снять блокировку запроса Google Sheets: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"started": self.started, "shared": self.shared}
+
+
+def create_distributed_singleflight(redis_client: RedisClient) -> Optional[RedisSingleFlight]:
+    """Межпроцессная склейка запросов включается через GSHEETS_SHARED_SINGLEFLIGHT"""
+    if os.getenv("GSHEETS_SHARED_SINGLEFLIGHT", "").lower() in ("1", "true", "yes"):
+        return RedisSingleFlight(redis_client)
+    return None
@@ -0,0 +1,24 @@
+import pytest
+
+from tests.fakes import FakeSheetsBackend
+from services.gspread_client import AsyncGSpreadClient, GSpreadClient
+
+
+@pytest.fixture
+def sheets_backend():
+    """Локальная имитация Sheets API и Drive"""
+    return FakeSheetsBackend()
+
+
+@pytest.fixture
+def sheets_client(sheets_backend):
+    """Асинхронный клиент поверх имитации; пул потоков закрывается после теста"""
+    client = AsyncGSpreadClient(client=GSpreadClient(session=sheets_backend.session()), max_workers=2)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def no_retries(monkeypatch):
+    """Ошибки Google сразу доходят до вызывающего; подключать раньше sheets_client"""
+    monkeypatch.setenv("GSPREAD_MAX_RETRIES", "0")
@@ -0,0 +1,311 @@
+"""
+Локальная имитация Google Sheets / Drive API для тестов и бенчмарков.
+
+FakeSheetsBackend хранит таблицы в памяти и подключается к requests.Session
+как транспортный адаптер, поэтому GSpreadClient работает с ним без сети и
+credentials. Поддерживает задержку ответа, случайные ответы 429 и полную недоступность (503).
+Как и Google, отвечает 400 на запись за пределами сетки листа.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+
+SHEETS_PREFIX = "https://sheets.googleapis.com/"
+DRIVE_PREFIX = "https://www.googleapis.com/"
+
+_CELL_RE = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def column_index(letters: str) -> int:
+    """'A' -> 0, 'Z' -> 25, 'AA' -> 26"""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - ord("A") + 1)
+    return index - 1
+
+
+def parse_a1(a1_range: str) -> Tuple[str, Optional[Tuple[int, int, int, int]]]:
+    """Разбирает "'Лист'!A1:C10" в (лист, (row0, col0, row1, col1)); None - весь лист"""
+    if a1_range.startswith("'"):
+        end = 1
+        while True:
+            end = a1_range.index("'", end)
+            if a1_range[end + 1:end + 2] == "'":
+                end += 2
+                continue
+            break
+        title = a1_range[1:end].replace("''", "'")
+        rest = a1_range[end + 1:]
+    else:
+        title, _, rest = a1_range.partition("!")
+        rest = "!" + rest if rest else ""
+    if not rest:
+        return title, None
+
+    start, _, stop = rest[1:].partition(":")
+    stop = stop or start
+    bounds = []
+    for cell, default_row, default_col in ((start, 0, 0), (stop, None, None)):
+        letters, digits = _CELL_RE.match(cell).groups()
+        row = int(digits) - 1 if digits else default_row
+        col = column_index(letters) if letters else default_col
+        bounds.extend((row, col))
+    return title, (bounds[0], bounds[1], bounds[2], bounds[3])
+
+
+class FakeSpreadsheet:
+    def __init__(self, spreadsheet_id: str, title: str, tabs: Dict[str, List[List[str]]]) -> None:
+        self.id = spreadsheet_id
+        self.title = title
+        self.tabs = tabs
+        self.version = 1
+        self.modified_time = datetime.now(timezone.utc)
+        # Размер сетки листа, заданный через resize; иначе - по самой длинной строке, но не меньше 26
+        self.column_counts: Dict[str, int] = {}
+
+    def column_count(self, title: str) -> int:
+        if title in self.column_counts:
+            return self.column_counts[title]
+        return max(26, max((len(r) for r in self.tabs.get(title, [])), default=0))
+
+    def touch(self) -> None:
+        self.version += 1
+        self.modified_time = datetime.now(timezone.utc)
+
+    def metadata(self) -> dict:
+        return {
+            "spreadsheetId": self.id,
+            "properties": {"title": self.title, "locale": "ru_RU", "timeZone": "Europe/Moscow"},
+            "sheets": [
+                {
+                    "properties": {
+                        "sheetId": index,
+                        "title": title,
+                        "index": index,
+                        "sheetType": "GRID",
+                        "gridProperties": {
+                            "rowCount": max(len(rows), 1000),
+                            "columnCount": self.column_count(title),
+                        },
+                    }
+                }
+                for index, (title, rows) in enumerate(self.tabs.items())
+            ],
+        }
+
+    def drive_metadata(self) -> dict:
+        return {
+            "kind": "drive#file",
+            "id": self.id,
+            "name": self.title,
+            "mimeType": "application/vnd.google-apps.spreadsheet",
+            "createdTime": self.modified_time.isoformat().replace("+00:00", "Z"),
+            "modifiedTime": self.modified_time.isoformat().replace("+00:00", "Z"),
+            "version": str(self.version),
+        }
+
+    def read(self, a1_range: str, major_dimension: str = "ROWS") -> dict:
+        title, bounds = parse_a1(a1_range)
+        if title not in self.tabs:
+            raise KeyError(title)
+        rows = self.tabs[title]
+        if bounds is not None:
+            row0, col0, row1, col1 = bounds
+            rows = [
+                row[col0:None if col1 is None else col1 + 1]
+                for row in rows[row0:None if row1 is None else row1 + 1]
+            ]
+        if major_dimension == "COLUMNS":
+            width = max((len(row) for row in rows), default=0)
+            rows = [[row[c] if c < len(row) else "" for row in rows] for c in range(width)]
+        # Как и Google, обрезаем пустые ячейки и строки в конце
+        rows = [list(row) for row in rows]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        response = {"range": a1_range, "majorDimension": major_dimension}
+        if rows:
+            response["values"] = rows
+        return response
+
+    def write(self, a1_range: str, values: List[List[str]]) -> int:
+        title, bounds = parse_a1(a1_range)
+        rows = self.tabs.setdefault(title, [])
+        row0, col0 = (bounds[0], bounds[1]) if bounds else (0, 0)
+        width = max((len(row) for row in values), default=0)
+        if col0 + width > self.column_count(title):
+            raise ValueError(f"Range ({a1_range}) exceeds grid limits. Max columns: {self.column_count(title)}")
+        cells = 0
+        for r, new_row in enumerate(values):
+            while len(rows) <= row0 + r:
+                rows.append([])
+            target = rows[row0 + r]
+            for c, value in enumerate(new_row):
+                while len(target) <= col0 + c:
+                    target.append("")
+                target[col0 + c] = "" if value is None else str(value)
+                cells += 1
+        return cells
+
+
+class FakeSheetsBackend(BaseAdapter):
+    """Транспортный адаптер requests, отвечающий как Sheets v4 и Drive v3"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        # True - имитация недоступности Google: все запросы получают 503
+        self.down = False
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+        self.request_count = 0
+        self.throttled_count = 0
+        self.requests_by_kind: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # --- наполнение данными ---
+
+    def add_spreadsheet(self, spreadsheet_id: str, tabs: Dict[str, List[List[str]]], title: Optional[str] = None) -> FakeSpreadsheet:
+        spreadsheet = FakeSpreadsheet(spreadsheet_id, title or spreadsheet_id, tabs)
+        self.spreadsheets[spreadsheet_id] = spreadsheet
+        return spreadsheet
+
+    def generate_participants(self, spreadsheet_id: str, rows: int, extra_columns: int = 0, tab: str = "участники") -> FakeSpreadsheet:
+        header = ["vk_id", "Имя", "Фамилия"] + [f"extra_{i}" for i in range(extra_columns)]
+        data = [header] + [
+            [str(100000 + i), f"Имя{i}", f"Фамилия{i}"] + [f"x{i}_{j}" for j in range(extra_columns)]
+            for i in range(rows)
+        ]
+        return self.add_spreadsheet(spreadsheet_id, {tab: data})
+
+    def generate_interviewer_tabs(self, spreadsheet_id: str, tabs: int, rows: int = 20) -> FakeSpreadsheet:
+        data = {
+            f"Собеседующий {t}": [["Время", "Участник"]] + [[f"{9 + r % 10}:00", ""] for r in range(rows)]
+            for t in range(tabs)
+        }
+        return self.add_spreadsheet(spreadsheet_id, data)
+
+    def session(self) -> requests.Session:
+        """requests.Session, все запросы которой к Google уходят в этот backend"""
+        session = requests.Session()
+        session.mount(SHEETS_PREFIX, self)
+        session.mount(DRIVE_PREFIX, self)
+        return session
+
+    # --- транспорт ---
+
+    def _response(self, request: requests.PreparedRequest, status: int, payload: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(payload).encode("utf-8")
+        response.headers["Content-Type"] = "application/json; charset=UTF-8"
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        return response
+
+    def _error(self, request: requests.PreparedRequest, status: int, message: str, reason: str) -> requests.Response:
+        return self._response(request, status, {"error": {"code": status, "message": message, "status": reason}})
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            self.request_count += 1
+            throttled = self.error_rate and self._random.random() < self.error_rate
+            if throttled:
+                self.throttled_count += 1
+        if throttled:
+            return self._error(request, 429, "Quota exceeded for quota metric 'Read requests'", "RESOURCE_EXHAUSTED")
+        if self.down:
+            return self._error(request, 503, "The service is currently unavailable.", "UNAVAILABLE")
+
+        url = urlparse(request.url)
+        params = parse_qs(url.query)
+        path = url.path
+        try:
+            if request.url.startswith(SHEETS_PREFIX):
+                return self._sheets(request, path[len("/v4/spreadsheets/"):], params)
+            if path.startswith("/drive/v3/files"):
+                return self._drive(request, path[len("/drive/v3/files"):].strip("/"), params)
+        except KeyError as e:
+            return self._error(request, 404, f"Requested entity was not found: {e}", "NOT_FOUND")
+        return self._error(request, 404, f"Unsupported fake endpoint: {path}", "NOT_FOUND")
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.requests_by_kind[kind] = self.requests_by_kind.get(kind, 0) + 1
+
+    def _sheets(self, request: requests.PreparedRequest, path: str, params: dict) -> requests.Response:
+        spreadsheet_id, _, rest = path.partition("/")
+        if ":" in spreadsheet_id:
+            spreadsheet_id, _, action = spreadsheet_id.partition(":")
+            rest = ":" + action
+        spreadsheet = self.spreadsheets[spreadsheet_id]
+
+        if not rest:
+            self._count("metadata")
+            return self._response(request, 200, spreadsheet.metadata())
+        if rest == "values:batchGet":
+            self._count("values.batchGet")
+            ranges = params.get("ranges", [])
+            major_dimension = params.get("majorDimension", ["ROWS"])[0]
+            return self._response(request, 200, {
+                "spreadsheetId": spreadsheet_id,
+                "valueRanges": [spreadsheet.read(r, major_dimension) for r in ranges],
+            })
+        if rest == ":batchUpdate":
+            self._count("batchUpdate")
+            titles = list(spreadsheet.tabs)
+            for item in json.loads(request.body or b"{}").get("requests", []):
+                properties = item.get("updateSheetProperties", {}).get("properties", {})
+                columns = properties.get("gridProperties", {}).get("columnCount")
+                if columns is not None:
+                    spreadsheet.column_counts[titles[properties["sheetId"]]] = columns
+            return self._response(request, 200, {"spreadsheetId": spreadsheet_id, "replies": []})
+        if rest == "values:batchUpdate":
+            self._count("values.batchUpdate")
+            body = json.loads(request.body or b"{}")
+            try:
+                cells = sum(spreadsheet.write(item["range"], item.get("values", [])) for item in body.get("data", []))
+            except ValueError as e:
+                return self._error(request, 400, str(e), "INVALID_ARGUMENT")
+            spreadsheet.touch()
+            return self._response(request, 200, {
+                "spreadsheetId": spreadsheet_id,
+                "totalUpdatedCells": cells,
+                "responses": [],
+            })
+        if rest.startswith("values/"):
+            self._count("values.get")
+            major_dimension = params.get("majorDimension", ["ROWS"])[0]
+            return self._response(request, 200, spreadsheet.read(unquote(rest[len("values/"):]), major_dimension))
+        return self._error(request, 404, f"Unsupported fake endpoint: {rest}", "NOT_FOUND")
+
+    def _drive(self, request: requests.PreparedRequest, file_id: str, params: dict) -> requests.Response:
+        if file_id:
+            self._count("drive.get")
+            return self._response(request, 200, self.spreadsheets[file_id].drive_metadata())
+        self._count("drive.list")
+        return self._response(request, 200, {
+            "kind": "drive#fileList",
+            "files": [s.drive_metadata() for s in self.spreadsheets.values()],
+        })
+
+    def close(self) -> None:
+        pass
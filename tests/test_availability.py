@@ -0,0 +1,23 @@
+from services.availability import AvailabilityMatrix, decode_mask, encode_mask
+
+
+def test_availability_matrix():
+    """Проверяет разбор листов собеседующих в битовую матрицу свободных слотов"""
+    tabs = {
+        1: [["Дата", "Время", "Участник"], ["14.10", "10:00", ""], ["", "14:00", "Иванов"], ["15.10", "9:00", ""]],
+        2: [["Дата", "Время", "Участник"], ["14.10", "14:00", ""], ["", "10:00", ""]],
+        # Лист без колонки времени не даёт слотов
+        3: [["Имя"], ["Петров"]],
+    }
+    matrix = AvailabilityMatrix.from_tabs(7, tabs)
+
+    assert matrix.slots == [("14.10", "10:00"), ("14.10", "14:00"), ("15.10", "9:00")]
+    assert matrix.free_at("14.10", "14:00") == [2]
+    assert sorted(matrix.free_at("14.10", "10:00")) == [1, 2]
+    assert matrix.capacity_by_day() == {"14.10": 3, "15.10": 1}
+    assert matrix.slot_capacity() == [2, 1, 1]
+    assert matrix.free_slots(3) == []
+
+    size = len(matrix.slots)
+    restored = {i: decode_mask(encode_mask(mask, size)) for i, mask in matrix.masks.items()}
+    assert restored == matrix.masks
@@ -0,0 +1,280 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import asyncpg
+import pytest
+
+from bot.middlewares.db_scope import DbScopeMiddleware
+from bot.routers.superadmin_asyncpg import SuperAdminRouter
+from database.dao import FacultyDAO
+from database.models import SheetKind
+from database.prepared import StatementRegistry
+from database.repository import AsyncpgRepository, FacultyRecord, Repository, UpdateScope, _sheet_kind, asyncpg_dsn, create_repository
+from init_database import FACULTY_STATS_COUNTERS, faculty_stats_trigger_sql
+from services.faculty_directory import FacultyDirectory, invalidate_faculty_directory
+
+
+def test_repository_backend_selection(monkeypatch):
+    """Проверяет выбор бэкенда репозитория и разбор URL базы"""
+    assert asyncpg_dsn("asyncpg+postgresql://u:p@db:5432/x") == "postgresql://u:p@db:5432/x"
+    assert asyncpg_dsn("postgresql+asyncpg://u:p@db:5432/x") == "postgresql://u:p@db:5432/x"
+    # Вид из init_database и вид из SQLAlchemy Enum читаются одинаково
+    assert _sheet_kind("svod") is _sheet_kind("SVOD") is SheetKind.SVOD
+
+    monkeypatch.delenv("DB_BACKEND", raising=False)
+    monkeypatch.setenv("DATABASE_URL", "asyncpg+postgresql://u:p@db:5432/x")
+    repository = create_repository()
+    # Пул создаётся при первом запросе, а не при настройке роутеров
+    assert isinstance(repository, AsyncpgRepository) and repository.pool is None
+    assert repository.dsn == "postgresql://u:p@db:5432/x"
+    # Интерфейс без бэкенда не создаётся
+    with pytest.raises(TypeError):
+        Repository()
+
+
+def test_statement_registry_reuses_prepared():
+    """Проверяет, что запрос готовится один раз на соединение, а дальше берётся готовым"""
+
+    class Statement:
+        def __init__(self, query):
+            self.query = query
+
+        async def fetchrow(self, *args):
+            return (self.query, args)
+
+    class Connection:
+        def __init__(self):
+            self.prepared_statements = {}
+            self.prepared = 0
+
+        async def prepare(self, query):
+            self.prepared += 1
+            return Statement(query)
+
+    registry = StatementRegistry({"admin": "SELECT $1"})
+    first, second = Connection(), Connection()
+
+    async def run():
+        await registry.prepare_all(first)
+        assert await registry.fetchrow(first, "admin", 1) == ("SELECT $1", (1,))
+        await registry.fetchrow(first, "admin", 2)
+        # Соединение без init-хука готовит запрос при первом обращении
+        await registry.fetchrow(second, "admin", 3)
+        await registry.fetchrow(second, "admin", 4)
+
+    asyncio.run(run())
+
+    assert first.prepared == second.prepared == 1
+    assert registry.stats() == {"hits": 3, "misses": 1, "by_statement": {"admin": (3, 1)}}
+
+
+def test_statement_registry_skips_missing_tables():
+    """Проверяет, что запрос к ещё не созданной таблице не ломает init-хук и готовится при первом обращении"""
+    schema = {"admins"}
+
+    class Statement:
+        async def fetch(self, *args):
+            return []
+
+    class Connection:
+        def __init__(self):
+            self.prepared_statements = {}
+
+        async def prepare(self, query):
+            table = query.split()[-1]
+            if table not in schema:
+                raise asyncpg.UndefinedTableError(f'relation "{table}" does not exist')
+            return Statement()
+
+    registry = StatementRegistry({"admin": "SELECT * FROM admins", "stats": "SELECT * FROM faculty_stats"})
+    conn = Connection()
+
+    async def run():
+        await registry.prepare_all(conn)
+        assert list(conn.prepared_statements) == ["admin"]
+        schema.add("faculty_stats")
+        assert await registry.fetch(conn, "stats") == []
+
+    asyncio.run(run())
+    assert registry.stats()["by_statement"]["stats"] == (0, 1)
+
+
+def test_db_scope_one_connection_per_update():
+    """Проверяет, что на апдейт берётся не больше одного соединения и только по требованию"""
+
+    class CountingRepository(AsyncpgRepository):
+        def __init__(self):
+            self.acquired = self.released = 0
+
+        async def _acquire_for_scope(self):
+            self.acquired += 1
+
+            async def release():
+                self.released += 1
+
+            return object(), release
+
+    repository = CountingRepository()
+    middleware = DbScopeMiddleware(repository)
+
+    async def handler(event, data):
+        scope = UpdateScope.current(repository)
+        assert scope is data["db"] and not scope.acquired
+        assert await scope.get() is await scope.get()
+
+    async def idle_handler(event, data):
+        return "ok"
+
+    async def google_handler(event, data):
+        # Перед запросом к Google соединение отдаётся, после него берётся новое
+        first = await data["db"].get()
+        await UpdateScope.release_current(repository)
+        assert not data["db"].acquired
+        assert await data["db"].get() is not first
+
+    async def run():
+        await middleware(handler, None, {})
+        assert await middleware(idle_handler, None, {}) == "ok"
+        await middleware(google_handler, None, {})
+        # Вне апдейта scope нет
+        assert UpdateScope.current(repository) is None
+
+    asyncio.run(run())
+
+    assert repository.acquired == repository.released == 3
+    stats = middleware.stats()
+    assert stats["updates"] == 3 and stats["acquired"] == 2
+
+
+def test_faculty_directory_invalidation():
+    """Проверяет, что справочник факультетов читает базу один раз и перечитывает после записи"""
+    faculties = [FacultyRecord(2, "mgmt", "Менеджмент", True), FacultyRecord(1, "econ", "Экономика", True)]
+    loads = []
+
+    async def load_faculties():
+        loads.append(1)
+        return list(faculties)
+
+    directory = FacultyDirectory(load_faculties, ttl=60)
+
+    async def run():
+        assert [f.title for f in await directory.all()] == ["Менеджмент", "Экономика"]
+        assert (await directory.get(1)).slug == "econ"
+        assert (await directory.by_slug("mgmt")).id == 2
+        assert (await directory.by_title(" экономика ")).id == 1
+        assert (await directory.resolve("2")).id == 1
+        assert await directory.resolve("3") is None
+        assert len(loads) == 1
+
+        # Новый факультет виден сразу после записи
+        faculties.append(FacultyRecord(3, "law", "Право", True))
+        invalidate_faculty_directory()
+        assert (await directory.resolve("право")).id == 3
+        assert len(loads) == 2
+
+        # И после истечения ttl
+        directory.ttl = 0
+        await directory.all()
+        assert len(loads) == 3
+
+    asyncio.run(run())
+    assert directory.stats() == {"faculties": 3, "hits": 5, "loads": 3}
+
+
+def test_faculty_dao_writes_reload_directory():
+    """Проверяет, что изменение и удаление факультета через FacultyDAO сбрасывают справочник"""
+    loads = []
+
+    async def load_faculties():
+        loads.append(1)
+        return [FacultyRecord(1, "econ", "Экономика", True)]
+
+    class Result:
+        rowcount = 1
+
+        def scalar_one_or_none(self):
+            return None
+
+    class Session:
+        async def execute(self, statement):
+            return Result()
+
+        async def commit(self):
+            pass
+
+    directory = FacultyDirectory(load_faculties, ttl=60)
+    dao = FacultyDAO(Session())
+
+    async def run():
+        await directory.all()
+        await dao.update(1, title="Экономика и право")
+        await directory.all()
+        await dao.delete(1)
+        await directory.all()
+
+    asyncio.run(run())
+    assert len(loads) == 3
+
+
+def test_faculty_stats_triggers_cover_every_write():
+    """Проверяет, что счётчики faculty_stats ведутся триггерами на вставку, изменение и удаление"""
+    for table, counters in FACULTY_STATS_COUNTERS.items():
+        function, *triggers = faculty_stats_trigger_sql(table, counters)
+        created = [t for t in triggers if t.startswith("CREATE TRIGGER")]
+        assert [t.split()[2] for t in created] == [f"faculty_stats_{table}_{op}" for op in ("insert", "update", "delete")]
+        # Один запуск на оператор, а не на строку
+        assert all("FOR EACH STATEMENT" in t and f"ON {table} " in t for t in created)
+        assert "OLD TABLE" in created[1] and "NEW TABLE" in created[1]
+        for column in counters:
+            assert f"{column} = s.{column} + d.{column}" in function
+            assert f"d.{column} <> 0" in function
+
+    interviewers = faculty_stats_trigger_sql("interviewers", FACULTY_STATS_COUNTERS["interviewers"])[0]
+    assert "-(tg_id IS NOT NULL)::int AS interviewers_registered FROM old_rows" in interviewers
+
+
+def test_faculty_stats_fall_back_to_live_counts():
+    """Проверяет, что без таблицы faculty_stats статус считает участников напрямую"""
+    queries = []
+
+    class Connection:
+        async def fetch(self, query):
+            queries.append(query)
+            if "FROM faculty_stats" in query:
+                raise asyncpg.UndefinedTableError('relation "faculty_stats" does not exist')
+            return [{"title": "Экономика", "admins": 2}]
+
+    class Pool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield Connection()
+
+    router = SuperAdminRouter(Pool(), None, None)
+    stats = asyncio.run(router.get_faculty_stats())
+    assert stats == [{"title": "Экономика", "admins": 2}]
+    assert len(queries) == 2 and "removed_at IS NULL" in queries[1]
+
+
+def test_superadmin_writes_go_through_repository():
+    """Проверяет, что привязка таблицы идёт через репозиторий и сбрасывает версию прошлого импорта"""
+    calls = []
+
+    class Connection:
+        async def fetchrow(self, query, *args):
+            calls.append((" ".join(query.split()), args))
+            return {
+                "id": 7, "faculty_id": args[0], "kind": args[1], "spreadsheet_id": args[2],
+                "sheet_name": args[3], "synced_revision": None,
+            }
+
+    class Pool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield Connection()
+
+    router = SuperAdminRouter(Pool(), None, None)
+    sheet = asyncio.run(router.repository.upsert_sheet(1, SheetKind.SVOD, "abc", "svod"))
+    assert sheet.kind is SheetKind.SVOD and sheet.synced_revision is None
+    query, args = calls[0]
+    assert args == (1, "svod", "abc", "svod")
+    assert "ON CONFLICT (faculty_id, kind) DO UPDATE" in query and "synced_revision = NULL" in query
@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+
+from database.models import SheetKind
+from database.repository import AsyncpgRepository, FacultySheetRecord
+from init_database import FACULTY_STATS_COUNTERS
+from services.participant_stream import (
+    bulk_upsert_participants,
+    normalize_participants,
+    stream_import_participants,
+    sync_participants,
+)
+from services.participant_sync import fingerprint_rows, row_fingerprint
+from services.sheet_rows import ParticipantRow
+
+
+class RecordingConnection:
+    """Соединение asyncpg, которое только запоминает запросы и открыта ли транзакция"""
+
+    def __init__(self):
+        self.in_transaction = False
+        self.events = []
+        # (вид, запрос без отступов, внутри транзакции)
+        self.statements = []
+
+    def transaction(self):
+        connection = self
+
+        class Transaction:
+            async def __aenter__(self):
+                connection.in_transaction = True
+                connection.events.append("begin")
+
+            async def __aexit__(self, *exc):
+                connection.in_transaction = False
+                connection.events.append("commit")
+
+        return Transaction()
+
+    def _record(self, kind, query):
+        self.statements.append((kind, " ".join(query.split()), self.in_transaction))
+
+    async def execute(self, query, *args):
+        self._record("execute", query)
+        self.events.append(("execute", query.split()[0], self.in_transaction))
+        # Два участника факультета пропали из листа
+        return "UPDATE 2" if query.split()[0] == "UPDATE" else "OK"
+
+    async def copy_records_to_table(self, table, records, columns):
+        self._record("copy", table)
+
+    async def copy_to_table(self, table, source, columns, format):
+        self._record("copy", table)
+        self.copied = source.read().decode()
+
+    async def fetchrow(self, query, *args):
+        self._record("fetchrow", query)
+        return {"inserted": 3, "changed": 0, "total": 3}
+
+
+def test_normalize_participants_for_copy():
+    """Проверяет подготовку строк участников к COPY в staging-таблицу"""
+    rows = [
+        ParticipantRow("vk.com/id101", " Анна ", "Иванова"),
+        ParticipantRow("не ссылка", "Пётр", "Петров"),
+        ParticipantRow("102", None, "Сидоров"),
+    ]
+    records = normalize_participants(rows, seq=10)
+
+    assert [record[:4] for record in records] == [(11, 101, "Анна", "Иванова"), (12, 102, "", "Сидоров")]
+    assert records[0][4] == row_fingerprint(101, "Анна", "Иванова")
+
+
+def test_unchanged_sheet_skips_participant_sync():
+    """Проверяет, что лист с прежним отпечатком не открывает соединение с базой"""
+    rows = [ParticipantRow("1", "Имя", "Фамилия")]
+    _, content_hash = fingerprint_rows(rows)
+
+    class StoredHash(AsyncpgRepository):
+        async def get_tab_hash(self, faculty_sheet_id, tab_name):
+            return content_hash
+
+        def connection(self):
+            raise AssertionError("unchanged sheet must not touch participants")
+
+    sheet = FacultySheetRecord(id=1, faculty_id=1, kind=SheetKind.SVOD, spreadsheet_id="svod", synced_revision=None)
+    result = asyncio.run(sync_participants(StoredHash(), sheet, rows))
+    assert result.unchanged and result.total == 1
+
+
+def test_stream_import_connects_after_reading():
+    """Проверяет, что соединение берётся только после чтения листа, а COPY и слияние идут в одной транзакции"""
+    connection = RecordingConnection()
+
+    @contextlib.asynccontextmanager
+    async def connect():
+        connection.events.append("acquire")
+        yield connection
+
+    async def pages():
+        for page in ([ParticipantRow("1", "А", "Б"), ParticipantRow("2", "", "Г")], [ParticipantRow("3", "Д", "Е")]):
+            connection.events.append("page")
+            yield page
+
+    result = asyncio.run(stream_import_participants(connect, pages(), faculty_id=1, faculty_sheet_id=1))
+    events = connection.events
+    assert result.inserted == 3 and result.deleted == 2
+    assert events[:4] == ["page", "page", "acquire", "begin"]
+    assert all(in_transaction for _, _, in_transaction in connection.statements)
+    assert events[-2] == ("execute", "DROP", True)
+    # Пустое имя уходит в COPY строкой в кавычках, а не NULL
+    lines = connection.copied.splitlines()
+    assert len(lines) == 3 and lines[1].startswith('2,2,"",')
+
+
+def test_missing_participants_are_soft_deleted():
+    """Проверяет, что пропавшие из листа участники помечаются снятыми, а не удаляются"""
+    connection = RecordingConnection()
+    rows = [ParticipantRow("1", "Имя", "Фамилия")]
+    result = asyncio.run(bulk_upsert_participants(connection, rows, faculty_id=1, delete_missing=True))
+
+    assert result.deleted == 2
+    queries = [query for kind, query, _ in connection.statements if kind == "execute"]
+    assert not any(query.startswith("DELETE FROM participants") for query in queries)
+    removal = next(query for query in queries if query.startswith("UPDATE participants"))
+    assert "removed_at = NOW()" in removal
+    # Снятый участник при возвращении в лист восстанавливается, даже если строка не изменилась
+    merge = next(query for kind, query, _ in connection.statements if kind == "fetchrow")
+    assert "removed_at = NULL" in merge and "participants.removed_at IS NOT NULL" in merge
+    # Снятые участники не попадают в счётчики статуса
+    assert all("removed_at IS NULL" in expr for expr in FACULTY_STATS_COUNTERS["participants"].values())
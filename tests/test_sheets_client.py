@@ -0,0 +1,298 @@
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import google.auth.credentials
+import pytest
+from gspread.exceptions import APIError
+
+from services.circuit_breaker import CircuitBreaker
+from services.google_auth import CredentialRefresher
+from services.gspread_client import AsyncGSpreadClient, GSpreadClient, SheetsWriteBuffer, Staleness
+from services.participant_stream import iter_participant_pages
+from services.rate_limiter import SheetsQuotaExceeded, TokenBucket, call_deadline
+from services.registration_export import REGISTRATION_STATUS_HEADER, export_registration_status
+from services.sheet_rows import PARTICIPANT_HEADERS
+from services.sheet_snapshots import SheetSnapshotStore
+
+
+def test_fake_sheets_backend(sheets_backend):
+    """Проверяет GSpreadClient на локальной имитации Sheets API (без сети)"""
+    sheets_backend.generate_participants("svod", rows=50, extra_columns=5)
+    sheets_backend.generate_interviewer_tabs("opyt", tabs=3)
+    gs_client = GSpreadClient(session=sheets_backend.session())
+
+    titles = gs_client.list_worksheet_titles("opyt")
+    assert titles == ["Собеседующий 0", "Собеседующий 1", "Собеседующий 2"]
+
+    participants = gs_client.read_participants("svod")
+    assert len(participants) == 50
+    assert participants[0] == {"vk_id": "100000", "first_name": "Имя0", "last_name": "Фамилия0"}
+
+    tabs = gs_client.read_tabs_batch("opyt", titles, "A1:B3")
+    assert all(len(values) == 3 for values in tabs.values())
+    # Один batchGet - колонки участников, второй - листы собеседующих
+    assert sheets_backend.requests_by_kind["values.batchGet"] == 2
+
+
+def test_participant_pages(sheets_backend, sheets_client):
+    """Проверяет постраничное чтение участников для потокового импорта"""
+    spreadsheet = sheets_backend.generate_participants("svod", rows=2500, extra_columns=3)
+    # Пустая строка внутри листа не должна обрывать чтение
+    spreadsheet.tabs["участники"][1000] = []
+    budget = TokenBucket(capacity=10, rate=10, max_wait=1)
+
+    async def collect():
+        return [page async for page in iter_participant_pages(sheets_client, "svod", page_size=1000, budget=budget)]
+
+    pages = asyncio.run(collect())
+
+    assert [len(page) for page in pages] == [999, 1000, 500]
+    assert pages[-1][-1].vk_id == str(100000 + 2499)
+    # Заголовок - values.get, страницы - batchGet только по колонкам участника
+    assert sheets_backend.requests_by_kind["values.get"] == 1
+    assert sheets_backend.requests_by_kind["values.batchGet"] == 3
+    assert budget.stats.snapshot()["acquired"] == 4
+
+
+def test_participant_pages_see_appended_rows(sheets_backend, sheets_client):
+    """Проверяет, что импорт после дописывания строк читает лист до новой границы сетки"""
+    spreadsheet = sheets_backend.generate_participants("svod", rows=1500)
+
+    async def collect():
+        return [page async for page in iter_participant_pages(sheets_client, "svod", page_size=1000)]
+
+    assert sum(len(page) for page in asyncio.run(collect())) == 1500
+    # Лист вырос - метаданные первого чтения ещё в кэше
+    spreadsheet.tabs["участники"].extend(
+        [str(200000 + i), f"Имя{i}", f"Фамилия{i}"] for i in range(1000)
+    )
+    spreadsheet.touch()
+    pages = asyncio.run(collect())
+    assert sum(len(page) for page in pages) == 2500
+    assert pages[-1][-1].vk_id == "200999"
+
+
+def test_stale_copies_bounded_by_rows(monkeypatch, sheets_backend):
+    """Проверяет, что страницы импорта не копятся в запасном кэше, а он ограничен числом строк"""
+    monkeypatch.setenv("GSHEETS_STALE_CACHE_ROWS", "1000")
+    sheets_backend.generate_participants("svod", rows=5000)
+    client = AsyncGSpreadClient(client=GSpreadClient(session=sheets_backend.session()), max_workers=2)
+
+    async def scenario():
+        pages = [page async for page in iter_participant_pages(client, "svod", page_size=1000)]
+        assert sum(len(page) for page in pages) == 5000
+        stats = client.circuit_stats()
+        # Остались только число строк и заголовок
+        assert stats["stale_entries"] == 2 and stats["stale_rows"] <= 2
+        # Лист больше всего кэша запасной копии не получает и не вытесняет мелкие
+        await client.read_tab("svod", "участники")
+        assert client.circuit_stats()["stale_rows"] <= 2
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        client.close()
+
+
+def test_projected_participant_reads(sheets_backend):
+    """Проверяет, что из широкого листа читаются только колонки участника"""
+    spreadsheet = sheets_backend.generate_participants("svod", rows=50, extra_columns=30)
+    gs_client = GSpreadClient(session=sheets_backend.session())
+
+    rows = gs_client.read_participant_rows("svod")
+    values = gs_client.read_tab("svod", "участники", PARTICIPANT_HEADERS).values
+    assert len(rows) == 50 and rows[0] == ("100000", "Имя0", "Фамилия0")
+    assert max(len(row) for row in values) == 3
+    assert sheets_backend.requests_by_kind["values.get"] == 1
+
+    # Вставили колонку перед vk_id - запомненные колонки устарели и определяются заново
+    header = spreadsheet.tabs["участники"][0]
+    for row in spreadsheet.tabs["участники"]:
+        row.insert(0, "комментарий" if row is header else "x")
+    assert gs_client.read_participant_rows("svod") == rows
+    assert sheets_backend.requests_by_kind["values.get"] == 2
+
+
+def test_registration_status_export(sheets_backend, sheets_client):
+    """Проверяет, что статусы уходят в таблицу одним batchUpdate только для изменившихся ячеек"""
+    # Заголовок занимает все 26 колонок сетки - колонку статуса некуда писать без расширения листа
+    spreadsheet = sheets_backend.generate_participants("svod", rows=100, extra_columns=23)
+    writer = SheetsWriteBuffer(sheets_client, max_pending=10000)
+    registered = {100000 + i: i % 3 == 0 for i in range(100)}
+
+    async def export():
+        queued = await export_registration_status(sheets_client, writer, "svod", registered)
+        written = await writer.flush("svod")
+        requeued = await export_registration_status(sheets_client, writer, "svod", registered)
+        return queued, written, requeued
+
+    queued, written, requeued = asyncio.run(export())
+
+    rows = spreadsheet.tabs["участники"]
+    assert rows[0][26] == REGISTRATION_STATUS_HEADER
+    assert rows[1][26] == "зарегистрирован" and rows[2][26] == "не зарегистрирован"
+    assert (queued, written, requeued) == (101, 101, 0)
+    assert spreadsheet.column_count("участники") == 27
+    assert sheets_backend.requests_by_kind["values.batchUpdate"] == 1
+
+
+@pytest.mark.usefixtures("no_retries")
+def test_write_buffer_requeues_only_transient_errors(sheets_backend, sheets_client):
+    """Проверяет, что после 503 запись остаётся в очереди, а после 400 отбрасывается и видна вызывающему"""
+    sheets_backend.generate_participants("svod", rows=5)
+    writer = SheetsWriteBuffer(sheets_client)
+
+    async def scenario():
+        writer.set_cell("svod", "участники", 1, 4, "Статус")
+        sheets_backend.down = True
+        await writer.flush()
+        assert writer.pending_count == 1
+        sheets_backend.down = False
+        assert await writer.flush() == 1
+
+        # Колонка за пределами сетки - ошибка постоянная, повторять бессмысленно
+        writer.set_cell("svod", "участники", 1, 30, "Статус")
+        with pytest.raises(APIError) as error:
+            await writer.flush("svod")
+        assert error.value.code == 400
+
+    asyncio.run(scenario())
+
+    assert writer.pending_count == 0 and writer.cells_dropped == 1
+
+
+def test_sheet_snapshots_warm_start(sheets_backend):
+    """Проверяет, что после рестарта лист той же версии отдаётся со снимка на диске без запроса к Google"""
+    spreadsheet = sheets_backend.generate_participants("svod", rows=20)
+
+    with tempfile.TemporaryDirectory() as directory:
+        first = GSpreadClient(session=sheets_backend.session(), snapshots=SheetSnapshotStore(directory))
+        revision = first.get_revision("svod")
+        assert len(first.read_tab("svod", "участники", revision=revision).values) == 21
+
+        # Рестарт: новый клиент, таблица не менялась
+        restarted = GSpreadClient(session=sheets_backend.session(), snapshots=SheetSnapshotStore(directory))
+        reads = sheets_backend.requests_by_kind["values.get"]
+        cached = restarted.read_tab("svod", "участники", revision=revision)
+        assert len(cached.values) == 21 and sheets_backend.requests_by_kind["values.get"] == reads
+        # Снимок всего листа не подменяет чтение только колонок участника
+        restarted.read_tab("svod", "участники", PARTICIPANT_HEADERS, revision=revision)
+        assert sheets_backend.requests_by_kind["values.get"] == reads + 1
+
+        # Таблица изменилась - новая версия, лист читается заново
+        spreadsheet.tabs["участники"].append(["999", "Новый", "Участник"])
+        spreadsheet.touch()
+        fresh = restarted.read_tab("svod", "участники", revision=restarted.get_revision("svod"))
+
+    assert len(fresh.values) == 22
+    assert cached.content_hash != fresh.content_hash
+
+
+def test_revision_change_detection(sheets_backend, sheets_client):
+    """Проверяет, что версия таблицы из Drive меняется только при изменении таблицы"""
+    sheets_backend.generate_participants("svod", rows=10)
+
+    async def check():
+        before = await sheets_client.get_revision("svod")
+        await sheets_client.write_ranges("svod", [{"range": "'участники'!D1", "values": [["Статус"]]}])
+        # Single-flight склеивает только одновременные запросы - второй вызов снова идёт в Drive
+        after = await sheets_client.get_revision("svod")
+        return before, after
+
+    before, after = asyncio.run(check())
+
+    assert before != after
+    assert sheets_backend.requests_by_kind["drive.get"] == 2
+    assert "values.get" not in sheets_backend.requests_by_kind
+
+
+def test_singleflight_coalesces_reads(sheets_backend, sheets_client):
+    """Проверяет, что одновременные одинаковые чтения уходят в Google один раз"""
+    sheets_backend.latency = 0.05
+    sheets_backend.generate_interviewer_tabs("opyt", tabs=3)
+
+    async def read_concurrently():
+        titles = await asyncio.gather(*(sheets_client.list_worksheet_titles("opyt") for _ in range(5)))
+        ranges = await asyncio.gather(*(
+            sheets_client.read_range("opyt", "Собеседующий 0", "A1:B5") for _ in range(5)
+        ))
+        return titles, ranges
+
+    titles, ranges = asyncio.run(read_concurrently())
+
+    assert all(t == titles[0] for t in titles) and all(r == ranges[0] for r in ranges)
+    assert sheets_backend.requests_by_kind["values.get"] == 1
+    assert sheets_client.singleflight.stats()["shared"] == 8
+
+
+@pytest.mark.usefixtures("no_retries")
+def test_circuit_breaker_serves_stale(sheets_backend, sheets_client):
+    """Проверяет, что при недоступном Google отдаётся прошлый ответ, а после серии сбоев запросы не уходят"""
+    sheets_backend.generate_interviewer_tabs("opyt", tabs=2)
+    sheets_client.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+
+    async def scenario():
+        fresh = await sheets_client.read_range("opyt", "Собеседующий 0", "A1:B3")
+        sheets_backend.down = True
+        with Staleness() as staleness:
+            for _ in range(3):
+                assert await sheets_client.read_range("opyt", "Собеседующий 0", "A1:B3") == fresh
+        requests_while_open = sheets_backend.request_count
+        assert await sheets_client.read_range("opyt", "Собеседующий 0", "A1:B3") == fresh
+        assert sheets_backend.request_count == requests_while_open
+        assert sheets_client.breaker.state == CircuitBreaker.OPEN
+
+        sheets_backend.down = False
+        await asyncio.sleep(0.25)
+        await sheets_client.read_range("opyt", "Собеседующий 0", "A1:B3")
+        return staleness.since
+
+    stale_since = asyncio.run(scenario())
+
+    assert stale_since is not None
+    assert sheets_client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_credential_refresher():
+    """Проверяет, что токен получается сразу при старте и обновляется заранее"""
+    lifetimes = [601, 3600]
+
+    class ExpiringCredentials(google.auth.credentials.Credentials):
+        def refresh(self, request):
+            lifetime = lifetimes.pop(0) if lifetimes else 3600
+            self.token = f"token-{time.monotonic()}"
+            self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=lifetime)
+
+    credentials = ExpiringCredentials()
+    refresher = CredentialRefresher(credentials, refresh_lead=600)
+    refresher.start()
+    try:
+        # Первый токен живёт 601 с - обновление через секунду; второй живёт час - следующего нет
+        deadline = time.monotonic() + 3
+        while refresher.refreshes < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.2)
+    finally:
+        refresher.stop()
+
+    assert refresher.refreshes == 2 and refresher.failures == 0
+    assert refresher.stats()["expiry"] == credentials.expiry.isoformat()
+
+
+def test_token_wait_bounded_by_call_deadline():
+    """Проверяет, что поток не ждёт токен дольше, чем осталось до таймаута вызова"""
+    bucket = TokenBucket(capacity=1, rate=1, max_wait=30)
+    bucket.acquire()
+
+    token = call_deadline.set(time.monotonic() + 0.1)
+    try:
+        started = time.monotonic()
+        with pytest.raises(SheetsQuotaExceeded):
+            bucket.acquire()
+        assert time.monotonic() - started < 0.1
+    finally:
+        call_deadline.reset(token)
+
+    assert bucket.stats.snapshot()["rejected"] == 1